@@ -4,7 +4,9 @@ Test List Controller
 テスト一覧を管理するコントローラー
 """
 
-from app.core.AppController import AppController
+from app.core.AppController import AppController, action
+from app.core.Cache import Cache
+from app.core.Router import url_for
 
 class TestListController(AppController):
     """
@@ -27,6 +29,7 @@ class TestListController(AppController):
         # users = user_model.find_all()
         # self.set("users", users)
     
+    @action(cacheable=True, params=("<int:id>",))
     def detail(self):
         """
         テスト詳細を表示する
@@ -34,14 +37,15 @@ class TestListController(AppController):
         Returns:
             None
         """
-        # ルートパラメータからIDを取得
+        # ルートパラメータからIDを取得（<int:id> によりintに変換済み）
         test_id = self._request.get_param("id")
+        test = self._test()
         
         # テストデータをセット
         self.set("title", f"テスト詳細 - {test_id}")
         self.set("test_id", test_id)
-        self.set("test_name", f"テスト{test_id}")
-        self.set("test_description", f"これはテスト{test_id}の説明です。")
+        self.set("test_name", test["name"])
+        self.set("test_description", test["description"])
     
     def add(self):
         """
@@ -53,6 +57,7 @@ class TestListController(AppController):
         self.set("title", "テスト追加")
         self.set("form_action", "create")
     
+    @action(method="POST")
     def create(self):
         """
         テストを作成する
@@ -67,8 +72,9 @@ class TestListController(AppController):
         # ここではモデルを使った処理を省略
         
         # 一覧ページにリダイレクト
-        self._response.redirect("/test_list")
+        self._response.redirect(url_for("TestList"))
     
+    @action(cacheable=True, params=("<int:id>",))
     def edit(self):
         """
         テスト編集フォームを表示する
@@ -81,9 +87,10 @@ class TestListController(AppController):
         
         self.set("title", f"テスト編集 - {test_id}")
         self.set("test_id", test_id)
-        self.set("test_name", f"テスト{test_id}")
+        self.set("test_name", self._test()["name"])
         self.set("form_action", "update")
     
+    @action(method="POST", params=("<int:id>",))
     def update(self):
         """
         テストを更新する
@@ -101,8 +108,9 @@ class TestListController(AppController):
         # ここではモデルを使った処理を省略
         
         # 詳細ページにリダイレクト
-        self._response.redirect(f"/test_list/detail/{test_id}")
+        self._response.redirect(url_for("TestList", "detail", id=test_id))
     
+    @action(method="POST", params=("<int:id>",))
     def delete(self):
         """
         テストを削除する
@@ -117,4 +125,30 @@ class TestListController(AppController):
         # ここではモデルを使った処理を省略
         
         # 一覧ページにリダイレクト
-        self._response.redirect("/test_list")
\ No newline at end of file
+        self._response.redirect(url_for("TestList"))
+    
+    def _test(self):
+        """
+        ルートパラメータのIDのテストデータを取得する
+        先読みしたデータがあればそれを使います
+        
+        Returns:
+            テストデータの辞書
+        """
+        test_id = self._request.get_param("id")
+        return Cache.remember(
+            f"testlist:{test_id}",
+            lambda: {"name": f"テスト{test_id}", "description": f"これはテスト{test_id}の説明です。"},
+            config="prefetch"
+        )
+    
+    def _prefetch(self, action, params):
+        """
+        リンク先の詳細・編集画面のデータを先読みする（Prefetcher から呼び出される）
+        
+        Args:
+            action: アクション名
+            params: ルートパラメータ
+        """
+        if action in ("detail", "edit") and params.get("id") is not None:
+            self._test()
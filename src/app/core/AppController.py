@@ -5,65 +5,183 @@ AppController Module
 全てのコントローラーはこのクラスを継承して使用します。
 """
 
+import contextvars
+import inspect
+from collections import namedtuple
+from contextlib import contextmanager
+from types import MappingProxyType
 import flet as ft
+from app.core.Log import get_logger
 from app.core.Request import Request
 
+logger = get_logger(__name__)
+
+# アクションの定義（コントローラークラスの定義時に一度だけ作成される）
+#   name: アクション名
+#   function: アクションの関数（インスタンスを渡して呼び出す）
+#   method: HTTPに相当するメソッド（GET は表示、POST は作成・更新・削除）
+#   cacheable: 先読み（_prefetch フック）の対象にするかどうか
+#   params: URLルートに付加するパラメータ（'<int:id>' 形式。省略したルートも生成される）
+Action = namedtuple('Action', ('name', 'function', 'method', 'cacheable', 'params'))
+
+# 現在処理中のディスパッチのコンテキスト
+_current_context = contextvars.ContextVar('fletmvc_dispatch', default=None)
+
+class DispatchContext:
+    """
+    1回のディスパッチ（アクションの実行からビューの描画まで）の状態
+    コントローラーのインスタンスはセッション間で共有されるため、
+    リクエストごとに変わる値は全てこのオブジェクトに保持します
+    """
+    
+    __slots__ = ('request', 'response', 'view_vars', 'layout', 'models')
+    
+    def __init__(self, request, response, layout):
+        self.request = request
+        self.response = response
+        self.view_vars = {}
+        self.layout = layout
+        self.models = None  # load_model で最初に使われた時点で作成する
+
+def action(method="GET", cacheable=False, params=()):
+    """
+    アクションのメタデータを宣言するデコレーター
+    
+    使用例:
+        @action(method="POST", params=("<int:id>",))
+        def update(self):
+            ...
+    
+    Args:
+        method: HTTPに相当するメソッド
+        cacheable: Trueの場合は先読みの対象にする
+        params: URLルートに付加するパラメータ
+                （省略可能。パラメータなしのルートも生成され、その場合の値はNone）
+    """
+    def decorator(function):
+        function._action = {
+            "method": method.upper(),
+            "cacheable": cacheable,
+            "params": tuple(params),
+        }
+        return function
+    return decorator
+
 class AppController:
     """
     アプリケーションのベースコントローラークラス
     全てのコントローラーはこのクラスを継承します
+    
+    サブクラスで定義した公開メソッド（_で始まらない関数）がアクションになります
+    アクションの一覧はクラスの定義時に actions（アクション名 -> Action の読み取り専用の辞書）に
+    まとめられるため、ルーティングやディスパッチで dir() による走査は行いません
+    
+    インスタンスはコントローラーごとに1つだけ作られ、全セッションで同時に使われます
+    リクエスト・レスポンス・ビュー変数などは dispatch で作成する DispatchContext に保持されるため、
+    サブクラスはインスタンス変数にリクエストごとの値を保存しないでください
     """
     
-    def __init__(self):
-        self._view_vars = {}
-        self._layout = "default"
-        self._elements = {}
-        self._name = self.__class__.__name__.replace('Controller', '').lower()
-        self._request = None
-        self._response = None
-        self._models = {}
+    actions = MappingProxyType({})
+    layout = "default"  # 既定のレイアウト
     
-    def initialize(self, request, response):
+    def __init_subclass__(cls, **kwargs):
         """
-        コントローラーの初期化処理
+        サブクラスの定義時にアクションの一覧を作成する
+        親のコントローラーのアクションは引き継ぎ、AppControllerのメソッドはアクションにしない
         """
-        self._request = request
-        self._response = response
-        return self
+        super().__init_subclass__(**kwargs)
+        actions = dict(cls.actions)
+        for name, value in vars(cls).items():
+            if name.startswith('_') or name in vars(AppController) or not inspect.isfunction(value):
+                continue
+            meta = getattr(value, '_action', {})
+            actions[name] = Action(
+                name,
+                value,
+                meta.get("method", "GET"),
+                meta.get("cacheable", False),
+                meta.get("params", ()),
+            )
+        cls.actions = MappingProxyType(actions)
+    
+    @contextmanager
+    def dispatch(self, request, response):
+        """
+        1回のディスパッチのコンテキストを作成する
+        ブロック内（同じスレッド）でのアクションの呼び出しはこのコンテキストを参照します
+        
+        Args:
+            request: Requestオブジェクト
+            response: Responseオブジェクト
+            
+        Yields:
+            DispatchContextオブジェクト
+        """
+        context = DispatchContext(request, response, self.layout)
+        token = _current_context.set(context)
+        try:
+            yield context
+        finally:
+            _current_context.reset(token)
+    
+    @property
+    def _context(self):
+        context = _current_context.get()
+        if context is None:
+            raise RuntimeError("コントローラーのメソッドがディスパッチの外で呼び出されました")
+        return context
+    
+    @property
+    def _request(self):
+        """
+        現在のディスパッチのリクエスト
+        """
+        return self._context.request
+    
+    @property
+    def _response(self):
+        """
+        現在のディスパッチのレスポンス
+        """
+        return self._context.response
     
     def set(self, var_name, value):
         """
         ビューに渡す変数をセットする
         CakePHPの$this->set()と同様の機能
         """
-        self._view_vars[var_name] = value
+        self._context.view_vars[var_name] = value
         return self
     
     def get_view_vars(self):
         """
         ビュー変数を取得する
         """
-        return self._view_vars
+        return self._context.view_vars
     
     def set_layout(self, layout_name):
         """
         使用するレイアウトをセットする
         """
-        self._layout = layout_name
+        self._context.layout = layout_name
         return self
     
     def get_layout(self):
         """
-        現在のレイアウト名を取得する
+        現在のレイアウト名を取得する（ディスパッチの外では既定のレイアウト）
         """
-        return self._layout
+        context = _current_context.get()
+        return context.layout if context is not None else self.layout
     
     def load_model(self, model_name):
         """
-        モデルをロードする
+        モデルをロードする（同じディスパッチ内では同じインスタンスを返す）
         """
-        if model_name in self._models:
-            return self._models[model_name]
+        context = self._context
+        if context.models is None:
+            context.models = {}
+        elif model_name in context.models:
+            return context.models[model_name]
             
         try:
             import importlib
@@ -71,10 +189,10 @@ class AppController:
             module = importlib.import_module(module_path)
             model_class = getattr(module, model_name)
             model_instance = model_class()
-            self._models[model_name] = model_instance
+            context.models[model_name] = model_instance
             return model_instance
         except Exception as e:
-            print(f"モデルのロードに失敗しました: {e}")
+            logger.exception("モデルのロードに失敗しました: %s", e)
             return None
     
     def load_component(self, component_name, **params):
@@ -88,8 +206,8 @@ class AppController:
             if hasattr(module, "main"):
                 return module.main(**params)
             else:
-                print(f"コンポーネント '{component_name}' に main 関数がありません")
+                logger.warning("コンポーネント '%s' に main 関数がありません", component_name)
                 return []
         except Exception as e:
-            print(f"コンポーネントのロードに失敗しました: {e}")
+            logger.exception("コンポーネントのロードに失敗しました: %s", e)
             return []
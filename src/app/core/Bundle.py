@@ -0,0 +1,212 @@
+"""
+Bundle Module
+
+このモジュールは本番起動用の事前構築バンドルを定義します。
+ビルド時にルート表・コントローラーとアクションの対応・テンプレートとレイアウトの一覧・
+モデルの一覧を1つのファイルに書き出し、実行時はそのファイルを1回読み込むだけで
+src/app や src/templates の走査を省略します。
+
+使用例:
+    python src/build.py                      # BUNDLE['file'] に書き出す
+    python src/build.py --output app.bundle  # 出力先を指定する
+
+BUNDLE['file'] の相対パスはカレントディレクトリではなくプロジェクトのルート（src）から解決します。
+バンドルには走査したディレクトリとコントローラーのファイルの更新時刻を記録し、
+読み込み時にいずれかが変わっていれば（コントローラーやテンプレートの追加・削除など）
+古いバンドルとして使用せずに走査します。
+"""
+
+import json
+import os
+import time
+from app.core.Discovery import Discovery
+from app.core.Log import get_logger
+from config import app
+
+logger = get_logger(__name__)
+
+# バンドルの形式のバージョン（形式を変えた場合は上げる）
+BUNDLE_VERSION = 2
+
+# バンドルの内容が依存するパッケージ（コントローラーはアクションの一覧のためファイルの更新時刻も記録する）
+SOURCE_PACKAGES = ('app.controllers', 'app.models', 'templates.components', 'templates.layouts', 'templates.elements')
+
+
+def _config():
+    return getattr(app, 'BUNDLE', {})
+
+
+def _sources():
+    """
+    バンドルの内容が依存するディレクトリとファイルの更新時刻を取得する
+
+    Returns:
+        プロジェクトのルートからの相対パス -> 更新時刻（ナノ秒）の辞書
+    """
+    root = Discovery.root()
+    sources = {}
+    for package in SOURCE_PACKAGES:
+        for package_dir in Discovery.package_dirs(package):
+            for directory, dirs, files in os.walk(package_dir):
+                dirs[:] = [name for name in dirs if name != '__pycache__']
+                sources[os.path.relpath(directory, root)] = os.stat(directory).st_mtime_ns
+                if package == 'app.controllers':
+                    for name in files:
+                        if name.endswith('.py'):
+                            path = os.path.join(directory, name)
+                            sources[os.path.relpath(path, root)] = os.stat(path).st_mtime_ns
+    return sources
+
+
+def _stale(sources):
+    """
+    記録した更新時刻から変わったディレクトリまたはファイルを探す
+
+    Args:
+        sources: バンドルに記録した更新時刻の辞書
+
+    Returns:
+        変わったパス（変わっていなければNone）
+    """
+    root = Discovery.root()
+    for path, mtime in sources.items():
+        try:
+            if os.stat(os.path.join(root, path)).st_mtime_ns != mtime:
+                return path
+        except OSError:
+            return path
+    return None
+
+
+class Bundle:
+    """
+    事前構築バンドルの読み込みと生成を行うクラス
+    バンドルがない場合、各項目は None を返し、呼び出し側は従来どおり走査します
+    """
+
+    _data = None  # 読み込んだバンドル（未読み込みはNone、使用しない場合は空の辞書）
+
+    @staticmethod
+    def load(path=None):
+        """
+        バンドルを読み込む
+
+        Args:
+            path: バンドルファイルのパス（省略時は BUNDLE['file']）
+
+        Returns:
+            バンドルの辞書（使用しない場合は空の辞書）
+        """
+        config = _config()
+        path = path or Discovery.resolve(config.get('file'))
+        data = {}
+        if config.get('enabled', True) and path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    data = json.loads(f.read())
+                if data.get('version') != BUNDLE_VERSION:
+                    logger.warning("バンドル '%s' の形式が古いため使用しません", path)
+                    data = {}
+                elif config.get('verify', True):
+                    changed = _stale(data.get('sources', {}))
+                    if changed is not None:
+                        logger.warning("バンドルの構築後に '%s' が変更されたため使用しません: %s", changed, path)
+                        data = {}
+            except (OSError, ValueError) as e:
+                logger.warning("バンドル '%s' の読み込みに失敗しました: %s", path, e)
+                data = {}
+        Bundle._data = data
+        return data
+
+    @staticmethod
+    def loaded():
+        """
+        バンドルが使用されているかどうかを取得する
+
+        Returns:
+            バンドルを読み込んでいる場合はTrue
+        """
+        if Bundle._data is None:
+            Bundle.load()
+        return bool(Bundle._data)
+
+    @staticmethod
+    def get(key, default=None):
+        """
+        バンドルの項目を取得する
+
+        Args:
+            key: 項目名（routes, controllers, templates, layouts, elements, models）
+            default: バンドルがない場合の値
+
+        Returns:
+            項目の値
+        """
+        if Bundle._data is None:
+            Bundle.load()
+        return Bundle._data.get(key, default)
+
+    @staticmethod
+    def reset():
+        """
+        読み込んだバンドルを破棄する（次回の get で再度読み込みます）
+        """
+        Bundle._data = None
+
+    @staticmethod
+    def build():
+        """
+        ソースを走査してバンドルの内容を生成する
+
+        Returns:
+            バンドルの辞書
+        """
+        from app.core.Controller import Controller
+        from app.core.Router import Router
+        from app.models.AppModel import AppModel
+
+        # 既存のバンドルを参照せずに走査する
+        Bundle._data = {}
+        try:
+            routes = Router._discover_routes()
+            controllers = {}
+            for _, controller_name, action_name in routes:
+                controllers.setdefault(controller_name, []).append(action_name)
+            for controller_name in Controller.get_available_controllers():
+                controllers.setdefault(controller_name.replace('Controller', ''), [])
+
+            return {
+                'version': BUNDLE_VERSION,
+                'built_at': time.time(),
+                'routes': routes,
+                'controllers': controllers,
+                'templates': Discovery.modules('templates.components', recursive=True),
+                'layouts': Discovery.modules('templates.layouts', recursive=True),
+                'elements': Discovery.modules('templates.elements', recursive=True),
+                'models': sorted(AppModel.get_all_models()),
+                'sources': _sources(),
+            }
+        finally:
+            Bundle._data = None
+
+    @staticmethod
+    def write(path=None):
+        """
+        バンドルを生成してファイルに書き出す
+
+        Args:
+            path: 出力先のパス（省略時は BUNDLE['file']）
+
+        Returns:
+            書き出したバンドルの辞書
+        """
+        path = path or Discovery.resolve(_config().get('file'))
+        data = Bundle.build()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        return data
@@ -0,0 +1,727 @@
+"""
+Cache Module
+
+このモジュールはアプリケーション共通のキャッシュサービスを定義します。
+CakePHPのCacheに相当し、config/app.py の CACHE 設定からエンジンを構築します。
+
+利用可能なエンジン:
+- memory: プロセス内のLRUキャッシュ（バイト数で上限を指定）
+- file: シャーディングされたディレクトリへのアトミック書き込み
+- sqlite: SQLiteファイルへの保存
+
+設定に memory_tier を指定すると、メモリ → ディスクの読み込みスルー階層になります。
+
+使用例:
+    from app.core.Cache import Cache
+
+    Cache.set("key", value)
+    value = Cache.get("key")
+    users = Cache.remember("users", lambda: list(User.select()), config="default")
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from app.core.Discovery import Discovery
+from config import app
+
+# ファイルエンジンのヘッダー（有効期限のUNIX時刻、0は無期限）
+_HEADER = struct.Struct("<d")
+
+
+class CacheEngine:
+    """
+    キャッシュエンジンの基底クラス
+    全てのエンジンはこのクラスを継承して _read_entry/_write/_remove を実装します
+    """
+
+    def __init__(self, config):
+        """
+        CacheEngineオブジェクトの初期化
+
+        Args:
+            config: エンジン設定の辞書
+        """
+        self._config = config
+        self._duration = config.get('duration')
+
+    def _expires_at(self, duration):
+        """
+        有効期限のUNIX時刻を計算する
+
+        Args:
+            duration: 有効期間（秒）。Noneの場合は設定値を使用
+
+        Returns:
+            有効期限（0は無期限）
+        """
+        if duration is None:
+            duration = self._duration
+        if not duration:
+            return 0.0
+        return time.time() + duration
+
+    def get(self, key, default=None):
+        """
+        キャッシュから値を取得する
+
+        Args:
+            key: キャッシュキー
+            default: キャッシュが存在しない場合のデフォルト値
+
+        Returns:
+            キャッシュされた値またはデフォルト値
+        """
+        hit, value = self._read(key)
+        return value if hit else default
+
+    def set(self, key, value, duration=None):
+        """
+        キャッシュに値を保存する
+
+        Args:
+            key: キャッシュキー
+            value: 保存する値（pickle可能なオブジェクト）
+            duration: 有効期間（秒）
+        """
+        self._write(key, value, self._expires_at(duration))
+        return self
+
+    def delete(self, key):
+        """
+        キャッシュから値を削除する
+
+        Args:
+            key: キャッシュキー
+        """
+        self._remove(key)
+        return self
+
+    def get_many(self, keys):
+        """
+        複数のキーをまとめて取得する
+
+        Args:
+            keys: キャッシュキーのリスト
+
+        Returns:
+            ヒットしたキーと値の辞書
+        """
+        return {key: value for key, (value, _) in self._read_entries(keys).items()}
+
+    def set_many(self, items, duration=None):
+        """
+        複数の値をまとめて保存する
+
+        Args:
+            items: キーと値の辞書
+            duration: 有効期間（秒）
+        """
+        expires_at = self._expires_at(duration)
+        for key, value in items.items():
+            self._write(key, value, expires_at)
+        return self
+
+    def clear(self):
+        """
+        全てのキャッシュを削除する
+        """
+        raise NotImplementedError
+
+    def invalidate_local(self, key=None):
+        """
+        このプロセスだけが保持している値を破棄する
+        ディスク上のキャッシュはプロセス間で共有されるため何もしません
+
+        Args:
+            key: キャッシュキー（Noneの場合は全て）
+        """
+        return self
+
+    def size(self):
+        """
+        このプロセスのメモリ上に保持しているバイト数を取得する
+
+        Returns:
+            バイト数（ディスク上のキャッシュは含まない）
+        """
+        return 0
+
+    def _read(self, key):
+        hit, value, _ = self._read_entry(key)
+        return hit, value
+
+    def _read_entry(self, key):
+        """
+        有効期限とあわせて値を読み込む
+
+        Returns:
+            (ヒットしたか, 値, 有効期限のUNIX時刻（0は無期限）)
+        """
+        raise NotImplementedError
+
+    def _read_entries(self, keys):
+        """
+        複数のキーを有効期限とあわせて読み込む
+
+        Returns:
+            ヒットしたキー -> (値, 有効期限) の辞書
+        """
+        result = {}
+        for key in keys:
+            hit, value, expires_at = self._read_entry(key)
+            if hit:
+                result[key] = (value, expires_at)
+        return result
+
+    def _write(self, key, value, expires_at):
+        raise NotImplementedError
+
+    def _remove(self, key):
+        raise NotImplementedError
+
+
+class MemoryEngine(CacheEngine):
+    """
+    プロセス内のLRUキャッシュエンジン
+    pickle化したサイズの合計が max_bytes を超えると古いものから破棄します
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._max_bytes = config.get('max_bytes', 16 * 1024 * 1024)
+        self._entries = OrderedDict()  # key -> (expires_at, value, size)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _read_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None, 0.0
+            expires_at, value, size = entry
+            if expires_at and expires_at < time.time():
+                del self._entries[key]
+                self._size -= size
+                return False, None, 0.0
+            self._entries.move_to_end(key)
+            return True, value, expires_at
+
+    def _write(self, key, value, expires_at):
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size > self._max_bytes:
+            # 上限を超える値は保存しない
+            self._remove(key)
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[2]
+            self._entries[key] = (expires_at, value, size)
+            self._size += size
+            while self._size > self._max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def _remove(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        return self
+
+    def invalidate_local(self, key=None):
+        if key is None:
+            return self.clear()
+        self._remove(key)
+        return self
+
+    def size(self):
+        """
+        現在保持しているバイト数を取得する
+
+        Returns:
+            pickle化したサイズの合計
+        """
+        return self._size
+
+
+class FileEngine(CacheEngine):
+    """
+    ファイルキャッシュエンジン
+    キーのハッシュで2階層にシャーディングし、一時ファイル経由でアトミックに書き込みます
+    mmap_threshold を超えるファイルはmmapで読み込みます
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._path = Discovery.resolve(config.get('path', 'tmp/cache/'))
+        self._mmap_threshold = config.get('mmap_threshold', 64 * 1024)
+        os.makedirs(self._path, exist_ok=True)
+
+    def _file_path(self, key):
+        digest = hashlib.sha1(str(key).encode('utf-8')).hexdigest()
+        return os.path.join(self._path, digest[:2], digest[2:4], digest)
+
+    def _read_entry(self, key):
+        file_path = self._file_path(key)
+        try:
+            with open(file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < _HEADER.size:
+                    return False, None, 0.0
+                if size >= self._mmap_threshold:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        (expires_at,) = _HEADER.unpack_from(mm, 0)
+                        if expires_at and expires_at < time.time():
+                            value = None
+                        else:
+                            with memoryview(mm) as view:
+                                value = pickle.loads(view[_HEADER.size:])
+                else:
+                    data = f.read()
+                    (expires_at,) = _HEADER.unpack_from(data, 0)
+                    if not (expires_at and expires_at < time.time()):
+                        value = pickle.loads(data[_HEADER.size:])
+        except FileNotFoundError:
+            return False, None, 0.0
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            # 壊れたキャッシュファイルは削除してミス扱いにする
+            self._remove(key)
+            return False, None, 0.0
+
+        if expires_at and expires_at < time.time():
+            self._remove(key)
+            return False, None, 0.0
+        return True, value, expires_at
+
+    def _write(self, key, value, expires_at):
+        file_path = self._file_path(key)
+        directory = os.path.dirname(file_path)
+        os.makedirs(directory, exist_ok=True)
+        data = _HEADER.pack(expires_at) + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _remove(self, key):
+        try:
+            os.unlink(self._file_path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for root, _, files in os.walk(self._path):
+            for filename in files:
+                try:
+                    os.unlink(os.path.join(root, filename))
+                except FileNotFoundError:
+                    pass
+        return self
+
+
+class SqliteEngine(CacheEngine):
+    """
+    SQLiteキャッシュエンジン
+    スレッドごとに接続を持ち、WALモードで読み書きします
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._file = Discovery.resolve(config.get('file', 'tmp/cache/cache.db'))
+        directory = os.path.dirname(self._file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._file, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _read_entry(self, key):
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (str(key),)
+        ).fetchone()
+        if row is None:
+            return False, None, 0.0
+        value, expires_at = row
+        if expires_at and expires_at < time.time():
+            self._remove(key)
+            return False, None, 0.0
+        return True, pickle.loads(value), expires_at
+
+    def _write(self, key, value, expires_at):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (str(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires_at)
+        )
+
+    def _remove(self, key):
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (str(key),))
+
+    def _read_entries(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        by_name = {str(key): key for key in keys}
+        placeholders = ','.join('?' * len(by_name))
+        rows = self._connection().execute(
+            f"SELECT key, value, expires_at FROM cache WHERE key IN ({placeholders})",
+            list(by_name)
+        ).fetchall()
+        now = time.time()
+        return {
+            by_name[name]: (pickle.loads(value), expires_at)
+            for name, value, expires_at in rows
+            if not (expires_at and expires_at < now)
+        }
+
+    def set_many(self, items, duration=None):
+        expires_at = self._expires_at(duration)
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                [
+                    (str(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires_at)
+                    for key, value in items.items()
+                ]
+            )
+        return self
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache")
+        return self
+
+
+class TieredEngine(CacheEngine):
+    """
+    メモリ → ディスクの読み込みスルー階層エンジン
+    下位エンジンでヒットした値は残りの有効期間のままメモリ層に昇格します
+    """
+
+    def __init__(self, config, front, back):
+        super().__init__(config)
+        self._front = front
+        self._back = back
+
+    def _read_entry(self, key):
+        hit, value, expires_at = self._front._read_entry(key)
+        if hit:
+            return True, value, expires_at
+        hit, value, expires_at = self._back._read_entry(key)
+        if hit:
+            self._front._write(key, value, expires_at)
+        return hit, value, expires_at
+
+    def _write(self, key, value, expires_at):
+        self._back._write(key, value, expires_at)
+        self._front._write(key, value, expires_at)
+
+    def _remove(self, key):
+        self._front._remove(key)
+        self._back._remove(key)
+
+    def _read_entries(self, keys):
+        keys = list(keys)
+        result = self._front._read_entries(keys)
+        missing = [key for key in keys if key not in result]
+        if missing:
+            found = self._back._read_entries(missing)
+            for key, (value, expires_at) in found.items():
+                self._front._write(key, value, expires_at)
+            result.update(found)
+        return result
+
+    def set_many(self, items, duration=None):
+        self._back.set_many(items, duration)
+        self._front.set_many(items, duration)
+        return self
+
+    def clear(self):
+        self._front.clear()
+        self._back.clear()
+        return self
+
+    def invalidate_local(self, key=None):
+        self._front.invalidate_local(key)
+        return self
+
+    def size(self):
+        return self._front.size()
+
+
+class Cache:
+    """
+    名前付きキャッシュ設定を管理するファサードクラス
+    コントローラー・モデル・ビューはこのクラスを通してキャッシュを共有します
+    """
+
+    ENGINES = {
+        'memory': MemoryEngine,
+        'file': FileEngine,
+        'sqlite': SqliteEngine,
+    }
+
+    _engines = {}
+    _engines_lock = threading.Lock()
+    _key_locks = {}  # (設定名, キー) -> [ロック, 使用中のスレッド数]
+    _key_locks_lock = threading.Lock()
+    _listeners = []
+
+    @staticmethod
+    def engine(config='default'):
+        """
+        名前付き設定のキャッシュエンジンを取得する
+
+        Args:
+            config: CACHE 設定の名前
+
+        Returns:
+            CacheEngineのインスタンス
+        """
+        engine = Cache._engines.get(config)
+        if engine is not None:
+            return engine
+
+        with Cache._engines_lock:
+            engine = Cache._engines.get(config)
+            if engine is None:
+                engine = Cache._build(config)
+                Cache._engines[config] = engine
+            return engine
+
+    @staticmethod
+    def _build(name):
+        """
+        設定からキャッシュエンジンを構築する
+
+        Args:
+            name: CACHE 設定の名前
+
+        Returns:
+            CacheEngineのインスタンス
+        """
+        configs = getattr(app, 'CACHE', {})
+        if name not in configs:
+            raise KeyError(f"キャッシュ設定 '{name}' が見つかりません")
+
+        config = configs[name]
+        engine_name = config.get('engine', 'file')
+        if engine_name not in Cache.ENGINES:
+            raise ValueError(f"キャッシュエンジン '{engine_name}' はサポートされていません")
+
+        engine = Cache.ENGINES[engine_name](config)
+
+        # メモリ層を前段に置く
+        memory_tier = config.get('memory_tier')
+        if memory_tier and engine_name != 'memory':
+            front = MemoryEngine({'duration': config.get('duration'), 'max_bytes': memory_tier})
+            engine = TieredEngine(config, front, engine)
+
+        return engine
+
+    @staticmethod
+    def on_change(callback):
+        """
+        キャッシュの書き込み・削除時に呼び出すコールバックを登録する
+        マルチプロセス構成で他のワーカーのメモリ層を無効化するために使用します
+
+        Args:
+            callback: callback(config, keys) の形の関数（keysがNoneの場合は全削除）
+        """
+        Cache._listeners.append(callback)
+
+    @staticmethod
+    def _notify(config, keys):
+        for callback in Cache._listeners:
+            callback(config, keys)
+
+    @staticmethod
+    def invalidate_local(config='default', keys=None):
+        """
+        このプロセスのメモリ層から値を破棄する（他のプロセスからの通知で使用）
+
+        Args:
+            config: CACHE 設定の名前
+            keys: キャッシュキーのリスト（Noneの場合は全て）
+        """
+        engine = Cache._engines.get(config)
+        if engine is None:
+            return
+        if keys is None:
+            engine.invalidate_local()
+        else:
+            for key in keys:
+                engine.invalidate_local(key)
+
+    @staticmethod
+    def memory_size():
+        """
+        このプロセスのメモリ上に保持しているバイト数を取得する
+
+        Returns:
+            構築済みの全てのキャッシュ設定の合計
+        """
+        return sum(engine.size() for engine in list(Cache._engines.values()))
+
+    @staticmethod
+    def release_memory():
+        """
+        このプロセスのメモリ上に保持している値を全て破棄する（メモリが不足した場合に使用）
+        """
+        for engine in list(Cache._engines.values()):
+            engine.invalidate_local()
+
+    @staticmethod
+    def get(key, default=None, config='default'):
+        """
+        キャッシュから値を取得する
+
+        Args:
+            key: キャッシュキー
+            default: キャッシュが存在しない場合のデフォルト値
+            config: CACHE 設定の名前
+
+        Returns:
+            キャッシュされた値またはデフォルト値
+        """
+        return Cache.engine(config).get(key, default)
+
+    @staticmethod
+    def set(key, value, duration=None, config='default'):
+        """
+        キャッシュに値を保存する
+
+        Args:
+            key: キャッシュキー
+            value: 保存する値
+            duration: 有効期間（秒）
+            config: CACHE 設定の名前
+        """
+        Cache.engine(config).set(key, value, duration)
+        Cache._notify(config, [key])
+
+    @staticmethod
+    def delete(key, config='default'):
+        """
+        キャッシュから値を削除する
+
+        Args:
+            key: キャッシュキー
+            config: CACHE 設定の名前
+        """
+        Cache.engine(config).delete(key)
+        Cache._notify(config, [key])
+
+    @staticmethod
+    def get_many(keys, config='default'):
+        """
+        複数のキーをまとめて取得する
+
+        Args:
+            keys: キャッシュキーのリスト
+            config: CACHE 設定の名前
+
+        Returns:
+            ヒットしたキーと値の辞書
+        """
+        return Cache.engine(config).get_many(keys)
+
+    @staticmethod
+    def set_many(items, duration=None, config='default'):
+        """
+        複数の値をまとめて保存する
+
+        Args:
+            items: キーと値の辞書
+            duration: 有効期間（秒）
+            config: CACHE 設定の名前
+        """
+        Cache.engine(config).set_many(items, duration)
+        Cache._notify(config, list(items))
+
+    @staticmethod
+    def clear(config='default'):
+        """
+        全てのキャッシュを削除する
+
+        Args:
+            config: CACHE 設定の名前
+        """
+        Cache.engine(config).clear()
+        Cache._notify(config, None)
+
+    @staticmethod
+    def remember(key, callback, duration=None, config='default'):
+        """
+        キャッシュがあればそれを返し、なければコールバックの結果を保存して返す
+        同じキーへの同時アクセスではコールバックを1回だけ実行します（スタンピード防止）
+
+        Args:
+            key: キャッシュキー
+            callback: 値を生成する関数
+            duration: 有効期間（秒）
+            config: CACHE 設定の名前
+
+        Returns:
+            キャッシュされた値または生成された値
+        """
+        engine = Cache.engine(config)
+        hit, value = engine._read(key)
+        if hit:
+            return value
+
+        # キーごとのロックは待っているスレッドの数を数え、最後のスレッドが破棄する
+        lock_key = (config, key)
+        with Cache._key_locks_lock:
+            entry = Cache._key_locks.get(lock_key)
+            if entry is None:
+                entry = Cache._key_locks[lock_key] = [threading.Lock(), 0]
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                # 待っている間に他のスレッドが生成していればそれを使う
+                hit, value = engine._read(key)
+                if hit:
+                    return value
+                value = callback()
+                engine.set(key, value, duration)
+                Cache._notify(config, [key])
+                return value
+        finally:
+            with Cache._key_locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del Cache._key_locks[lock_key]
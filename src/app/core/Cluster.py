@@ -0,0 +1,274 @@
+"""
+Cluster Module
+
+このモジュールはマルチプロセス構成でアプリケーションを動かす仕組みを定義します。
+N個のワーカープロセスがそれぞれ独立したルーター・キャッシュ・DB接続を持ち、
+前段のディスパッチャーがクライアントのアドレスでワーカーを固定して接続を中継します。
+
+ワーカー間ではキャッシュのメモリ層の無効化とモデルの変更（app.core.Events）を
+127.0.0.1 上のUDPで軽量な通知（JSON）として送り合います。
+
+使用例:
+    python src/cluster.py --workers 4 --port 5000
+"""
+
+import asyncio
+import atexit
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import zlib
+from app.core.Log import WORKER_ENV, configure, get_logger
+from config import app
+
+logger = get_logger(__name__)
+
+
+def _config():
+    return getattr(app, 'CLUSTER', {})
+
+
+# 1回の通知に含めるモデルの変更の行数
+EVENTS_PER_MESSAGE = 500
+
+
+class InvalidationChannel:
+    """
+    ワーカー間でキャッシュの無効化とモデルの変更を通知するUDPチャネル
+    """
+
+    def __init__(self, index, ports):
+        """
+        InvalidationChannelオブジェクトの初期化
+
+        Args:
+            index: このワーカーの番号
+            ports: 全ワーカーの通知用ポートのリスト
+        """
+        self._index = index
+        self._peers = [("127.0.0.1", port) for i, port in enumerate(ports) if i != index]
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(("127.0.0.1", ports[index]))
+
+    def start(self):
+        """
+        キャッシュとモデルの変更を通知し、他のワーカーからの通知を受け取る
+        """
+        from app.core.Cache import Cache
+        from app.core.Events import Events
+        Cache.on_change(self.publish)
+        Events.on_publish(self.publish_events)
+        threading.Thread(target=self._listen, name="fletmvc-invalidation", daemon=True).start()
+        return self
+
+    def publish(self, config, keys):
+        """
+        他のワーカーにキャッシュの無効化を通知する
+
+        Args:
+            config: CACHE 設定の名前
+            keys: 無効化するキーのリスト（Noneの場合は全て）
+        """
+        if keys is not None and not all(isinstance(key, str) for key in keys):
+            # 文字列以外のキーは送れないため設定ごと無効化する
+            keys = None
+        message = json.dumps({'worker': self._index, 'config': config, 'keys': keys}).encode('utf-8')
+        if len(message) > 60000:
+            message = json.dumps({'worker': self._index, 'config': config, 'keys': None}).encode('utf-8')
+        self._send(message)
+
+    def publish_events(self, changes):
+        """
+        他のワーカーにモデルの変更を通知する
+
+        Args:
+            changes: {テーブル名: [(主キー, 操作), ...]}
+        """
+        for table, rows in changes.items():
+            for start in range(0, len(rows), EVENTS_PER_MESSAGE):
+                try:
+                    message = json.dumps({
+                        'worker': self._index,
+                        'events': {table: rows[start:start + EVENTS_PER_MESSAGE]},
+                    }).encode('utf-8')
+                except TypeError:
+                    # JSONにできない主キーの変更は他のワーカーに届かない
+                    logger.warning("テーブル '%s' の変更を他のワーカーに通知できません", table)
+                    break
+                self._send(message)
+
+    def _send(self, message):
+        for peer in self._peers:
+            try:
+                self._socket.sendto(message, peer)
+            except OSError:
+                pass
+
+    def _listen(self):
+        from app.core.Cache import Cache
+        from app.core.Events import Events
+        while True:
+            try:
+                data, _ = self._socket.recvfrom(65535)
+                message = json.loads(data)
+                if 'events' in message:
+                    Events.receive(message['events'])
+                else:
+                    Cache.invalidate_local(message['config'], message['keys'])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("不正な無効化通知を受信しました: %s", e)
+            except OSError:
+                return
+
+
+def _run_worker(index, port, ipc_ports):
+    """
+    ワーカープロセスのエントリーポイント
+
+    Args:
+        index: ワーカー番号
+        port: Fletアプリを待ち受けるポート
+        ipc_ports: 全ワーカーの通知用ポートのリスト
+    """
+    # ワーカー番号はログレコードの worker に付与される（ジョブの子プロセスにも引き継がれる）
+    os.environ[WORKER_ENV] = str(index)
+    configure()
+
+    import flet as ft
+    import main
+    from app.core.Jobs import Jobs
+    from app.core.Metrics import Metrics
+
+    InvalidationChannel(index, ipc_ports).start()
+    Jobs.start()
+    
+    # メトリクスはワーカーごとにポートとファイルを分ける
+    metrics = getattr(app, 'METRICS', {})
+    if metrics.get('enabled', True):
+        if metrics.get('port'):
+            Metrics.serve(metrics['port'] + index, metrics.get('host', '127.0.0.1'))
+        if metrics.get('file'):
+            atexit.register(Metrics.dump, f"{metrics['file']}.{index}")
+    
+    logger.info("ワーカー %d をポート %d で起動します", index, port)
+    ft.app(target=main.main, port=port)
+
+
+class Dispatcher:
+    """
+    クライアントの接続をワーカーに中継するTCPプロキシ
+    同じクライアントアドレスからの接続（HTTPとWebSocket）は常に同じワーカーに送られます
+    """
+
+    def __init__(self, host, port, worker_ports):
+        """
+        Dispatcherオブジェクトの初期化
+
+        Args:
+            host: 待ち受けアドレス
+            port: 待ち受けポート
+            worker_ports: ワーカーのポートのリスト
+        """
+        self._host = host
+        self._port = port
+        self._worker_ports = worker_ports
+
+    def pick(self, client_host):
+        """
+        クライアントアドレスから担当ワーカーのポートを決める
+
+        Args:
+            client_host: クライアントのIPアドレス
+
+        Returns:
+            ワーカーのポート
+        """
+        return self._worker_ports[zlib.crc32(client_host.encode('utf-8')) % len(self._worker_ports)]
+
+    async def _pipe(self, reader, writer):
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        client_host = client_writer.get_extra_info('peername')[0]
+        port = self.pick(client_host)
+        try:
+            worker_reader, worker_writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError as e:
+            logger.warning("ワーカー(ポート %d)に接続できません: %s", port, e)
+            client_writer.close()
+            return
+        await asyncio.gather(
+            self._pipe(client_reader, worker_writer),
+            self._pipe(worker_reader, client_writer),
+        )
+
+    async def serve(self):
+        """
+        ディスパッチャーを起動する
+        """
+        server = await asyncio.start_server(self._handle, self._host, self._port)
+        logger.info("ディスパッチャーを %s:%d で起動しました", self._host, self._port)
+        async with server:
+            await server.serve_forever()
+
+
+def run(workers=None, host=None, port=None):
+    """
+    ワーカープロセスとディスパッチャーを起動する
+
+    Args:
+        workers: ワーカー数（省略時は CLUSTER['workers'] またはCPU数）
+        host: 待ち受けアドレス
+        port: 待ち受けポート
+    """
+    configure()
+    config = _config()
+    workers = workers or config.get('workers') or os.cpu_count() or 1
+    host = host or config.get('host', '0.0.0.0')
+    port = port or int(os.getenv("PORT", config.get('port', 5000)))
+    worker_base_port = config.get('worker_base_port', 8550)
+    ipc_base_port = config.get('ipc_base_port', 8650)
+
+    worker_ports = [worker_base_port + i for i in range(workers)]
+    ipc_ports = [ipc_base_port + i for i in range(workers)]
+
+    # fork ではなく spawn で起動し、ワーカーごとに独立した状態を持たせる
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_run_worker, args=(i, worker_ports[i], ipc_ports), name=f"fletmvc-worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def stop(*_):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        asyncio.run(Dispatcher(host, port, worker_ports).serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(timeout=5)
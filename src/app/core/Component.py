@@ -0,0 +1,178 @@
+"""
+Component Module
+
+このモジュールはプール可能なエレメント（部分テンプレート）の基底クラスを定義します。
+コンポーネントは静的なコントロールの構造を build で一度だけ組み立て、
+表示ごとに変わる値（props）だけを update で差し替えます。
+組み立て済みの構造はセッションごとに追跡され、次の画面が描画されて
+画面から外れた時点でプールに戻され、以降の描画で再利用されます。
+
+使用例（エレメント）:
+    class Badge(Component):
+        props = {'label': ""}
+
+        def build(self):
+            self.text = ft.Text()
+            return ft.Container(content=self.text, padding=4)
+
+        def update(self, label):
+            self.text.value = label
+
+    def main(page=None, **params):
+        return Badge.render(page, **params)
+
+使用例（テンプレート）:
+    from templates.elements.alert import Alert
+
+    controls = [Alert.render(page, message=m.text, type="error") for m in messages]
+"""
+
+import threading
+from app.core.Metrics import Metrics
+
+
+class Component:
+    """
+    プール可能なエレメントの基底クラス
+    サブクラスは build と update を実装し、props に動的なプロパティの既定値を宣言します
+    """
+
+    props = {}       # 動的なプロパティ名 -> 既定値
+    pool_size = 256  # クラスごとにプールしておく上限
+
+    _lock = threading.Lock()
+    _pools = {}      # コンポーネントクラス -> 再利用できるインスタンスのリスト
+    _in_use = {}     # セッションID -> 現在の画面で使用中のインスタンスのリスト
+
+    def __init__(self):
+        """
+        Componentオブジェクトの初期化（静的な構造を組み立てる）
+        """
+        self.root = self.build()
+
+    def build(self):
+        """
+        静的なコントロールの構造を組み立てる（インスタンスごとに一度だけ呼び出される）
+
+        Returns:
+            ルートのコントロール
+        """
+        raise NotImplementedError
+
+    def update(self, **props):
+        """
+        動的なプロパティをコントロールに反映する
+
+        Args:
+            **props: props で宣言したプロパティ
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def render(cls, page=None, **params):
+        """
+        プールから構造を取り出し（なければ組み立て）、プロパティを反映して返す
+
+        Args:
+            page: fletのPageオブジェクト（使用中のインスタンスの追跡に使用）
+            **params: プロパティ（宣言されていないものは無視されます）
+
+        Returns:
+            ルートのコントロール
+        """
+        instance = None
+        with Component._lock:
+            pool = Component._pools.get(cls, ())
+            for i in range(len(pool) - 1, -1, -1):
+                # まだ画面に残っているもの（別のセッションで表示中など）は再利用せず、プールに残す
+                if pool[i].root.page is None:
+                    instance = pool.pop(i)
+                    break
+            if instance is not None:
+                Metrics.inc('fletmvc_component_total', component=cls.__name__, result='reused')
+
+        if instance is None:
+            instance = cls()
+            Metrics.inc('fletmvc_component_total', component=cls.__name__, result='built')
+
+        props = dict(cls.props)
+        props.update((name, value) for name, value in params.items() if name in props)
+        instance.update(**props)
+
+        if page is not None:
+            session_id = getattr(page, 'session_id', None)
+            with Component._lock:
+                Component._in_use.setdefault(session_id, []).append(instance)
+        return instance.root
+
+    @staticmethod
+    def begin_render(page):
+        """
+        新しい画面の描画を開始する
+
+        Args:
+            page: fletのPageオブジェクト
+
+        Returns:
+            直前の画面で使用していたインスタンスのリスト（end_render に渡す）
+        """
+        with Component._lock:
+            return Component._in_use.pop(getattr(page, 'session_id', None), [])
+
+    @staticmethod
+    def end_render(previous):
+        """
+        新しい画面の描画後、直前の画面で使用していたインスタンスをプールに戻す
+
+        Args:
+            previous: begin_render が返したリスト
+        """
+        with Component._lock:
+            for instance in previous:
+                pool = Component._pools.setdefault(type(instance), [])
+                if len(pool) < instance.pool_size:
+                    pool.append(instance)
+
+    @staticmethod
+    def pooled():
+        """
+        プールしているインスタンスの数を取得する
+
+        Returns:
+            全クラスの合計
+        """
+        with Component._lock:
+            return sum(len(pool) for pool in Component._pools.values())
+
+    @staticmethod
+    def clear_pools():
+        """
+        プールしているインスタンスを破棄する（メモリが不足した場合に使用）
+        """
+        with Component._lock:
+            Component._pools.clear()
+
+    @staticmethod
+    def usage(page):
+        """
+        セッションが現在の画面で使用中のインスタンスの数を取得する
+
+        Args:
+            page: fletのPageオブジェクト
+
+        Returns:
+            インスタンスの数
+        """
+        with Component._lock:
+            return len(Component._in_use.get(getattr(page, 'session_id', None), ()))
+
+    @staticmethod
+    def forget(page):
+        """
+        セッションの使用中のインスタンスを破棄する
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        with Component._lock:
+            Component._in_use.pop(getattr(page, 'session_id', None), None)
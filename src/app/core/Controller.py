@@ -6,19 +6,25 @@ Controller Module
 """
 
 import importlib
-import os
-import re
-import flet as ft
+from app.core.Bundle import Bundle
+from app.core.Component import Component
+from app.core.Discovery import Discovery
+from app.core.Log import get_logger, log_context
+from app.core.Metrics import Metrics
 from app.core.Request import Request
 from app.core.Response import Response
 from app.core.View import View
 
+logger = get_logger(__name__)
+
 class Controller:
     """
     コントローラーを管理するファクトリークラス
     コントローラーの読み込みと実行を担当します
     """
     
+    _instances = {}  # コントローラークラス名 -> 共有するインスタンス
+    
     @staticmethod
     def load(controller_name):
         """
@@ -28,7 +34,7 @@ class Controller:
             controller_name: コントローラーの名前
             
         Returns:
-            コントローラーのインスタンス
+            コントローラーのインスタンス（状態を持たないため全セッションで共有される）
         """
         # コントローラー名を正規化
         controller_class_name = Controller._normalize_controller_name(controller_name)
@@ -39,10 +45,13 @@ class Controller:
             module = importlib.import_module(module_path)
             controller_class = getattr(module, controller_class_name)
             
-            # インスタンスを作成して返す
-            return controller_class()
+            # インスタンスはクラスごとに1つだけ作る（モジュールが読み込み直された場合は作り直す）
+            controller = Controller._instances.get(controller_class_name)
+            if type(controller) is not controller_class:
+                controller = Controller._instances[controller_class_name] = controller_class()
+            return controller
         except (ImportError, AttributeError) as e:
-            print(f"コントローラーのロードに失敗しました: {e}")
+            logger.warning("コントローラーのロードに失敗しました: %s", e)
             return None
     
     @staticmethod
@@ -88,18 +97,12 @@ class Controller:
         Returns:
             利用可能なコントローラー名のリスト
         """
-        controllers = []
-        controllers_dir = os.path.join('src', 'app', 'controllers')
+        # 事前構築バンドルがあればディレクトリを走査しない
+        bundled = Bundle.get('controllers')
+        if bundled is not None:
+            return [f"{name}Controller" for name in bundled]
         
-        if not os.path.exists(controllers_dir):
-            return controllers
-            
-        for filename in os.listdir(controllers_dir):
-            if filename.endswith('Controller.py') and filename != '__init__.py':
-                controller_name = filename[:-3]  # .pyを除去
-                controllers.append(controller_name)
-                
-        return controllers
+        return Discovery.modules('app.controllers', suffix='Controller')
     
     @staticmethod
     def execute(page, controller_name, action_name="index", params=None):
@@ -113,7 +116,7 @@ class Controller:
             params: ルートパラメータ
             
         Returns:
-            アクションの実行結果
+            Responseオブジェクト（コントローラーやアクションが見つからない場合はNone）
         """
         # パラメータの初期化
         if params is None:
@@ -125,35 +128,58 @@ class Controller:
         else:
             base_controller_name = controller_name
             
-        # コントローラーをロード
-        controller = Controller.load(base_controller_name)
-        if controller is None:
-            from app.core.ErrorHandler import handle_404
-            handle_404(page, f"{base_controller_name}:{action_name}")
-            return None
+        with log_context(controller=base_controller_name, action=action_name):
+            # コントローラーをロード
+            with Metrics.stage("load"):
+                controller = Controller.load(base_controller_name)
+            if controller is None:
+                from app.core.ErrorHandler import handle_404
+                handle_404(page, f"{base_controller_name}:{action_name}")
+                return None
             
-        # リクエストとレスポンスを作成
-        route = f"{base_controller_name}:{action_name}"
-        request = Request(page, route, params)
-        response = Response(page)
-        
-        # コントローラーの初期化
-        controller.initialize(request, response)
-        
-        # アクションメソッドの存在確認
-        if not hasattr(controller, action_name):
-            from app.core.ErrorHandler import handle_404
-            handle_404(page, route)
-            return None
+            # アクションの存在確認（クラスの定義時に作成された一覧を参照する）
+            route = f"{base_controller_name}:{action_name}"
+            action = controller.actions.get(action_name)
+            if action is None:
+                from app.core.ErrorHandler import handle_404
+                handle_404(page, route)
+                return None
             
-        # アクションの実行
-        action_method = getattr(controller, action_name)
-        result = action_method()
-        
-        # ビューをレンダリング
-        view = View(base_controller_name, action_name, controller.get_layout())
-        controls = view.render(page, controller.get_view_vars())
-        
-        response.set_controls(controls).render(route)
-        
-        return result
+            # リクエストとレスポンスを作成（使い終わったものを再利用する）
+            request = Request.acquire(page, route, params)
+            response = Response.acquire(page)
+            
+            # リクエストごとの状態はコンテキストに保持し、コントローラーのインスタンスは共有する
+            try:
+                with controller.dispatch(request, response) as context:
+                    # アクションの実行
+                    logger.debug("アクションを実行します: %s", route)
+                    with Metrics.stage("action"):
+                        result = action.function(controller)
+                    
+                    # アクションが別のレスポンスを返した場合はそちらを使う
+                    if isinstance(result, Response) and result is not response:
+                        Response.release(response)
+                        response = result
+                    
+                    # アクションがリダイレクトした場合はビューを描画しない
+                    if response.is_redirect():
+                        logger.debug("リダイレクトのためビューを描画しません: %s -> %s", route, response.get_redirect())
+                        return response
+                    
+                    # ビューをレンダリング（直前の画面のコンポーネントは描画後にプールへ戻す）
+                    previous = Component.begin_render(page)
+                    try:
+                        with Metrics.stage("render"):
+                            view = View(base_controller_name, action_name, context.layout)
+                            controls = view.render(page, context.view_vars)
+                        Metrics.record_controls(controls)
+                        
+                        response.set_controls(controls).render(route)
+                    finally:
+                        Component.end_render(previous)
+            finally:
+                # リクエストはディスパッチの終了後に参照されないため再利用に戻す
+                Request.release(request)
+            
+            return response
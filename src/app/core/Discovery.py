@@ -0,0 +1,166 @@
+"""
+Discovery Module
+
+このモジュールはコントローラー・モデル・テンプレートのモジュールを検出するサービスを定義します。
+ディレクトリはカレントディレクトリではなくパッケージの位置（__path__）から解決し、
+os.scandir で走査した結果をディレクトリの更新時刻とともにキャッシュします。
+ファイルの追加・削除でディレクトリの更新時刻が変わると再走査し、登録されたコールバックに通知します。
+
+使用例:
+    from app.core.Discovery import Discovery
+
+    Discovery.modules('app.controllers', suffix='Controller')
+    Discovery.resolve('tmp/cache/')   # プロジェクトのルートからのパス
+    Discovery.on_change(lambda package: print(f"{package} が変更されました"))
+"""
+
+import importlib
+import os
+import threading
+
+
+class Discovery:
+    """
+    パッケージ配下のモジュールを検出するクラス
+    """
+
+    _lock = threading.Lock()
+    _scans = {}      # ディレクトリ -> (更新時刻, ファイル名のタプル, サブディレクトリ名のタプル)
+    _listeners = []
+
+    @staticmethod
+    def package_dirs(package):
+        """
+        パッケージのディレクトリ一覧を取得する
+
+        Args:
+            package: パッケージ名（例: app.controllers）
+
+        Returns:
+            ディレクトリの絶対パスのリスト
+        """
+        try:
+            module = importlib.import_module(package)
+        except ImportError:
+            return []
+        return [os.path.abspath(path) for path in getattr(module, '__path__', [])]
+
+    @staticmethod
+    def root():
+        """
+        プロジェクトのルート（app パッケージのあるディレクトリ）を取得する
+
+        Returns:
+            ディレクトリの絶対パス
+        """
+        import app
+        return os.path.dirname(os.path.dirname(os.path.abspath(app.__file__)))
+
+    @staticmethod
+    def resolve(path):
+        """
+        設定の相対パスをカレントディレクトリではなくプロジェクトのルートから解決する
+
+        Args:
+            path: ファイルまたはディレクトリのパス（絶対パスはそのまま返す）
+
+        Returns:
+            絶対パス
+        """
+        if not path or os.path.isabs(path):
+            return path
+        return os.path.join(Discovery.root(), path)
+
+    @staticmethod
+    def _scan(directory):
+        """
+        ディレクトリを走査する（更新時刻が変わっていなければキャッシュを返す）
+
+        Args:
+            directory: ディレクトリのパス
+
+        Returns:
+            (ファイル名のタプル, サブディレクトリ名のタプル, 再走査したかどうか)
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            with Discovery._lock:
+                changed = Discovery._scans.pop(directory, None) is not None
+            return (), (), changed
+
+        cached = Discovery._scans.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2], False
+
+        files = []
+        dirs = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if entry.name != '__pycache__':
+                        dirs.append(entry.name)
+                elif entry.name.endswith('.py'):
+                    files.append(entry.name)
+        files = tuple(sorted(files))
+        dirs = tuple(sorted(dirs))
+
+        with Discovery._lock:
+            Discovery._scans[directory] = (mtime, files, dirs)
+        return files, dirs, cached is not None
+
+    @staticmethod
+    def modules(package, suffix='', exclude=(), recursive=False):
+        """
+        パッケージ配下のモジュール名を取得する
+
+        Args:
+            package: パッケージ名
+            suffix: モジュール名の末尾（例: Controller）
+            exclude: 除外するモジュール名
+            recursive: サブディレクトリも走査するかどうか（名前はドット区切りになります）
+
+        Returns:
+            パッケージからの相対モジュール名のリスト
+        """
+        names = []
+        changed = False
+        pending = [(directory, '') for directory in Discovery.package_dirs(package)]
+        while pending:
+            directory, prefix = pending.pop()
+            files, dirs, rescanned = Discovery._scan(directory)
+            changed = changed or rescanned
+            for filename in files:
+                name = filename[:-3]
+                if filename == '__init__.py' or not name.endswith(suffix) or name in exclude:
+                    continue
+                names.append(prefix + name)
+            if recursive:
+                pending.extend((os.path.join(directory, d), f"{prefix}{d}.") for d in dirs)
+
+        if changed:
+            Discovery._notify(package)
+        return sorted(set(names))
+
+    @staticmethod
+    def on_change(callback):
+        """
+        走査結果が前回から変わったときに呼び出すコールバックを登録する
+
+        Args:
+            callback: callback(package) の形の関数
+        """
+        Discovery._listeners.append(callback)
+
+    @staticmethod
+    def _notify(package):
+        for callback in Discovery._listeners:
+            callback(package)
+
+    @staticmethod
+    def invalidate():
+        """
+        キャッシュした走査結果を破棄する
+        """
+        with Discovery._lock:
+            Discovery._scans.clear()
@@ -5,6 +5,7 @@ Error Handler Module
 """
 
 import flet as ft
+from app.core.Updates import Updates
 
 def handle_404(page, route):
     """
@@ -82,4 +83,4 @@ def _show_error_page(page, route, controls):
     page.views.append(
         ft.View(route=route, controls=controls)
     )
-    page.update()
+    Updates.request(page)
@@ -0,0 +1,267 @@
+"""
+Events Module
+
+このモジュールはモデルの変更を開いている画面へ通知する仕組み（publish/subscribe）を定義します。
+AppModel の書き込み（save / delete_instance / save_records / delete_records など）は
+テーブルと主キーごとに変更を発行し、画面やリストのコンポーネントは
+テーブルを購読して変更された行だけを差し替えます。
+
+トランザクション中の変更はコミット時にまとめて発行され、ロールバックされた変更は破棄されます。
+発行された変更は EVENTS['interval'] 秒ごとにテーブル単位でまとめて配信され、
+各セッションのコールバックは1つの Updates.batch の中で呼び出されるため、
+一括書き込みでも画面の更新はセッションごとに1回になります。
+マルチプロセス構成（app.core.Cluster）では、配信間隔ごとにまとめた変更を
+他のワーカーへも転送し、各ワーカーのセッションに配信します。
+
+使用例:
+    from app.core.Events import Events
+
+    def on_change(changes):
+        # changes: [(操作, 主キー), ...]  操作は created / updated / deleted
+        for action, pk in changes:
+            ...
+        Updates.request(page, list_view)
+
+    Events.subscribe(User, on_change, page)
+"""
+
+import threading
+from app.core.Log import get_logger
+from app.core.Metrics import Metrics
+from app.core.Updates import Updates
+from config import app
+
+logger = get_logger(__name__)
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+
+def _config():
+    return getattr(app, 'EVENTS', {})
+
+
+def _table(model_or_table):
+    if isinstance(model_or_table, str):
+        return model_or_table
+    return model_or_table._meta.table_name
+
+
+def _merge(previous, action):
+    """
+    同じ行への変更をまとめる
+
+    Args:
+        previous: 配信待ちの操作（なければNone）
+        action: 新しい操作
+
+    Returns:
+        まとめた操作（作成して削除した場合はNone）
+    """
+    if previous == CREATED:
+        if action == DELETED:
+            return None
+        return CREATED
+    return action
+
+
+class Events:
+    """
+    モデルの変更を通知するクラス
+    """
+
+    _lock = threading.Lock()
+    _subscribers = {}  # テーブル名 -> [(コールバック, Pageオブジェクト)]
+    _pending = {}      # テーブル名 -> {主キー: 操作}（発行順）
+    _outgoing = {}     # テーブル名 -> {主キー: 操作}（他のプロセスへの転送待ち）
+    _forwarders = []   # 他のプロセスへ変更を転送する関数
+    _timer = None
+
+    @staticmethod
+    def subscribe(model_or_table, callback, page=None):
+        """
+        テーブルの変更を購読する
+
+        Args:
+            model_or_table: モデルクラスまたはテーブル名
+            callback: 変更時に呼び出す関数 callback(changes)
+            page: fletのPageオブジェクト（指定するとセッションの終了時に解除され、
+                  コールバックはそのセッションの Updates.batch の中で呼び出されます）
+
+        Returns:
+            購読を解除する関数
+        """
+        table = _table(model_or_table)
+        entry = (callback, page)
+        with Events._lock:
+            Events._subscribers.setdefault(table, []).append(entry)
+
+        def unsubscribe():
+            with Events._lock:
+                subscribers = Events._subscribers.get(table, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    Events._subscribers.pop(table, None)
+        return unsubscribe
+
+    @staticmethod
+    def on_publish(callback):
+        """
+        発行された変更を他のプロセスへ転送する関数を登録する（Cluster のワーカー間通知で使用）
+
+        Args:
+            callback: 配信間隔ごとに呼び出す関数 callback(changes)
+                      changes は {テーブル名: [(主キー, 操作), ...]}
+        """
+        with Events._lock:
+            Events._forwarders.append(callback)
+
+    @staticmethod
+    def publish(model_or_table, action, pk):
+        """
+        変更を発行する（購読者への配信は次の配信間隔でまとめて行う）
+
+        Args:
+            model_or_table: モデルクラスまたはテーブル名
+            action: created / updated / deleted
+            pk: 変更された行の主キー
+        """
+        table = _table(model_or_table)
+        Metrics.inc('fletmvc_model_events_total', table=table, action=action)
+        with Events._lock:
+            queued = False
+            if Events._forwarders:
+                Events._queue(Events._outgoing, table, action, pk)
+                queued = True
+            if table in Events._subscribers:
+                Events._queue(Events._pending, table, action, pk)
+                queued = True
+            if queued:
+                Events._schedule()
+
+    @staticmethod
+    def receive(changes):
+        """
+        他のプロセスで発行された変更を受け取る（次の配信間隔でこのプロセスの購読者に配信する）
+
+        Args:
+            changes: {テーブル名: [(主キー, 操作), ...]}
+        """
+        with Events._lock:
+            queued = False
+            for table, rows in changes.items():
+                if table not in Events._subscribers:
+                    continue
+                for pk, action in rows:
+                    Events._queue(Events._pending, table, action, pk)
+                queued = True
+            if queued:
+                Events._schedule()
+
+    @staticmethod
+    def _queue(pending, table, action, pk):
+        """
+        配信待ちの変更に追加する（_lock を取得した状態で呼び出す）
+        """
+        changes = pending.setdefault(table, {})
+        merged = _merge(changes.pop(pk, None), action)
+        if merged is not None:
+            changes[pk] = merged
+
+    @staticmethod
+    def _schedule():
+        """
+        次の配信間隔に配信する（_lock を取得した状態で呼び出す）
+        """
+        if Events._timer is not None:
+            return
+        Events._timer = threading.Timer(_config().get('interval', 0.05), Events.deliver)
+        Events._timer.daemon = True
+        Events._timer.start()
+
+    @staticmethod
+    def deliver():
+        """
+        配信待ちの変更を購読者に配信する
+        """
+        with Events._lock:
+            if Events._timer is not None:
+                Events._timer.cancel()
+                Events._timer = None
+            pending = Events._pending
+            Events._pending = {}
+            outgoing = {table: list(changes.items()) for table, changes in Events._outgoing.items() if changes}
+            Events._outgoing = {}
+            forwarders = list(Events._forwarders)
+            # セッションごとに、そのセッションが購読しているテーブルの変更をまとめる
+            sessions = {}
+            for table, changes in pending.items():
+                if not changes:
+                    continue
+                changes = list(changes.items())
+                for callback, page in Events._subscribers.get(table, ()):
+                    key = getattr(page, 'session_id', None) if page is not None else id(callback)
+                    sessions.setdefault(key, (page, []))[1].append((callback, changes))
+
+        if outgoing:
+            for forward in forwarders:
+                try:
+                    forward(outgoing)
+                except Exception as e:
+                    logger.warning("モデルの変更の転送に失敗しました: %s", e)
+
+        for page, calls in sessions.values():
+            if page is None:
+                Events._call(calls)
+                continue
+            with Updates.batch(page):
+                Events._call(calls)
+
+    @staticmethod
+    def _call(calls):
+        for callback, changes in calls:
+            try:
+                callback([(action, pk) for pk, action in changes])
+            except Exception as e:
+                logger.warning("モデルの変更の通知に失敗しました: %s", e)
+
+    @staticmethod
+    def usage(page):
+        """
+        セッションが購読しているテーブルの購読数を取得する
+
+        Args:
+            page: fletのPageオブジェクト
+
+        Returns:
+            購読数
+        """
+        session_id = getattr(page, 'session_id', None)
+        with Events._lock:
+            return sum(
+                1 for subscribers in Events._subscribers.values()
+                for _, subscriber_page in subscribers
+                if subscriber_page is not None and getattr(subscriber_page, 'session_id', None) == session_id
+            )
+
+    @staticmethod
+    def forget(page):
+        """
+        セッションの購読を解除する
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        session_id = getattr(page, 'session_id', None)
+        with Events._lock:
+            for table in list(Events._subscribers):
+                subscribers = [
+                    entry for entry in Events._subscribers[table]
+                    if entry[1] is None or getattr(entry[1], 'session_id', None) != session_id
+                ]
+                if subscribers:
+                    Events._subscribers[table] = subscribers
+                else:
+                    del Events._subscribers[table]
@@ -0,0 +1,392 @@
+"""
+Form Module
+
+このモジュールはモデルのフィールド定義から入力フォームを生成する仕組みを定義します。
+フィールドごとの変換・検証処理はモデルごとに一度だけ組み立ててキャッシュし、
+送信時は全フィールドをまとめて検証してエラーを1回の更新で画面に反映します。
+保存は1つのトランザクションで行います。
+
+一意制約のあるフィールド（User.username など）は入力が止まってから
+FORM['debounce'] 秒後にバックグラウンドで重複を確認します。
+
+使用例（テンプレート）:
+    from app.core.Form import Form
+    from app.models.User import User
+
+    form = Form(page, User, exclude=("salt",), on_saved=lambda record: page.go("/user"))
+    return [form.build()]
+"""
+
+import threading
+import flet as ft
+from peewee import IntegrityError
+from app.core.Log import get_logger
+from app.core.Updates import Updates
+from config import app
+
+logger = get_logger(__name__)
+
+# peeweeのフィールド型 -> 入力値の種類
+_KINDS = {
+    'AUTO': 'int',
+    'INT': 'int',
+    'BIGINT': 'int',
+    'SMALLINT': 'int',
+    'FLOAT': 'float',
+    'DOUBLE': 'float',
+    'DECIMAL': 'float',
+    'BOOL': 'bool',
+}
+
+
+def _config():
+    return getattr(app, 'FORM', {})
+
+
+class FieldSpec:
+    """
+    1つのフィールドの変換・検証処理
+    """
+
+    def __init__(self, field):
+        """
+        FieldSpecオブジェクトの初期化
+
+        Args:
+            field: peeweeのフィールド
+        """
+        self.name = field.name
+        self.label = field.verbose_name or field.name
+        self.field = field
+        self.kind = _KINDS.get(field.field_type, 'str')
+        self.required = not field.null and field.default is None and self.kind != 'bool'
+        self.unique = field.unique
+        self.choices = [value for value, _ in field.choices] if field.choices else None
+        self.default = field.default() if callable(field.default) else field.default
+        self._checks = self._compile(getattr(field, 'max_length', None))
+
+    def _compile(self, max_length):
+        """
+        入力値の検証処理を組み立てる
+
+        Returns:
+            check(value) -> エラーメッセージまたはNone の関数のリスト
+        """
+        label = self.label
+        checks = []
+        if max_length:
+            checks.append(
+                lambda value: f"{label}は{max_length}文字以内で入力してください"
+                if isinstance(value, str) and len(value) > max_length else None
+            )
+        if self.choices is not None:
+            choices = set(self.choices)
+            checks.append(lambda value: f"{label}の値が正しくありません" if value not in choices else None)
+        return checks
+
+    def clean(self, raw):
+        """
+        入力値を変換して検証する
+
+        Args:
+            raw: コントロールの値
+
+        Returns:
+            (変換後の値, エラーメッセージまたはNone)
+        """
+        if self.kind == 'bool':
+            return bool(raw), None
+
+        if raw is None or (isinstance(raw, str) and raw.strip() == ""):
+            if self.required:
+                return None, f"{self.label}は必須です"
+            return self.default, None
+
+        value = raw
+        if self.kind == 'int':
+            try:
+                value = int(raw)
+            except (TypeError, ValueError):
+                return None, f"{self.label}は整数で入力してください"
+        elif self.kind == 'float':
+            try:
+                value = float(raw)
+            except (TypeError, ValueError):
+                return None, f"{self.label}は数値で入力してください"
+
+        for check in self._checks:
+            error = check(value)
+            if error:
+                return value, error
+        return value, None
+
+    def exists(self, model, value, record=None):
+        """
+        同じ値を持つ別のレコードがあるかどうかを確認する
+
+        Args:
+            model: モデルクラス
+            value: 確認する値
+            record: 編集中のレコード（自身は除外する）
+
+        Returns:
+            別のレコードがある場合はTrue
+        """
+        query = model.select().where(self.field == value)
+        if record is not None:
+            primary_key = model._meta.primary_key
+            query = query.where(primary_key != getattr(record, primary_key.name))
+        return query.exists()
+
+    def control(self, value):
+        """
+        入力用のコントロールを作成する
+
+        Args:
+            value: 初期値
+
+        Returns:
+            fletのコントロール
+        """
+        if self.kind == 'bool':
+            return ft.Checkbox(label=self.label, value=bool(value))
+        if self.choices is not None:
+            return ft.Dropdown(
+                label=self.label,
+                value=None if value is None else str(value),
+                options=[ft.dropdown.Option(str(choice)) for choice in self.choices],
+            )
+        return ft.TextField(
+            label=self.label,
+            value="" if value is None else str(value),
+            password='password' in self.name,
+            can_reveal_password='password' in self.name,
+            keyboard_type=ft.KeyboardType.NUMBER if self.kind in ('int', 'float') else None,
+        )
+
+
+class FormSchema:
+    """
+    モデルのフォーム定義（モデルと除外フィールドの組み合わせごとに一度だけ作成されます）
+    """
+
+    _lock = threading.Lock()
+    _schemas = {}  # (モデルクラス, 除外フィールド) -> FormSchema
+
+    def __init__(self, model, exclude=()):
+        """
+        FormSchemaオブジェクトの初期化
+
+        Args:
+            model: モデルクラス
+            exclude: フォームに含めないフィールド名
+        """
+        self.model = model
+        primary_key = model._meta.primary_key
+        self.fields = [
+            FieldSpec(field)
+            for field in model._meta.sorted_fields
+            if field is not primary_key and field.name not in exclude
+        ]
+
+    @staticmethod
+    def for_model(model, exclude=()):
+        """
+        モデルのフォーム定義を取得する（キャッシュ済みのものを返す）
+
+        Args:
+            model: モデルクラス
+            exclude: フォームに含めないフィールド名
+
+        Returns:
+            FormSchemaのインスタンス
+        """
+        key = (model, tuple(sorted(exclude)))
+        schema = FormSchema._schemas.get(key)
+        if schema is None:
+            with FormSchema._lock:
+                schema = FormSchema._schemas.get(key)
+                if schema is None:
+                    schema = FormSchema._schemas[key] = FormSchema(model, exclude)
+        return schema
+
+    def validate(self, raw_values, record=None):
+        """
+        全フィールドをまとめて検証する
+
+        Args:
+            raw_values: フィールド名 -> コントロールの値 の辞書
+            record: 編集中のレコード
+
+        Returns:
+            (変換後の値の辞書, フィールド名 -> エラーメッセージ の辞書)
+        """
+        values = {}
+        errors = {}
+        for spec in self.fields:
+            value, error = spec.clean(raw_values.get(spec.name))
+            values[spec.name] = value
+            if error:
+                errors[spec.name] = error
+            elif spec.unique and value is not None and spec.exists(self.model, value, record):
+                errors[spec.name] = f"この{spec.label}は既に使われています"
+        return values, errors
+
+    def save(self, values, record=None):
+        """
+        1つのトランザクションでレコードを保存する
+
+        Args:
+            values: 変換後の値の辞書
+            record: 更新するレコード（Noneの場合は新規作成）
+
+        Returns:
+            保存したレコード
+        """
+        with self.model._meta.database.atomic():
+            # フォームに含めないフィールド（ソルトなど）はモデルが補完する
+            values = self.model.prepare_form_values(dict(values), record)
+            if record is None:
+                return self.model.create(**values)
+            for name, value in values.items():
+                setattr(record, name, value)
+            record.save()
+            return record
+
+
+class Form:
+    """
+    モデルの入力フォーム
+    """
+
+    def __init__(self, page, model, record=None, exclude=(), on_saved=None, submit_text="SUBMIT"):
+        """
+        Formオブジェクトの初期化
+
+        Args:
+            page: fletのPageオブジェクト
+            model: モデルクラス
+            record: 編集するレコード（Noneの場合は新規作成）
+            exclude: フォームに含めないフィールド名
+            on_saved: 保存後に呼び出す関数 on_saved(record)
+            submit_text: 送信ボタンのラベル
+        """
+        self.page = page
+        self.model = model
+        self.record = record
+        self.schema = FormSchema.for_model(model, exclude)
+        self.on_saved = on_saved
+        self.submit_text = submit_text
+        self.controls = {}
+        self.root = None
+        self._timers = {}
+        self._debounce = _config().get('debounce', 0.4)
+
+    def build(self):
+        """
+        フォームのコントロールを作成する
+
+        Returns:
+            フォーム全体のコントロール
+        """
+        for spec in self.schema.fields:
+            value = getattr(self.record, spec.name) if self.record is not None else spec.default
+            control = spec.control(value)
+            if spec.unique:
+                control.on_change = lambda e, spec=spec: self._schedule_check(spec)
+            self.controls[spec.name] = control
+
+        self.root = ft.Column(
+            controls=list(self.controls.values()) + [
+                ft.ElevatedButton(text=self.submit_text, on_click=self.submit)
+            ],
+            spacing=10,
+        )
+        return self.root
+
+    def values(self):
+        """
+        コントロールの現在の値を取得する
+
+        Returns:
+            フィールド名 -> コントロールの値 の辞書
+        """
+        return {name: control.value for name, control in self.controls.items()}
+
+    def submit(self, e=None):
+        """
+        全フィールドを検証し、エラーがなければ保存する
+
+        Returns:
+            保存したレコード（エラーがある場合はNone）
+        """
+        for timer in self._timers.values():
+            timer.cancel()
+
+        # 全フィールドのエラー表示を1回の更新で送信する
+        with Updates.batch(self.page):
+            return self._submit()
+
+    def _submit(self):
+        values, errors = self.schema.validate(self.values(), self.record)
+        if not errors:
+            try:
+                self.record = self.schema.save(values, self.record)
+            except IntegrityError as error:
+                # 検証後に他のセッションが同じ値を保存した場合は検証し直してエラーを表示する
+                logger.warning("フォームの保存に失敗しました: %s", error)
+                errors = self.schema.validate(self.values(), self.record)[1] or {None: "保存に失敗しました"}
+
+        self._apply_errors(errors)
+        if errors:
+            return None
+        if self.on_saved is not None:
+            self.on_saved(self.record)
+        return self.record
+
+    def _apply_errors(self, errors):
+        """
+        全フィールドのエラー表示を書き換え、1回の更新で画面に反映する
+
+        Args:
+            errors: フィールド名 -> エラーメッセージ の辞書
+        """
+        for name, control in self.controls.items():
+            if hasattr(control, 'error_text'):
+                control.error_text = errors.get(name)
+        if None in errors:
+            self.page.open(ft.SnackBar(ft.Text(errors[None])))
+        if self.root is not None:
+            Updates.request(self.page, self.root)
+
+    def _schedule_check(self, spec):
+        """
+        入力が止まってから一意性を確認する（入力のたびにDBへ問い合わせない）
+
+        Args:
+            spec: 確認するフィールド
+        """
+        timer = self._timers.get(spec.name)
+        if timer is not None:
+            timer.cancel()
+        timer = threading.Timer(self._debounce, self._check_unique, (spec, self.controls[spec.name].value))
+        timer.daemon = True
+        self._timers[spec.name] = timer
+        timer.start()
+
+    def _check_unique(self, spec, raw):
+        control = self.controls[spec.name]
+        value, error = spec.clean(raw)
+        try:
+            if error is None and value is not None and spec.exists(self.model, value, self.record):
+                error = f"この{spec.label}は既に使われています"
+        except Exception as e:
+            logger.warning("'%s' の重複確認に失敗しました: %s", spec.name, e)
+            return
+
+        # 確認中に入力が変わった場合や画面から外れた場合は反映しない
+        if control.value != raw or control.page is None:
+            return
+        if control.error_text != error:
+            control.error_text = error
+            Updates.request(self.page, control)
@@ -0,0 +1,641 @@
+"""
+Jobs Module
+
+このモジュールは時間のかかる処理をバックグラウンドで実行するジョブキューを定義します。
+ジョブはSQLiteに保存されるため、アプリケーションを再起動しても失われません。
+実行はスレッドプールまたはプロセスプール（JOBS['executor']）で行います。
+
+ジョブ関数は最初の引数に JobContext を受け取り、job.progress() で進捗を報告します。
+進捗の書き込みと画面への通知は JOBS['progress_interval'] 秒に1回までにまとめられるため、
+1件ごとに progress() を呼び出しても画面の更新は毎秒数回に抑えられます。
+
+使用例（ジョブ関数）:
+    def import_users(job, rows):
+        for i, row in enumerate(rows):
+            User.create(**row)
+            job.progress(i + 1, len(rows), "ユーザーを登録しています")
+        return len(rows)
+
+使用例（コントローラー）:
+    from app.core.Jobs import Jobs
+
+    handle = Jobs.enqueue(import_users, rows)
+    self.set("job", handle)
+
+使用例（テンプレート）:
+    from templates.components.basic import job_progress
+
+    job_progress(page, job)
+"""
+
+import importlib
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import BrokenExecutor
+from app.core.Log import configure, get_logger
+from app.core.Metrics import Metrics
+from config import app
+
+logger = get_logger(__name__)
+
+# ジョブの状態
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+GONE = 'gone'  # 通知のみで使う状態（存在しない、または削除されたジョブ）
+
+
+def _config():
+    return getattr(app, 'JOBS', {})
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner):
+    """
+    ジョブを実行していたプロセスが生きているかどうかを確認する
+    （他のホストのプロセスは確認できないため生きているものとして扱う）
+    """
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname():
+        return bool(owner)
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _resolve(path):
+    """
+    'モジュール:関数名' 形式のパスから関数を取得する
+    """
+    module_name, _, qualname = path.partition(':')
+    target = importlib.import_module(module_name)
+    for name in qualname.split('.'):
+        target = getattr(target, name)
+    return target
+
+
+class JobCancelled(Exception):
+    """
+    ジョブのキャンセルが要求されたときに progress() から送出される例外
+    """
+
+
+class JobStore:
+    """
+    ジョブを保存するSQLiteのテーブル
+    スレッドごとに接続を持ち、WALモードで読み書きします
+    """
+
+    def __init__(self, file):
+        """
+        JobStoreオブジェクトの初期化
+
+        Args:
+            file: SQLiteファイルのパス
+        """
+        self.file = file
+        directory = os.path.dirname(file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, func TEXT NOT NULL, args BLOB NOT NULL, "
+            "status TEXT NOT NULL, progress REAL NOT NULL DEFAULT 0, message TEXT, "
+            "result BLOB, error TEXT, owner TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self._connection().execute(
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)"
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.file, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def insert(self, func, args, kwargs):
+        job_id = uuid.uuid4().hex
+        self._connection().execute(
+            "INSERT INTO jobs (id, func, args, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, func, pickle.dumps((args, kwargs), pickle.HIGHEST_PROTOCOL), QUEUED, time.time())
+        )
+        return job_id
+
+    def claim(self, owner):
+        """
+        待ち行列の先頭のジョブを実行中にする
+
+        Returns:
+            (ジョブID, 関数のパス, 位置引数, キーワード引数) またはNone
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, func, args FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, started_at = ? WHERE id = ?",
+                    (RUNNING, owner, time.time(), row[0])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        args, kwargs = pickle.loads(row[2])
+        return row[0], row[1], args, kwargs
+
+    def recover(self, owner):
+        """
+        終了したプロセスが実行中のまま残したジョブを待ち行列に戻す
+
+        Returns:
+            戻したジョブ数
+        """
+        conn = self._connection()
+        rows = conn.execute("SELECT id, owner FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+        stale = [job_id for job_id, job_owner in rows if job_owner != owner and not _owner_alive(job_owner)]
+        for job_id in stale:
+            conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, started_at = NULL WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING)
+            )
+        return len(stale)
+
+    def progress(self, job_id, progress, message):
+        """
+        進捗を書き込む
+
+        Returns:
+            キャンセルが要求されている場合はTrue
+        """
+        conn = self._connection()
+        conn.execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?",
+            (progress, message, job_id)
+        )
+        row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def finish(self, job_id, status, result=None, error=None):
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+            "progress = CASE WHEN ? = ? THEN 1 ELSE progress END WHERE id = ?",
+            (
+                status,
+                None if result is None else pickle.dumps(result, pickle.HIGHEST_PROTOCOL),
+                error,
+                time.time(),
+                status, DONE,
+                job_id
+            )
+        )
+
+    def cancel(self, job_id):
+        """
+        待ち行列のジョブは取り消し、実行中のジョブにはキャンセルを要求する
+        """
+        conn = self._connection()
+        conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED)
+        )
+        conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+
+    def fetch(self, job_ids):
+        """
+        ジョブの状態を取得する
+
+        Returns:
+            ジョブID -> 状態の辞書
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        placeholders = ','.join('?' * len(job_ids))
+        rows = self._connection().execute(
+            f"SELECT id, status, progress, message, result, error FROM jobs WHERE id IN ({placeholders})",
+            job_ids
+        ).fetchall()
+        return {
+            row[0]: {
+                'id': row[0],
+                'status': row[1],
+                'progress': row[2],
+                'message': row[3],
+                'result': None if row[4] is None else pickle.loads(row[4]),
+                'error': row[5],
+            }
+            for row in rows
+        }
+
+    def purge(self, before):
+        """
+        指定時刻より前に終了したジョブを削除する
+        """
+        self._connection().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?", FINISHED + (before,)
+        )
+
+
+class JobContext:
+    """
+    ジョブ関数に渡される実行中のジョブ
+    プロセスプールで実行する場合も子プロセスに渡せるように、状態は最小限にしています
+    """
+
+    def __init__(self, job_id, file, interval):
+        self.id = job_id
+        self._file = file
+        self._interval = interval
+        self._store = None
+        self._last = 0.0
+
+    def __getstate__(self):
+        return {'id': self.id, '_file': self._file, '_interval': self._interval}
+
+    def __setstate__(self, state):
+        self.__init__(state['id'], state['_file'], state['_interval'])
+
+    def progress(self, done, total=None, message=None):
+        """
+        進捗を報告する（progress_interval 秒に1回までしか書き込まない）
+
+        Args:
+            done: 完了した件数（total を省略した場合は0.0〜1.0の割合）
+            total: 全体の件数
+            message: 表示するメッセージ
+        """
+        now = time.monotonic()
+        finished = total is not None and done >= total
+        if not finished and now - self._last < self._interval:
+            return
+        self._last = now
+        if self._store is None:
+            self._store = JobStore(self._file)
+        ratio = done / total if total else float(done)
+        if self._store.progress(self.id, max(0.0, min(1.0, ratio)), message):
+            raise JobCancelled(self.id)
+
+
+def _execute(path, context, args, kwargs):
+    """
+    ジョブ関数を実行する（プロセスプールでは子プロセスで呼び出される）
+    """
+    return _resolve(path)(context, *args, **kwargs)
+
+
+class JobHandle:
+    """
+    登録したジョブへの参照
+    """
+
+    def __init__(self, job_id):
+        self.id = job_id
+
+    def info(self):
+        """
+        ジョブの状態を取得する
+
+        Returns:
+            id, status, progress, message, result, error を持つ辞書（存在しない場合はNone）
+        """
+        return Jobs.store().fetch([self.id]).get(self.id)
+
+    def wait(self, timeout=None, interval=0.1):
+        """
+        ジョブの終了を待つ
+
+        Args:
+            timeout: 最大待ち時間（秒）
+            interval: 確認の間隔（秒）
+
+        Returns:
+            ジョブの状態
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            info = self.info()
+            if info is None or info['status'] in FINISHED:
+                return info
+            if deadline is not None and time.monotonic() >= deadline:
+                return info
+            time.sleep(interval)
+
+    def cancel(self):
+        """
+        ジョブをキャンセルする
+        """
+        Jobs.store().cancel(self.id)
+        Jobs._wake.set()
+
+    def watch(self, callback, page=None):
+        """
+        進捗が変わったときに呼び出すコールバックを登録する
+        呼び出しは progress_interval 秒に1回までにまとめられ、ジョブの終了後に解除されます
+        ジョブが存在しない場合は状態が gone の通知を1回行って解除されます
+
+        Args:
+            callback: callback(ジョブの状態) の形の関数
+            page: fletのPageオブジェクト（指定するとセッション終了時に解除されます）
+        """
+        Jobs.watch(self.id, callback, page)
+        return self
+
+
+class Jobs:
+    """
+    ジョブキューを管理するクラス
+    """
+
+    _lock = threading.Lock()
+    _store = None
+    _executor = None
+    _thread = None
+    _wake = threading.Event()
+    _watchers = {}   # ジョブID -> [(コールバック, セッションID)]
+    _last_seen = {}  # ジョブID -> 最後に通知した (状態, 進捗, メッセージ)
+    _unfinished = {}  # ジョブID -> 終了を保存できなかったジョブのエラー（_loop で再試行する）
+
+    @staticmethod
+    def store():
+        """
+        ジョブの保存先を取得する
+
+        Returns:
+            JobStoreのインスタンス
+        """
+        if Jobs._store is None:
+            with Jobs._lock:
+                if Jobs._store is None:
+                    Jobs._store = JobStore(_config().get('file', 'tmp/jobs.db'))
+        return Jobs._store
+
+    @staticmethod
+    def enqueue(func, *args, **kwargs):
+        """
+        ジョブを登録する
+
+        Args:
+            func: ジョブ関数、または 'モジュール:関数名' 形式のパス
+            *args: ジョブ関数の引数
+            **kwargs: ジョブ関数のキーワード引数
+
+        Returns:
+            JobHandleのインスタンス
+        """
+        path = func if isinstance(func, str) else f"{func.__module__}:{func.__qualname__}"
+        job_id = Jobs.store().insert(path, args, kwargs)
+        Metrics.inc('fletmvc_jobs_total', status=QUEUED)
+        Jobs.start()
+        Jobs._wake.set()
+        return JobHandle(job_id)
+
+    @staticmethod
+    def start():
+        """
+        ジョブを取り出して実行するスレッドを起動する
+        終了したプロセスが実行中のまま残したジョブは待ち行列に戻します
+        """
+        if Jobs._thread is not None or not _config().get('enabled', True):
+            return
+        with Jobs._lock:
+            if Jobs._thread is not None:
+                return
+            Jobs._executor = Jobs._create_executor()
+            recovered = Jobs.store().recover(_owner())
+            if recovered:
+                logger.info("中断されたジョブ %d 件を再実行します", recovered)
+            Jobs._thread = threading.Thread(target=Jobs._loop, name="fletmvc-jobs", daemon=True)
+            Jobs._thread.start()
+
+    @staticmethod
+    def _create_executor():
+        config = _config()
+        if config.get('executor', 'thread') == 'process':
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            return ProcessPoolExecutor(
+                max_workers=config.get('workers', 2),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure
+            )
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(
+            max_workers=config.get('workers', 2),
+            thread_name_prefix='fletmvc-job'
+        )
+
+    @staticmethod
+    def _loop():
+        config = _config()
+        workers = config.get('workers', 2)
+        poll_interval = config.get('poll_interval', 1.0)
+        progress_interval = config.get('progress_interval', 0.25)
+        keep_finished = config.get('keep_finished', 86400)
+        owner = _owner()
+        running = set()
+        last_purge = 0.0
+
+        while True:
+            # 1回の確認で失敗してもスレッドを止めずに次の確認を続ける
+            try:
+                Jobs._retry_unfinished()
+
+                # 空いているワーカーの分だけジョブを取り出す
+                while len(running) < workers:
+                    claimed = Jobs.store().claim(owner)
+                    if claimed is None:
+                        break
+                    try:
+                        running.add(Jobs._submit(*claimed))
+                    except BrokenExecutor:
+                        # 子プロセスが異常終了したプールは作り直す
+                        logger.warning("ジョブのワーカープールを再作成します")
+                        Jobs._executor = Jobs._create_executor()
+                        running.add(Jobs._submit(*claimed))
+
+                running = {future for future in running if not future.done()}
+                Jobs._notify()
+
+                now = time.time()
+                if keep_finished and now - last_purge > 3600:
+                    # 失敗しても次の削除は1時間後に行う
+                    last_purge = now
+                    Jobs.store().purge(now - keep_finished)
+            except Exception as e:
+                logger.warning("ジョブの確認に失敗しました: %s", e)
+
+            # 進捗を通知している間は progress_interval ごとに、それ以外は poll_interval ごとに確認する
+            Jobs._wake.wait(progress_interval if Jobs._watchers or running else poll_interval)
+            Jobs._wake.clear()
+
+    @staticmethod
+    def _submit(job_id, path, args, kwargs):
+        config = _config()
+        context = JobContext(job_id, Jobs.store().file, config.get('progress_interval', 0.25))
+        started = time.perf_counter()
+        future = Jobs._executor.submit(_execute, path, context, args, kwargs)
+
+        def done(future):
+            error = future.exception()
+            if error is None:
+                status = Jobs._finish(job_id, DONE, result=future.result())
+            elif isinstance(error, JobCancelled):
+                status = Jobs._finish(job_id, CANCELLED)
+            else:
+                logger.error("ジョブ %s (%s) が失敗しました: %s", job_id, path, error)
+                status = Jobs._finish(
+                    job_id, FAILED,
+                    error="".join(traceback.format_exception(type(error), error, error.__traceback__))
+                )
+            Metrics.inc('fletmvc_jobs_total', status=status)
+            Metrics.observe('fletmvc_job_seconds', time.perf_counter() - started, func=path)
+            Jobs._wake.set()
+
+        future.add_done_callback(done)
+        return future
+
+    @staticmethod
+    def _finish(job_id, status, result=None, error=None):
+        """
+        ジョブの終了を保存する
+        保存できない場合（結果をpickle化できない場合など）は失敗として保存し、
+        それもできない場合は実行中のまま残らないよう _loop で保存を再試行します
+
+        Returns:
+            保存した（または保存する）状態
+        """
+        try:
+            Jobs.store().finish(job_id, status, result=result, error=error)
+            return status
+        except Exception as e:
+            logger.error("ジョブ %s の終了を保存できませんでした: %s", job_id, e)
+            error = error or f"ジョブの終了を保存できませんでした: {e}"
+        try:
+            Jobs.store().finish(job_id, FAILED, error=error)
+        except Exception as e:
+            logger.error("ジョブ %s を失敗として保存できませんでした（再試行します）: %s", job_id, e)
+            with Jobs._lock:
+                Jobs._unfinished[job_id] = error
+        return FAILED
+
+    @staticmethod
+    def _retry_unfinished():
+        """
+        終了を保存できなかったジョブを失敗として保存し直す
+        """
+        with Jobs._lock:
+            unfinished = list(Jobs._unfinished.items())
+        for job_id, error in unfinished:
+            Jobs.store().finish(job_id, FAILED, error=error)
+            with Jobs._lock:
+                Jobs._unfinished.pop(job_id, None)
+
+    @staticmethod
+    def watch(job_id, callback, page=None):
+        """
+        ジョブの進捗が変わったときに呼び出すコールバックを登録する
+
+        Args:
+            job_id: ジョブID
+            callback: callback(ジョブの状態) の形の関数
+            page: fletのPageオブジェクト
+        """
+        with Jobs._lock:
+            Jobs._watchers.setdefault(job_id, []).append((callback, getattr(page, 'session_id', None)))
+        Jobs.start()
+        Jobs._wake.set()
+
+    @staticmethod
+    def usage(page):
+        """
+        セッションが登録している進捗のコールバックの数を取得する
+
+        Args:
+            page: fletのPageオブジェクト
+
+        Returns:
+            コールバックの数
+        """
+        session_id = getattr(page, 'session_id', None)
+        with Jobs._lock:
+            return sum(
+                1 for watchers in Jobs._watchers.values()
+                for _, watcher_session in watchers if watcher_session == session_id
+            )
+
+    @staticmethod
+    def forget(page):
+        """
+        セッションのコールバックを解除する
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        session_id = getattr(page, 'session_id', None)
+        with Jobs._lock:
+            for job_id in list(Jobs._watchers):
+                watchers = [w for w in Jobs._watchers[job_id] if w[1] != session_id]
+                if watchers:
+                    Jobs._watchers[job_id] = watchers
+                else:
+                    del Jobs._watchers[job_id]
+                    Jobs._last_seen.pop(job_id, None)
+
+    @staticmethod
+    def _notify():
+        """
+        前回から変わったジョブの状態をコールバックに通知する（1回の問い合わせでまとめて取得する）
+        """
+        with Jobs._lock:
+            watched = {job_id: list(watchers) for job_id, watchers in Jobs._watchers.items()}
+        if not watched:
+            return
+
+        found = Jobs.store().fetch(watched)
+        for job_id in watched:
+            info = found.get(job_id)
+            if info is None:
+                # 存在しない（または削除された）ジョブは gone として1回だけ通知して解除する
+                info = {
+                    'id': job_id, 'status': GONE, 'progress': 0.0,
+                    'message': None, 'result': None, 'error': None,
+                }
+            key = (info['status'], info['progress'], info['message'])
+            if Jobs._last_seen.get(job_id) == key:
+                continue
+            Jobs._last_seen[job_id] = key
+            for callback, _ in watched[job_id]:
+                try:
+                    callback(info)
+                except Exception as e:
+                    logger.warning("ジョブ %s の進捗の通知に失敗しました: %s", job_id, e)
+            if info['status'] in FINISHED or info['status'] == GONE:
+                with Jobs._lock:
+                    Jobs._watchers.pop(job_id, None)
+                    Jobs._last_seen.pop(job_id, None)
@@ -0,0 +1,212 @@
+"""
+Log Module
+
+このモジュールは config/app.py の LOGGING 設定に基づくロギングを定義します。
+ログレコードはキューに積まれ、バックグラウンドのスレッドがローテーションする
+ファイルへ書き出すため、UIスレッドがファイルI/Oで待たされることはありません。
+ロギングの構成（logs/ の作成とバックグラウンドスレッドの起動）はインポート時には行わず、
+エントリーポイント（main.py, cluster.py, build.py, benchmark.py, loadtest.py）が configure() を呼び出します。
+
+使用例:
+    from app.core.Log import configure, get_logger
+
+    configure()                   # エントリーポイントで一度だけ呼び出す
+
+    logger = get_logger(__name__)
+    logger.info("コントローラーを実行しました")
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from contextlib import contextmanager
+from config import app
+
+# ロガー名の接頭辞
+ROOT_LOGGER = "fletmvc"
+
+# マルチプロセス構成でワーカー番号を子プロセスに渡す環境変数（app.core.Cluster が設定する）
+WORKER_ENV = "FLETMVC_WORKER"
+
+# レコードに付与するコンテキスト（route, controller, action, session）
+_context = contextvars.ContextVar('fletmvc_log_context', default={})
+
+_configured = False
+_configure_lock = threading.Lock()
+_listener = None
+
+
+class ContextFilter(logging.Filter):
+    """
+    現在のコンテキストをログレコードに付与するフィルター
+    ワーカープロセスでは全てのレコードにワーカー番号（worker）も付与します
+    """
+
+    def __init__(self, base=None):
+        super().__init__()
+        self._base = base or {}
+
+    def filter(self, record):
+        context = _context.get()
+        record.context = {**self._base, **context} if self._base else context
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    DEBUGレベルのレコードを指定した割合だけ通すフィルター
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self._rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self._rate >= 1.0:
+            return True
+        return random.random() < self._rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    ログレコードを1行のJSONに変換するフォーマッター
+    """
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        entry.update(getattr(record, 'context', {}))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    例外情報を文字列化してからキューに積むハンドラー
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure(config=None):
+    """
+    LOGGING 設定からロギングを構成する
+    2回目以降の呼び出しは何もしません
+
+    Args:
+        config: ロギング設定の辞書（省略時は LOGGING）
+    """
+    global _configured, _listener
+
+    if _configured:
+        return
+
+    with _configure_lock:
+        if _configured:
+            return
+
+        config = config or getattr(app, 'LOGGING', {})
+        level = getattr(logging, str(config.get('level', 'info')).upper(), logging.INFO)
+        text_formatter = logging.Formatter(
+            config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        )
+
+        handlers = []
+
+        console = logging.StreamHandler()
+        console.setFormatter(text_formatter)
+        handlers.append(console)
+
+        log_file = config.get('file')
+        if log_file:
+            directory = os.path.dirname(log_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=config.get('max_bytes', 10 * 1024 * 1024),
+                backupCount=config.get('backup_count', 5),
+                encoding='utf-8'
+            )
+            file_handler.setFormatter(JsonFormatter() if config.get('json', True) else text_formatter)
+            handlers.append(file_handler)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        worker = os.environ.get(WORKER_ENV)
+        queue_handler.addFilter(ContextFilter({'worker': int(worker)} if worker else None))
+        queue_handler.addFilter(SamplingFilter(config.get('debug_sample_rate', 1.0)))
+
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(level)
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+
+        _configured = True
+
+
+def shutdown():
+    """
+    キューに残っているレコードを書き出してバックグラウンドスレッドを停止する
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name=None):
+    """
+    アプリケーションのロガーを取得する
+
+    Args:
+        name: ロガー名（モジュール名など）
+
+    Returns:
+        logging.Loggerのインスタンス
+    """
+    if not name:
+        return logging.getLogger(ROOT_LOGGER)
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+@contextmanager
+def log_context(**values):
+    """
+    ブロック内のログレコードにコンテキストを付与する
+
+    Args:
+        **values: route, controller, action, session などの値
+    """
+    token = _context.set({**_context.get(), **values})
+    try:
+        yield
+    finally:
+        _context.reset(token)
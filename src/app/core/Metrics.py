@@ -0,0 +1,484 @@
+"""
+Metrics Module
+
+このモジュールはプロセス内のメトリクスレジストリを定義します。
+ルーティングからレンダリングまでの各ステージの処理時間、テンプレート・レイアウトの
+読み込み時間、DBクエリ数と処理時間、レンダリングしたコントロール数などを記録し、
+Prometheus形式のテキストとしてファイルまたはHTTPで出力します。
+
+使用例:
+    from app.core.Metrics import Metrics
+
+    with Metrics.stage("action"):
+        action_method()
+"""
+
+import atexit
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import app
+
+# デフォルトのヒストグラムバケット（秒）
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# コントロール数用のバケット
+COUNT_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 現在処理中のナビゲーションのトレース
+_current_trace = contextvars.ContextVar('fletmvc_trace', default=None)
+
+
+def _config():
+    return getattr(app, 'METRICS', {})
+
+
+class Histogram:
+    """
+    Prometheus形式の累積ヒストグラム
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        値を記録する
+
+        Args:
+            value: 観測値
+        """
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        累積カウントを取得する
+
+        Returns:
+            (上限, 累積カウント) のリスト（最後は +Inf）
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    """
+    プロセス全体で共有するメトリクスレジストリ
+    """
+
+    _lock = threading.Lock()
+    _counters = {}    # (name, labels) -> value
+    _histograms = {}  # (name, labels) -> Histogram
+    _gauges = {}      # (name, labels) -> value
+    _help = {}
+    _server = None
+
+    @staticmethod
+    def enabled():
+        """
+        メトリクスの記録が有効かどうかを取得する
+
+        Returns:
+            有効な場合はTrue
+        """
+        return _config().get('enabled', True)
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    @staticmethod
+    def inc(name, amount=1, help=None, **labels):
+        """
+        カウンターを加算する
+
+        Args:
+            name: メトリクス名
+            amount: 加算する値
+            help: メトリクスの説明
+            **labels: ラベル
+        """
+        if not Metrics.enabled():
+            return
+        key = Metrics._key(name, labels)
+        with Metrics._lock:
+            Metrics._counters[key] = Metrics._counters.get(key, 0) + amount
+            if help:
+                Metrics._help.setdefault(name, help)
+
+    @staticmethod
+    def gauge(name, value, help=None, **labels):
+        """
+        ゲージに現在の値を設定する
+
+        Args:
+            name: メトリクス名
+            value: 現在の値
+            help: メトリクスの説明
+            **labels: ラベル
+        """
+        if not Metrics.enabled():
+            return
+        key = Metrics._key(name, labels)
+        with Metrics._lock:
+            Metrics._gauges[key] = value
+            if help:
+                Metrics._help.setdefault(name, help)
+
+    @staticmethod
+    def observe(name, value, buckets=DEFAULT_BUCKETS, help=None, **labels):
+        """
+        ヒストグラムに値を記録する
+
+        Args:
+            name: メトリクス名
+            value: 観測値
+            buckets: ヒストグラムのバケット
+            help: メトリクスの説明
+            **labels: ラベル
+        """
+        if not Metrics.enabled():
+            return
+        key = Metrics._key(name, labels)
+        with Metrics._lock:
+            histogram = Metrics._histograms.get(key)
+            if histogram is None:
+                histogram = Metrics._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+            if help:
+                Metrics._help.setdefault(name, help)
+
+    @staticmethod
+    @contextmanager
+    def timer(name, **labels):
+        """
+        ブロックの処理時間をヒストグラムに記録するコンテキストマネージャー
+
+        Args:
+            name: メトリクス名
+            **labels: ラベル
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            Metrics.observe(name, time.perf_counter() - start, **labels)
+
+    @staticmethod
+    @contextmanager
+    def stage(stage_name):
+        """
+        ルーティング〜レンダリングのステージ処理時間を記録する
+        現在のトレースにも処理時間を追記します
+
+        Args:
+            stage_name: ステージ名（match, load, action, render, update など）
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            Metrics.observe(
+                'fletmvc_stage_seconds', elapsed,
+                help='Time spent in each route-to-render pipeline stage',
+                stage=stage_name
+            )
+            trace = _current_trace.get()
+            if trace is not None:
+                trace['stages'][stage_name] = trace['stages'].get(stage_name, 0.0) + elapsed
+
+    @staticmethod
+    def begin_trace(route):
+        """
+        ナビゲーション1回分のトレースを開始する
+
+        Args:
+            route: 対象のルート
+
+        Returns:
+            トレースの辞書
+        """
+        trace = {
+            'route': route,
+            'started': time.perf_counter(),
+            'stages': {},
+            'db_queries': 0,
+            'db_seconds': 0.0,
+            'controls': 0,
+        }
+        trace['_token'] = _current_trace.set(trace)
+        return trace
+
+    @staticmethod
+    def current_trace():
+        """
+        現在のトレースを取得する
+
+        Returns:
+            トレースの辞書またはNone
+        """
+        return _current_trace.get()
+
+    @staticmethod
+    def end_trace(trace):
+        """
+        トレースを終了し、全体の処理時間を記録する
+        リダイレクトで入れ子になったトレースは開始前の状態に戻します
+
+        Args:
+            trace: begin_trace で開始したトレースの辞書
+
+        Returns:
+            終了したトレースの辞書
+        """
+        trace['total'] = time.perf_counter() - trace['started']
+        Metrics.observe(
+            'fletmvc_navigation_seconds', trace['total'],
+            help='Total time of one navigation'
+        )
+        _current_trace.reset(trace.pop('_token'))
+        return trace
+
+    @staticmethod
+    def record_query(elapsed):
+        """
+        DBクエリの実行を記録する
+
+        Args:
+            elapsed: クエリの処理時間（秒）
+        """
+        Metrics.inc('fletmvc_db_queries_total', help='Number of executed DB queries')
+        Metrics.observe('fletmvc_db_query_seconds', elapsed, help='DB query duration')
+        trace = _current_trace.get()
+        if trace is not None:
+            trace['db_queries'] += 1
+            trace['db_seconds'] += elapsed
+
+    @staticmethod
+    def record_controls(controls):
+        """
+        レンダリングしたコントロール数を記録する
+
+        Args:
+            controls: fletコントロールのリスト
+
+        Returns:
+            コントロールの総数
+        """
+        count = count_controls(controls)
+        Metrics.observe(
+            'fletmvc_render_controls', count, buckets=COUNT_BUCKETS,
+            help='Number of controls per render'
+        )
+        trace = _current_trace.get()
+        if trace is not None:
+            trace['controls'] = count
+        return count
+
+    @staticmethod
+    def snapshot():
+        """
+        現在のメトリクスのコピーを取得する
+
+        Returns:
+            (カウンター辞書, ヒストグラム辞書) のタプル
+        """
+        with Metrics._lock:
+            counters = dict(Metrics._counters)
+            histograms = {
+                key: (h.cumulative(), h.sum, h.count)
+                for key, h in Metrics._histograms.items()
+            }
+        return counters, histograms
+
+    @staticmethod
+    def reset():
+        """
+        全てのメトリクスを破棄する
+        """
+        with Metrics._lock:
+            Metrics._counters.clear()
+            Metrics._histograms.clear()
+            Metrics._gauges.clear()
+
+    @staticmethod
+    def render_prometheus():
+        """
+        Prometheusのテキスト形式に変換する
+
+        Returns:
+            Prometheus形式の文字列
+        """
+        counters, histograms = Metrics.snapshot()
+        with Metrics._lock:
+            gauges = dict(Metrics._gauges)
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name in typed:
+                return
+            typed.add(name)
+            if name in Metrics._help:
+                lines.append(f"# HELP {name} {Metrics._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, 'gauge')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            header(name, 'histogram')
+            for bound, cumulative in buckets:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def dump(path=None):
+        """
+        メトリクスをファイルに書き出す
+
+        Args:
+            path: 出力先のパス（省略時は METRICS['file']）
+        """
+        path = path or _config().get('file')
+        if not path:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(Metrics.render_prometheus())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def serve(port, host='127.0.0.1'):
+        """
+        Prometheus形式のメトリクスを返すHTTPエンドポイントを起動する
+
+        Args:
+            port: 待ち受けポート
+            host: 待ち受けアドレス
+
+        Returns:
+            HTTPサーバー
+        """
+        if Metrics._server is not None:
+            return Metrics._server
+        
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = Metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=server.serve_forever, name='fletmvc-metrics', daemon=True).start()
+        Metrics._server = server
+        return server
+
+    @staticmethod
+    def start_exporters():
+        """
+        METRICS 設定に従ってエクスポーターを起動する
+        port があればHTTPエンドポイントを起動し、file があれば終了時に書き出します
+        """
+        config = _config()
+        if not config.get('enabled', True):
+            return
+        if config.get('port'):
+            Metrics.serve(config['port'], config.get('host', '127.0.0.1'))
+        if config.get('file'):
+            atexit.register(Metrics.dump)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def count_controls(controls):
+    """
+    コントロールツリーに含まれるコントロールの総数を数える
+
+    Args:
+        controls: fletコントロールまたはそのリスト
+
+    Returns:
+        コントロールの総数
+    """
+    count = 0
+    stack = list(controls) if isinstance(controls, (list, tuple)) else [controls]
+    while stack:
+        control = stack.pop()
+        if control is None:
+            continue
+        count += 1
+        content = getattr(control, 'content', None)
+        if content is not None and not isinstance(content, str):
+            stack.append(content)
+        children = getattr(control, 'controls', None)
+        if isinstance(children, list):
+            stack.extend(children)
+    return count
+
+
+def format_trace(trace):
+    """
+    デバッグオーバーレイ用にトレースを整形する
+
+    Args:
+        trace: トレースの辞書
+
+    Returns:
+        表示用の文字列
+    """
+    stages = " ".join(
+        f"{name}={elapsed * 1000:.1f}ms" for name, elapsed in trace['stages'].items()
+    )
+    return (
+        f"{stages} | db={trace['db_queries']}q/{trace['db_seconds'] * 1000:.1f}ms"
+        f" | controls={trace['controls']}"
+    )
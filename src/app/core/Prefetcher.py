@@ -0,0 +1,266 @@
+"""
+Prefetcher Module
+
+このモジュールは次に遷移しそうなルートを先読みする仕組みを定義します。
+テンプレートがリンク先を宣言すると、セッションがアイドルになった時点で
+バックグラウンドのワーカーがコントローラー・テンプレート・レイアウトをインポートし、
+コントローラーの _prefetch フックで cacheable なアクションのデータをキャッシュに載せます。
+
+使用例（テンプレート）:
+    from app.core.Prefetcher import prefetch_on_hover
+
+    button = ft.IconButton(icon=ft.Icons.EDIT, on_click=...)
+    prefetch_on_hover(page, button, url_for("TestList", "edit", id=item.id))
+
+使用例（コントローラー）:
+    @action(cacheable=True, params=("<int:id>",))
+    def edit(self):
+        ...
+
+    def _prefetch(self, action, params):
+        if action == "edit":
+            Cache.remember(f"test:{params['id']}", lambda: load(params['id']), config="prefetch")
+"""
+
+import importlib
+import threading
+import time
+from app.core.Controller import Controller
+from app.core.Log import get_logger
+from app.core.Metrics import Metrics
+from app.core.Request import Request
+from app.core.Response import Response
+from app.core.View import View
+from config import app
+
+logger = get_logger(__name__)
+
+
+def _config():
+    return getattr(app, 'PREFETCH', {})
+
+
+class Prefetcher:
+    """
+    ルートの先読みを管理するクラス
+    同時実行数は max_concurrent、待ち行列は max_pending までに制限されます
+    """
+
+    _lock = threading.Lock()
+    _executor = None
+    _pending = set()    # 実行待ち・実行中のルート
+    _warmed = {}        # ルート -> 先読みした時刻（先読みした順）
+    _activity = {}      # セッションID -> 最後に遷移した時刻
+
+    @staticmethod
+    def enabled():
+        """
+        先読みが有効かどうかを取得する
+
+        Returns:
+            有効な場合はTrue
+        """
+        return _config().get('enabled', True)
+
+    @staticmethod
+    def touch(page):
+        """
+        セッションの最終操作時刻を記録する（ナビゲーションのたびに呼び出される）
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        with Prefetcher._lock:
+            Prefetcher._activity[getattr(page, 'session_id', None)] = time.monotonic()
+
+    @staticmethod
+    def forget(page):
+        """
+        セッションの記録を破棄する
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        with Prefetcher._lock:
+            Prefetcher._activity.pop(getattr(page, 'session_id', None), None)
+
+    @staticmethod
+    def hint(page, route):
+        """
+        リンク先のルートを先読み対象として登録する
+
+        Args:
+            page: fletのPageオブジェクト
+            route: 先読みするルート
+
+        Returns:
+            登録された場合はTrue
+        """
+        if not Prefetcher.enabled() or not route:
+            return False
+
+        config = _config()
+        now = time.monotonic()
+        with Prefetcher._lock:
+            if route in Prefetcher._pending:
+                return False
+            warmed_at = Prefetcher._warmed.get(route)
+            if warmed_at is not None and now - warmed_at < config.get('ttl', 60):
+                return False
+            if len(Prefetcher._pending) >= config.get('max_pending', 32):
+                Metrics.inc('fletmvc_prefetch_total', result='dropped')
+                return False
+            Prefetcher._pending.add(route)
+
+        Prefetcher._schedule(getattr(page, 'session_id', None), route)
+        return True
+
+    @staticmethod
+    def _schedule(session_id, route):
+        """
+        セッションが idle_delay 秒以上操作されていなければワーカーに渡し、
+        操作中であればアイドルになる時刻にタイマーで再確認する
+        （ワーカーの中では待たないため、操作中のセッションが同時実行数を占有することはない）
+        """
+        config = _config()
+        with Prefetcher._lock:
+            last = Prefetcher._activity.get(session_id)
+        if last is not None:
+            remaining = config.get('idle_delay', 0.3) - (time.monotonic() - last)
+            if remaining > 0:
+                timer = threading.Timer(remaining, Prefetcher._schedule, (session_id, route))
+                timer.daemon = True
+                timer.start()
+                return
+
+        with Prefetcher._lock:
+            if Prefetcher._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                Prefetcher._executor = ThreadPoolExecutor(
+                    max_workers=config.get('max_concurrent', 2),
+                    thread_name_prefix='fletmvc-prefetch'
+                )
+        Prefetcher._executor.submit(Prefetcher._run, route)
+
+    @staticmethod
+    def _run(route):
+        try:
+            with Metrics.timer('fletmvc_prefetch_seconds'):
+                warmed = Prefetcher.warm(route)
+            Metrics.inc('fletmvc_prefetch_total', result='warmed' if warmed else 'unmatched')
+        except Exception as e:
+            Metrics.inc('fletmvc_prefetch_total', result='error')
+            logger.warning("ルート '%s' の先読みに失敗しました: %s", route, e)
+        finally:
+            with Prefetcher._lock:
+                Prefetcher._pending.discard(route)
+                Prefetcher._remember(route, time.monotonic())
+
+    @staticmethod
+    def _remember(route, now):
+        """
+        先読みした時刻を記録し、ttl を過ぎた記録と max_warmed を超えた古い記録を破棄する
+        （_lock を取得した状態で呼び出す）
+        """
+        config = _config()
+        ttl = config.get('ttl', 60)
+        max_warmed = config.get('max_warmed', 1024)
+        warmed = Prefetcher._warmed
+        warmed.pop(route, None)
+        warmed[route] = now
+        while warmed:
+            oldest = next(iter(warmed))
+            if now - warmed[oldest] < ttl and len(warmed) <= max_warmed:
+                break
+            del warmed[oldest]
+
+    @staticmethod
+    def _resolve(route):
+        """
+        ルートをコントローラー名・アクション名・パラメータに解決する
+
+        Returns:
+            (コントローラー名, アクション名, パラメータ) またはNone
+        """
+        path = route.split('?', 1)[0]
+        if ':' in path:
+            last = path.strip('/').split('/')[-1]
+            controller_view = last.split(':')
+            if len(controller_view) != 2:
+                return None
+            return controller_view[0], controller_view[1], {}
+
+        from app.core.Router import Router
+        router = Router.shared()
+        router.ensure_built()
+        match = router.match(path)
+        if match is None:
+            return None
+        return match['controller'], match['action'], match['params']
+
+    @staticmethod
+    def warm(route):
+        """
+        ルートのコントローラー・テンプレート・レイアウトとアクションのデータを先読みする
+
+        Args:
+            route: 先読みするルート
+
+        Returns:
+            先読みできた場合はTrue
+        """
+        resolved = Prefetcher._resolve(route)
+        if resolved is None:
+            return False
+        controller_name, action_name, params = resolved
+        if controller_name.endswith('Controller'):
+            controller_name = controller_name[:-10]
+
+        controller = Controller.load(controller_name)
+        if controller is None:
+            return False
+        # 表示（GET）以外のアクションは先読みしない
+        action = controller.actions.get(action_name)
+        if action is None or action.method != "GET":
+            return False
+
+        # テンプレートとレイアウトのモジュールをインポートしておく
+        view = View(controller_name, action_name, controller.get_layout())
+        view._load_template(view._get_template_path())
+        if controller.get_layout() != "none":
+            importlib.import_module(f"templates.layouts.{controller.get_layout()}")
+
+        # キャッシュ可能なアクションのデータを読み込む
+        # （フックからも load_model や _request を使えるよう、ページのないディスパッチの中で呼び出す）
+        hook = getattr(controller, '_prefetch', None)
+        if hook is not None and action.cacheable:
+            request = Request.acquire(None, route, params)
+            response = Response.acquire(None)
+            try:
+                with controller.dispatch(request, response):
+                    hook(action_name, params)
+            finally:
+                Request.release(request)
+                Response.release(response)
+
+        return True
+
+
+def prefetch_on_hover(page, control, route):
+    """
+    コントロールにマウスが乗ったときにルートを先読みする
+
+    Args:
+        page: fletのPageオブジェクト
+        control: リンクとして使うコントロール
+        route: リンク先のルート
+
+    Returns:
+        コントロール
+    """
+    def on_hover(e):
+        if e.data == "true":
+            Prefetcher.hint(page, route)
+
+    control.on_hover = on_hover
+    return control
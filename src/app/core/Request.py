@@ -3,14 +3,24 @@ Request Module
 
 このモジュールはHTTPリクエストを表現するクラスを定義します。
 CakePHPのServerRequestに相当します。
+
+ナビゲーションごとに作られるため __slots__ で属性を固定し、辞書は必要になるまで作成しません。
+acquire / release を使うと使い終わったオブジェクトを APP['request_pool_size'] 個まで再利用します。
 """
 
+from urllib.parse import parse_qs
+from config import app
+
 class Request:
     """
     HTTPリクエストを表すクラス
     ルートパラメータ、クエリパラメータ、POSTデータなどを管理します
     """
     
+    __slots__ = ('_page', '_route', '_params', '_query_params', '_post_data')
+    
+    _free = []  # 再利用できるオブジェクト
+    
     def __init__(self, page, route, params=None):
         """
         Requestオブジェクトの初期化
@@ -22,32 +32,68 @@ class Request:
         """
         self._page = page
         self._route = route
-        self._params = params or {}
-        self._query_params = {}
-        self._post_data = {}
+        self._params = params       # パラメータがない場合はNoneのまま
+        self._query_params = None   # 最初の get_query 呼び出しまで解析しない
+        self._post_data = None      # set_post_data されるまで作成しない
+    
+    @staticmethod
+    def acquire(page, route, params=None):
+        """
+        再利用できるオブジェクトがあれば使い、なければ作成する
         
-        # クエリパラメータの解析
-        if '?' in route:
-            route_part, query_part = route.split('?', 1)
-            self._parse_query_params(query_part)
+        Args:
+            page: flet.Pageオブジェクト
+            route: 現在のルート
+            params: ルートから抽出されたパラメータ
+            
+        Returns:
+            Requestオブジェクト
+        """
+        try:
+            request = Request._free.pop()
+        except IndexError:
+            return Request(page, route, params)
+        request.__init__(page, route, params)
+        return request
     
-    def _parse_query_params(self, query_string):
+    @staticmethod
+    def release(request):
         """
-        クエリ文字列を解析してパラメータに変換する
+        使い終わったオブジェクトを再利用のために戻す
+        戻した後のオブジェクトは参照しないでください
         
         Args:
-            query_string: クエリ文字列 (例: "param1=value1&param2=value2")
+            request: Requestオブジェクト
         """
-        if not query_string:
-            return
-            
-        params = query_string.split('&')
-        for param in params:
-            if '=' in param:
-                key, value = param.split('=', 1)
-                self._query_params[key] = value
-            else:
-                self._query_params[param] = True
+        if len(Request._free) < app.APP.get('request_pool_size', 0):
+            # ページやパラメータへの参照は残さない
+            request.__init__(None, None)
+            Request._free.append(request)
+    
+    def _get_query_string(self):
+        """
+        クエリ文字列を取得する
+        ルートにクエリがない場合は現在のページのルートから取得します
+        
+        Returns:
+            クエリ文字列 (例: "param1=value1&param2=value2")
+        """
+        for route in (self._route, getattr(self._page, 'route', None)):
+            if route and '?' in route:
+                return route.split('?', 1)[1]
+        return ""
+    
+    def _get_query_params(self):
+        """
+        クエリパラメータを解析してキャッシュする
+        値はパーセントデコードされ、同じキーの値はリストにまとめられます
+        
+        Returns:
+            パラメータ名と値のリストの辞書
+        """
+        if self._query_params is None:
+            self._query_params = parse_qs(self._get_query_string(), keep_blank_values=True)
+        return self._query_params
     
     def get_param(self, name, default=None):
         """
@@ -60,11 +106,14 @@ class Request:
         Returns:
             パラメータの値またはデフォルト値
         """
+        if self._params is None:
+            return default
         return self._params.get(name, default)
     
     def get_query(self, name, default=None):
         """
         クエリパラメータを取得する
+        同じキーが複数ある場合は最初の値を返します
         
         Args:
             name: パラメータ名
@@ -73,7 +122,80 @@ class Request:
         Returns:
             パラメータの値またはデフォルト値
         """
-        return self._query_params.get(name, default)
+        values = self._get_query_params().get(name)
+        return values[0] if values else default
+    
+    def get_list(self, name, default=None):
+        """
+        クエリパラメータを全ての値のリストとして取得する
+        
+        Args:
+            name: パラメータ名
+            default: パラメータが存在しない場合のデフォルト値
+            
+        Returns:
+            値のリストまたはデフォルト値
+        """
+        values = self._get_query_params().get(name)
+        if not values:
+            return [] if default is None else default
+        return list(values)
+    
+    def get_int(self, name, default=None, min_value=None, max_value=None):
+        """
+        クエリパラメータを整数として取得する
+        
+        Args:
+            name: パラメータ名
+            default: パラメータが存在しないか不正な場合のデフォルト値
+            min_value: 許容する最小値
+            max_value: 許容する最大値
+            
+        Returns:
+            整数値またはデフォルト値
+        """
+        value = self.get_query(name)
+        if value is None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            return default
+        if (min_value is not None and number < min_value) or \
+                (max_value is not None and number > max_value):
+            return default
+        return number
+    
+    def get_bool(self, name, default=False):
+        """
+        クエリパラメータを真偽値として取得する
+        値のないフラグ（?debug）はTrueとして扱います
+        
+        Args:
+            name: パラメータ名
+            default: パラメータが存在しないか不正な場合のデフォルト値
+            
+        Returns:
+            真偽値またはデフォルト値
+        """
+        value = self.get_query(name)
+        if value is None:
+            return default
+        value = value.lower()
+        if value in ('', '1', 'true', 'yes', 'on'):
+            return True
+        if value in ('0', 'false', 'no', 'off'):
+            return False
+        return default
+    
+    def get_queries(self):
+        """
+        全てのクエリパラメータを取得する
+        
+        Returns:
+            パラメータ名と値のリストの辞書
+        """
+        return {name: list(values) for name, values in self._get_query_params().items()}
     
     def get_data(self, name, default=None):
         """
@@ -86,6 +208,8 @@ class Request:
         Returns:
             データの値またはデフォルト値
         """
+        if self._post_data is None:
+            return default
         return self._post_data.get(name, default)
     
     def get_route(self):
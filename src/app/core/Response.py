@@ -3,9 +3,15 @@ Response Module
 
 このモジュールはHTTPレスポンスを表現するクラスを定義します。
 CakePHPのResponseに相当します。
+
+ナビゲーションごとに作られるため __slots__ で属性を固定し、ヘッダーの辞書は必要になるまで作成しません。
+acquire / release を使うと使い終わったオブジェクトを APP['request_pool_size'] 個まで再利用します。
 """
 
 import flet as ft
+from app.core.Metrics import Metrics, format_trace
+from app.core.Updates import Updates
+from config import app
 
 class Response:
     """
@@ -13,6 +19,10 @@ class Response:
     ビューのレンダリングやリダイレクトなどを管理します
     """
     
+    __slots__ = ('_page', '_status_code', '_headers', '_controls')
+    
+    _free = []  # 再利用できるオブジェクト
+    
     def __init__(self, page):
         """
         Responseオブジェクトの初期化
@@ -22,9 +32,40 @@ class Response:
         """
         self._page = page
         self._status_code = 200
-        self._headers = {}
-        self._body = None
-        self._controls = []
+        self._headers = None   # set_header または redirect されるまで作成しない
+        self._controls = None  # set_controls されるまで作成しない
+    
+    @staticmethod
+    def acquire(page):
+        """
+        再利用できるオブジェクトがあれば使い、なければ作成する
+        
+        Args:
+            page: flet.Pageオブジェクト
+            
+        Returns:
+            Responseオブジェクト
+        """
+        try:
+            response = Response._free.pop()
+        except IndexError:
+            return Response(page)
+        response.__init__(page)
+        return response
+    
+    @staticmethod
+    def release(response):
+        """
+        使い終わったオブジェクトを再利用のために戻す
+        戻した後のオブジェクトは参照しないでください
+        
+        Args:
+            response: Responseオブジェクト
+        """
+        if len(Response._free) < app.APP.get('request_pool_size', 0):
+            # ページやコントロールへの参照は残さない
+            response.__init__(None)
+            Response._free.append(response)
     
     def set_status(self, code):
         """
@@ -44,6 +85,8 @@ class Response:
             name: ヘッダー名
             value: ヘッダー値
         """
+        if self._headers is None:
+            self._headers = {}
         self._headers[name] = value
         return self
     
@@ -60,12 +103,31 @@ class Response:
     def redirect(self, url):
         """
         指定されたURLにリダイレクトする
+        アクションの終了後、ビューは描画されずにリダイレクト先のルートが続けて実行されます
         
         Args:
             url: リダイレクト先URL
         """
-        self._page.go(url)
-        return self
+        self._status_code = 302
+        return self.set_header('Location', url)
+    
+    def is_redirect(self):
+        """
+        リダイレクトするレスポンスかどうかを取得する
+        
+        Returns:
+            リダイレクトする場合はTrue
+        """
+        return 300 <= self._status_code < 400 and self._headers is not None and 'Location' in self._headers
+    
+    def get_redirect(self):
+        """
+        リダイレクト先のURLを取得する
+        
+        Returns:
+            リダイレクト先URL（リダイレクトしない場合はNone）
+        """
+        return self._headers['Location'] if self.is_redirect() else None
     
     def render(self, route):
         """
@@ -74,9 +136,31 @@ class Response:
         Args:
             route: 現在のルート
         """
-        self._page.views.clear()
-        self._page.views.append(
-            ft.View(route=route, controls=self._controls)
-        )
-        self._page.update()
+        controls = self._controls if self._controls is not None else []
+        overlay = None
+        trace = Metrics.current_trace()
+        if app.APP.get('debug') and trace is not None:
+            # デバッグ時はステージごとの処理時間を画面下部に表示する
+            overlay = ft.Text(format_trace(trace), size=11, color=ft.Colors.GREY)
+            controls = list(controls) + [overlay]
+        
+        # ビューは使い回してコントロールだけを差し替える
+        # （パンくずなど前の画面から残るコントロールは変更された属性だけが送信される）
+        views = self._page.views
+        if len(views) == 1 and isinstance(views[0], ft.View):
+            views[0].route = route
+            views[0].controls = controls
+        else:
+            views.clear()
+            views.append(
+                ft.View(route=route, controls=controls)
+            )
+        # 送信はナビゲーションの終了時に Updates がまとめて行う
+        Updates.request(self._page)
+        
+        if overlay is not None:
+            # 送信の直前に最終的な処理時間を書き込み、同じ送信で表示する（送信自体の時間は含まない）
+            def refresh_overlay():
+                overlay.value = format_trace(trace)
+            Updates.before_flush(self._page, refresh_overlay)
         return self
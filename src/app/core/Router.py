@@ -5,23 +5,59 @@ Router Module
 """
 
 import re
-import flet as ft
+import threading
+import time
+import uuid
+from urllib.parse import quote, urlencode
+from app.core.Bundle import Bundle
 from app.core.Controller import Controller
-from app.core.Request import Request
+from app.core.Discovery import Discovery
+from app.core.Log import get_logger, log_context
+from app.core.Metrics import Metrics
+from app.core.Prefetcher import Prefetcher
 from app.core.Response import Response
+from app.core.Sessions import Sessions
+from app.core.Updates import Updates
 from config import app
 
+# ルートパラメータのコンバーター {名前: (正規表現, 変換関数)}
+CONVERTERS = {
+    'str': (r'[^/]+', str),
+    'int': (r'\d+', int),
+    'uuid': (r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}', uuid.UUID),
+    'slug': (r'[-a-zA-Z0-9_]+', str),
+    'path': (r'.+', str),
+}
+
+# <name> または <converter:name> 形式のパラメータ
+PARAM_PATTERN = re.compile(r"<(?:(\w+):)?(\w+)>")
+
+# 1回のナビゲーションで続けて実行するリダイレクトの上限
+MAX_REDIRECTS = 10
+
+logger = get_logger(__name__)
+
 class Router:
     """
     URLルーティングを管理するクラス
+    ルートテーブルは Router.shared() でプロセス全体の1つを全セッションが共有します
+    構築後のルートテーブルは変更されないため、ロックなしで同時にマッチングできます
     """
     
+    _shared = None
+    _shared_lock = threading.Lock()
+    
     def __init__(self):
         """
         Routerオブジェクトの初期化
         """
         self._routes = {}
         self._route_tree = {}
+        self._patterns = None  # コンパイル済みのパラメータ付きルート
+        self._segments = {}  # ツリーのパラメータノード -> (名前, 正規表現, 変換関数, pathかどうか)
+        self._url_index = {}  # (コントローラー名, アクション名) -> URLビルダーのリスト
+        self._built = False
+        self._build_lock = threading.Lock()
         self._default_routes = {
             "/": {
                 "controller": app.APP.get('default_controller', 'Home'),
@@ -35,49 +71,59 @@ class Router:
         else:
             self._custom_routes = {}
     
+    @staticmethod
+    def shared():
+        """
+        全セッションで共有するルーターを取得する
+        ルートテーブルは最初にURL形式のルートが必要になった時点で一度だけ構築されます
+        
+        Returns:
+            Routerのインスタンス
+        """
+        router = Router._shared
+        if router is None:
+            with Router._shared_lock:
+                if Router._shared is None:
+                    Router._shared = Router()
+                router = Router._shared
+        return router
+    
+    @staticmethod
+    def _reset_shared(package):
+        """
+        コントローラーの追加・削除を検出したら共有ルーターを作り直す
+        （処理中のナビゲーションは古いルートテーブルのまま完了します）
+        """
+        if package == 'app.controllers':
+            Router._shared = None
+    
     def add_route(self, pattern, controller, action="index"):
         """
-        ルートを追加する
+        ルートを追加する（ルートテーブルの構築前のみ）
         
         Args:
             pattern: URLパターン
             controller: コントローラー名
             action: アクション名
         """
+        if self._built:
+            raise RuntimeError("構築済みのルートテーブルにはルートを追加できません")
         self._routes[pattern] = {
             "controller": controller,
             "action": action
         }
+        self._patterns = None
     
     def build_route_tree(self):
         """
         ルートツリーを構築する
         """
-        # コントローラーリストからルートを自動生成
-        controllers = Controller.get_available_controllers()
-        
-        for controller_name in controllers:
-            # コントローラー名からベース名を取得（Controllerサフィックスを除く）
-            base_name = controller_name.replace('Controller', '')
-            controller_path = f"/{base_name.lower()}"
-            
-            # コントローラーをロード
-            controller = Controller.load(base_name)
-            if controller is None:
-                continue
-                
-            # コントローラーのアクションを探す
-            for attr_name in dir(controller):
-                # プライベートメソッドとデフォルトメソッドはスキップ
-                if attr_name.startswith('_') or attr_name in ['initialize', 'set', 'get_view_vars', 'set_layout', 'get_layout', 'load_model', 'load_component']:
-                    continue
-                    
-                # アクション名がindexの場合は特別処理
-                if attr_name == 'index':
-                    self.add_route(controller_path, base_name, 'index')
-                else:
-                    action_path = f"{controller_path}/{attr_name}"
-                    self.add_route(action_path, base_name, attr_name)
+        # コントローラーのアクションからルートを自動生成（バンドルがあれば走査しない）
+        routes = Bundle.get('routes')
+        if routes is None:
+            routes = Router._discover_routes()
+        for pattern, controller_name, action_name in routes:
+            self.add_route(pattern, controller_name, action_name)
         
         # カスタムルートを追加
         for pattern, route_info in self._custom_routes.items():
@@ -96,6 +142,9 @@ class Router:
             for i, part in enumerate(parts):
                 if part not in current:
                     current[part] = {}
+                    param = PARAM_PATTERN.fullmatch(part)
+                    if param:
+                        self._segments[part] = self._compile_segment(param)
                 
                 if i == len(parts) - 1:  # 最後の部分
                     current[part]['__route__'] = {
@@ -104,6 +153,123 @@ class Router:
                     }
                 
                 current = current[part]
+        
+        self._compile_patterns()
+        self._build_url_index()
+        self._built = True
+    
+    def ensure_built(self):
+        """
+        ルートテーブルが構築されていなければ構築する
+        複数のセッションから同時に呼び出されても構築は一度だけ行われます
+        """
+        if self._built:
+            return
+        with self._build_lock:
+            if not self._built:
+                with Metrics.stage("build"):
+                    self.build_route_tree()
+    
+    @staticmethod
+    def _discover_routes():
+        """
+        コントローラーを読み込み、アクションからルートを生成する
+        
+        Returns:
+            (URLパターン, コントローラー名, アクション名) のリスト
+        """
+        routes = []
+        for controller_name in Controller.get_available_controllers():
+            # コントローラー名からベース名を取得（Controllerサフィックスを除く）
+            base_name = controller_name.replace('Controller', '')
+            controller_path = f"/{base_name.lower()}"
+            
+            # コントローラーをロード
+            controller = Controller.load(base_name)
+            if controller is None:
+                continue
+                
+            # クラスの定義時に作成されたアクションの一覧からルートを作る
+            for action in controller.actions.values():
+                # アクション名がindexの場合は特別処理
+                path = controller_path if action.name == 'index' else f"{controller_path}/{action.name}"
+                routes.append([path, base_name, action.name])
+                # 宣言したパラメータは省略できる（省略時のルートも残す）
+                if action.params:
+                    routes.append(["/".join((path,) + action.params), base_name, action.name])
+        return routes
+    
+    def _compile_segment(self, param):
+        """
+        ツリーのパラメータノードをコンパイルする
+        
+        Args:
+            param: PARAM_PATTERN のマッチ結果
+            
+        Returns:
+            (パラメータ名, コンパイル済み正規表現, 変換関数, pathかどうか) のタプル
+        """
+        converter_name = param.group(1) or 'str'
+        if converter_name not in CONVERTERS:
+            raise ValueError(f"ルートパラメータのコンバーター '{converter_name}' はサポートされていません")
+        regex, convert = CONVERTERS[converter_name]
+        return param.group(2), re.compile(regex), convert, converter_name == 'path'
+    
+    def _compile_patterns(self):
+        """
+        パラメータ付きルートの正規表現を一度だけコンパイルする
+        """
+        patterns = []
+        for pattern, route_info in self._routes.items():
+            if '<' not in pattern:
+                continue
+            regex_pattern, converters = self._convert_route_to_regex(pattern)
+            patterns.append((re.compile(f"^{regex_pattern}$"), route_info, converters))
+        self._patterns = patterns
+    
+    def _build_url_index(self):
+        """
+        コントローラーとアクションからURLを生成するための逆引きインデックスを構築する
+        各ルートパターンは str.format_map 用のテンプレートに事前変換されます
+        """
+        index = {}
+        for pattern, route_info in self._routes.items():
+            fmt_parts = []
+            names = []
+            position = 0
+            for param in PARAM_PATTERN.finditer(pattern):
+                fmt_parts.append(pattern[position:param.start()].replace('{', '{{').replace('}', '}}'))
+                fmt_parts.append('{' + param.group(2) + '}')
+                names.append((param.group(2), param.group(1) == 'path'))
+                position = param.end()
+            fmt_parts.append(pattern[position:].replace('{', '{{').replace('}', '}}'))
+            
+            key = (route_info['controller'], route_info['action'])
+            index.setdefault(key, []).append(
+                (frozenset(name for name, _ in names), "".join(fmt_parts), tuple(names))
+            )
+        
+        # パラメータの多いパターンを優先する
+        for builders in index.values():
+            builders.sort(key=lambda builder: len(builder[0]), reverse=True)
+        
+        self._url_index = index
+    
+    def url_for(self, controller, action="index", **params):
+        """
+        コントローラーとアクションからURLを生成する
+        ルートパターンにないパラメータはクエリ文字列として付加します（値がNoneのパラメータは省略）
+        
+        Args:
+            controller: コントローラー名
+            action: アクション名
+            **params: ルートパラメータ
+            
+        Returns:
+            URL文字列
+        """
+        self.ensure_built()
+        return _build_url(self._url_index, controller, action, params)
     
     def match(self, route):
         """
@@ -137,14 +303,18 @@ class Router:
             }
         
         # パターンマッチングルートをチェック
-        for pattern, route_info in self._routes.items():
-            regex_pattern = self._convert_route_to_regex(pattern)
-            match = re.match(f"^{regex_pattern}$", route_part)
+        if self._patterns is None:
+            self._compile_patterns()
+        for regex, route_info, converters in self._patterns:
+            match = regex.match(route_part)
             if match:
                 return {
                     "controller": route_info["controller"],
                     "action": route_info["action"],
-                    "params": match.groupdict()
+                    "params": {
+                        name: converters[name](value)
+                        for name, value in match.groupdict().items()
+                    }
                 }
                 
         # 階層的なルートをチェック
@@ -192,17 +362,29 @@ class Router:
                 
         # パラメータマッチ
         for key in tree:
-            if key.startswith('<') and key.endswith('>'):
-                # パラメータ名を抽出
-                param_name = key[1:-1]
-                params[param_name] = part
+            segment = self._segments.get(key)
+            if segment is None:
+                continue
+            
+            param_name, regex, convert, is_path = segment
+            if is_path:
+                # path は残りのパーツを全て受け取る
+                value = '/'.join(parts)
+                remaining = []
+            else:
+                value = part
+                remaining = rest
+            
+            if not regex.fullmatch(value):
+                continue
+            params[param_name] = convert(value)
+            
+            result = self._match_hierarchical(remaining, tree[key], params)
+            if result:
+                return result
                 
-                result = self._match_hierarchical(rest, tree[key], params)
-                if result:
-                    return result
-                    
-                # マッチしなかった場合はパラメータを削除
-                del params[param_name]
+            # マッチしなかった場合はパラメータを削除
+            del params[param_name]
                 
         return None
     
@@ -214,9 +396,25 @@ class Router:
             route: ルートパターン
             
         Returns:
-            正規表現パターン
+            (正規表現パターン, パラメータ名と変換関数の辞書) のタプル
         """
-        return re.sub(r"<([^>]+)>", r"(?P<\1>[^/]+)", route)
+        converters = {}
+        regex_parts = []
+        position = 0
+        
+        for param in PARAM_PATTERN.finditer(route):
+            converter_name = param.group(1) or 'str'
+            if converter_name not in CONVERTERS:
+                raise ValueError(f"ルートパラメータのコンバーター '{converter_name}' はサポートされていません")
+            regex, convert = CONVERTERS[converter_name]
+            converters[param.group(2)] = convert
+            regex_parts.append(re.escape(route[position:param.start()]))
+            regex_parts.append(f"(?P<{param.group(2)}>{regex})")
+            position = param.end()
+        regex_parts.append(re.escape(route[position:]))
+        
+        regex_pattern = "".join(regex_parts)
+        return regex_pattern, converters
     
     def handle_route(self, page, route):
         """
@@ -226,13 +424,64 @@ class Router:
             page: fletのPageオブジェクト
             route: URLルート (Controller:View/Controller:View形式またはURLルート形式)
         """
-        # ルートツリーが空の場合は構築
-        if not self._route_tree:
-            self.build_route_tree()
+        Prefetcher.touch(page)
+        trace = Metrics.begin_trace(route)
+        cpu_start = time.thread_time()
+        try:
+            with log_context(route=route, session=getattr(page, 'session_id', None)):
+                with Updates.batch(page):
+                    self._follow(page, route)
+        finally:
+            Metrics.end_trace(trace)
+            Sessions.record(page, trace, time.thread_time() - cpu_start)
+    
+    def _follow(self, page, route):
+        """
+        ルートを実行し、リダイレクトされた場合はクライアントを経由せずに続けて実行する
+        
+        Args:
+            page: fletのPageオブジェクト
+            route: URLルート
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._dispatch(page, route)
+            if response is None:
+                return
+            location = response.get_redirect()
+            Response.release(response)
+            if location is None:
+                return
+            
+            Metrics.inc('fletmvc_redirects_total')
+            if '://' in location:
+                # 外部URLはブラウザで開く
+                page.launch_url(location)
+                return
+            
+            # ブラウザのURLは最後のルートの描画と一緒に送信される
+            logger.debug("リダイレクトします: %s -> %s", route, location)
+            route = location
+            page.route = route
+        
+        logger.warning("リダイレクトが %d 回を超えたため中止しました: %s", MAX_REDIRECTS, route)
+        from app.core.ErrorHandler import handle_error
+        handle_error(page, route, "リダイレクトの回数が多すぎます")
+    
+    def _dispatch(self, page, route):
+        """
+        ルートを解決してコントローラーを実行する
         
+        Args:
+            page: fletのPageオブジェクト
+            route: URLルート
+            
+        Returns:
+            Responseオブジェクト（404の場合はNone）
+        """
         # コントローラー:ビュー形式のルートをパースする
         if ':' in route:
-            parts = route.strip('/').split('/')
+            # クエリ文字列はRequestが必要になった時点で解析する
+            parts = route.split('?', 1)[0].strip('/').split('/')
             routes = []
             params = {}
             
@@ -244,8 +493,9 @@ class Router:
                         view_name = controller_view[1]
                         
                         # コントローラーとビューが存在するか確認
-                        controller = Controller.load(controller_name)
-                        if controller is not None and hasattr(controller, view_name):
+                        with Metrics.stage("match"):
+                            controller = Controller.load(controller_name)
+                        if controller is not None and view_name in controller.actions:
                             routes.append({
                                 "controller": controller_name,
                                 "action": view_name,
@@ -254,16 +504,20 @@ class Router:
                         else:
                             # 404エラー - コントローラーまたはビューが見つからない
                             self._handle_404(page, route)
-                            return
+                            return None
             
             if routes:
                 # 最後のルートを処理する
                 route_info = routes[-1]
-                Controller.execute(page, route_info["controller"], route_info["action"], route_info["params"])
-                return
+                return Controller.execute(page, route_info["controller"], route_info["action"], route_info["params"])
         else:
+            # ルートテーブルが未構築の場合は構築（プロセスで一度だけ）
+            # （コントローラー:ビュー形式では不要なため、全コントローラーの読み込みはここまで遅らせる）
+            self.ensure_built()
+            
             # 従来のURLルートパターンでマッチング
-            match_result = self.match(route)
+            with Metrics.stage("match"):
+                match_result = self.match(route)
             
             if match_result:
                 # コントローラーとアクションを取得
@@ -272,11 +526,11 @@ class Router:
                 params = match_result["params"]
                 
                 # コントローラーを実行
-                Controller.execute(page, controller_name, action_name, params)
-                return
+                return Controller.execute(page, controller_name, action_name, params)
                 
         # マッチングに失敗した場合は404エラー
         self._handle_404(page, route)
+        return None
     
     def _handle_404(self, page, route):
         """
@@ -289,3 +543,58 @@ class Router:
         # エラーハンドラーを使用
         from app.core.ErrorHandler import handle_404
         handle_404(page, route)
+
+
+def _build_url(index, controller, action, params):
+    """
+    逆引きインデックスからURLを生成する
+    
+    Args:
+        index: 逆引きインデックス
+        controller: コントローラー名
+        action: アクション名
+        params: ルートパラメータの辞書
+        
+    Returns:
+        URL文字列
+    """
+    if controller.endswith('Controller'):
+        controller = controller[:-10]
+    
+    builders = index.get((controller, action))
+    if not builders:
+        raise KeyError(f"'{controller}:{action}' へのルートが見つかりません")
+    
+    # 値がNoneのパラメータは指定されていないものとして扱う
+    params = {name: value for name, value in params.items() if value is not None}
+    for names, fmt, params_spec in builders:
+        if not names <= params.keys():
+            continue
+        url = fmt.format_map({
+            name: quote(str(params[name]), safe='/' if is_path else '')
+            for name, is_path in params_spec
+        })
+        if len(params) > len(names):
+            url += '?' + urlencode({k: v for k, v in params.items() if k not in names}, doseq=True)
+        return url
+    
+    raise KeyError(f"'{controller}:{action}' のルートに必要なパラメータが不足しています")
+
+
+def url_for(controller, action="index", **params):
+    """
+    コントローラーとアクションからURLを生成する
+    コントローラーやテンプレートからルーターを参照せずに使用できます
+    
+    Args:
+        controller: コントローラー名
+        action: アクション名
+        **params: ルートパラメータ（パターンにないものはクエリ文字列になります）
+        
+    Returns:
+        URL文字列
+    """
+    return Router.shared().url_for(controller, action, **params)
+
+
+Discovery.on_change(Router._reset_shared)
@@ -0,0 +1,337 @@
+"""
+Sessions Module
+
+このモジュールは接続中のセッションごとのリソースの計測と上限の管理を定義します。
+ナビゲーションごとのCPU時間・アクションの処理時間・描画したコントロール数を記録し、
+使用中のコンポーネント・更新待ちのコントロール・購読数などとあわせて
+おおよそのメモリ使用量を見積もって Metrics のゲージとして公開します。
+
+SESSIONS の設定に従い、SESSIONS['check_interval'] 秒ごとに次の順で上限を適用します:
+    1. idle_timeout 秒以上操作されていないセッションを切り離す
+    2. max_sessions を超えた分を最後の操作が古い順に切り離す
+    3. 見積もりの合計が max_memory を超えた場合はメモリ上のキャッシュとコンポーネントのプールを破棄し、
+       それでも超える場合は idle_grace 秒以上操作されていないセッションを古い順に切り離す
+
+切り離したセッションの画面は再読み込みを促す表示に置き換えられ、操作すると再び計測されます。
+
+使用例:
+    from app.core.Sessions import Sessions
+
+    Sessions.open(page)                     # main() で接続時に登録する
+    page.on_disconnect = lambda e: Sessions.close(page)
+    page.on_connect = lambda e: Sessions.open(page)   # 再接続時に登録し直す
+
+    Sessions.usage(page)                    # セッションの使用量の辞書
+"""
+
+import threading
+import time
+import flet as ft
+from app.core.Cache import Cache
+from app.core.Component import Component
+from app.core.Events import Events
+from app.core.Jobs import Jobs
+from app.core.Log import get_logger
+from app.core.Metrics import Metrics
+from app.core.Prefetcher import Prefetcher
+from app.core.Updates import Updates
+from config import app
+
+logger = get_logger(__name__)
+
+
+def _config():
+    return getattr(app, 'SESSIONS', {})
+
+
+class _SessionStats:
+    """
+    1つのセッションの計測値
+    """
+
+    __slots__ = ('page', 'opened', 'last_active', 'navigations', 'cpu_seconds', 'action_seconds', 'controls')
+
+    def __init__(self, page):
+        self.page = page
+        self.opened = self.last_active = time.monotonic()
+        self.navigations = 0
+        self.cpu_seconds = 0.0     # ナビゲーションの処理に使ったCPU時間の合計
+        self.action_seconds = 0.0  # アクションの処理時間の合計
+        self.controls = 0          # 最後に描画した画面のコントロール数
+
+
+class Sessions:
+    """
+    セッションのリソースを管理するクラス
+    """
+
+    _lock = threading.Lock()
+    _sessions = {}  # セッションID -> _SessionStats
+    _thread = None
+    _wake = threading.Event()
+
+    @staticmethod
+    def open(page):
+        """
+        セッションを登録し、上限の確認を開始する
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        with Sessions._lock:
+            Sessions._sessions[getattr(page, 'session_id', None)] = _SessionStats(page)
+        Sessions.start()
+
+    @staticmethod
+    def record(page, trace, cpu_seconds):
+        """
+        ナビゲーション1回分の使用量を記録する（登録されていないセッションは記録しない）
+
+        Args:
+            page: fletのPageオブジェクト
+            trace: Metrics.begin_trace で開始したトレース
+            cpu_seconds: ナビゲーションの処理に使ったCPU時間
+        """
+        session_id = getattr(page, 'session_id', None)
+        stats = Sessions._sessions.get(session_id)
+        if stats is None:
+            # 切り離されたセッションが操作された場合は再び登録する
+            if not getattr(page, 'session_dropped', False):
+                return
+            page.session_dropped = False
+            Sessions.open(page)
+            stats = Sessions._sessions[session_id]
+
+        action_seconds = trace['stages'].get('action', 0.0)
+        with Sessions._lock:
+            stats.last_active = time.monotonic()
+            stats.navigations += 1
+            stats.cpu_seconds += cpu_seconds
+            stats.action_seconds += action_seconds
+            if trace['controls']:
+                stats.controls = trace['controls']
+        Metrics.observe(
+            'fletmvc_session_cpu_seconds', cpu_seconds,
+            help='CPU time spent by one navigation of a session'
+        )
+
+    @staticmethod
+    def _usage(session_id, stats, now):
+        config = _config()
+        components = Component.usage(stats.page)
+        pending = Updates.usage(stats.page)
+        subscriptions = Events.usage(stats.page)
+        job_watchers = Jobs.usage(stats.page)
+        return {
+            'session_id': session_id,
+            'age_seconds': now - stats.opened,
+            'idle_seconds': now - stats.last_active,
+            'navigations': stats.navigations,
+            'cpu_seconds': stats.cpu_seconds,
+            'action_seconds': stats.action_seconds,
+            'controls': stats.controls,
+            'components': components,
+            'pending_updates': pending,
+            'subscriptions': subscriptions,
+            'job_watchers': job_watchers,
+            'memory_bytes': (
+                (stats.controls + pending) * config.get('control_bytes', 1024)
+                + components * config.get('component_bytes', 2048)
+                + subscriptions * config.get('subscription_bytes', 512)
+                + job_watchers * config.get('watcher_bytes', 256)
+            ),
+        }
+
+    @staticmethod
+    def usage(page):
+        """
+        セッションの使用量を取得する
+
+        Args:
+            page: fletのPageオブジェクト
+
+        Returns:
+            使用量の辞書（登録されていない場合はNone）
+        """
+        session_id = getattr(page, 'session_id', None)
+        stats = Sessions._sessions.get(session_id)
+        if stats is None:
+            return None
+        return Sessions._usage(session_id, stats, time.monotonic())
+
+    @staticmethod
+    def snapshot():
+        """
+        全セッションの使用量を取得する
+
+        Returns:
+            使用量の辞書のリスト（最後の操作が古い順）
+        """
+        now = time.monotonic()
+        with Sessions._lock:
+            sessions = list(Sessions._sessions.items())
+        usages = [Sessions._usage(session_id, stats, now) for session_id, stats in sessions]
+        usages.sort(key=lambda usage: -usage['idle_seconds'])
+        return usages
+
+    @staticmethod
+    def cache_bytes():
+        """
+        メモリ上のキャッシュとコンポーネントのプールのおおよそのバイト数を取得する
+
+        Returns:
+            バイト数
+        """
+        return Cache.memory_size() + Component.pooled() * _config().get('component_bytes', 2048)
+
+    @staticmethod
+    def collect():
+        """
+        使用量を集計してゲージに反映する
+
+        Returns:
+            (全セッションの使用量のリスト, キャッシュのバイト数)
+        """
+        usages = Sessions.snapshot()
+        cache_bytes = Sessions.cache_bytes()
+        Metrics.gauge('fletmvc_sessions', len(usages), help='Number of connected sessions')
+        Metrics.gauge(
+            'fletmvc_session_controls', sum(usage['controls'] for usage in usages),
+            help='Controls on screen across all sessions'
+        )
+        Metrics.gauge(
+            'fletmvc_session_memory_bytes', sum(usage['memory_bytes'] for usage in usages),
+            help='Approximate memory held by all sessions'
+        )
+        Metrics.gauge(
+            'fletmvc_session_memory_max_bytes', max((usage['memory_bytes'] for usage in usages), default=0),
+            help='Approximate memory held by the largest session'
+        )
+        Metrics.gauge('fletmvc_cache_memory_bytes', cache_bytes, help='Approximate memory held by in-process caches')
+        return usages, cache_bytes
+
+    @staticmethod
+    def enforce():
+        """
+        上限を超えたセッションやキャッシュを破棄する
+
+        Returns:
+            切り離したセッション数
+        """
+        config = _config()
+        usages, cache_bytes = Sessions.collect()
+        dropped = set()
+
+        def drop(usage, reason):
+            stats = Sessions._sessions.get(usage['session_id'])
+            if stats is not None and usage['session_id'] not in dropped:
+                dropped.add(usage['session_id'])
+                Sessions.drop(stats.page, reason)
+
+        idle_timeout = config.get('idle_timeout')
+        if idle_timeout:
+            for usage in usages:
+                if usage['idle_seconds'] >= idle_timeout:
+                    drop(usage, 'idle')
+
+        max_sessions = config.get('max_sessions')
+        if max_sessions:
+            alive = [usage for usage in usages if usage['session_id'] not in dropped]
+            for usage in alive[:max(0, len(alive) - max_sessions)]:
+                drop(usage, 'max_sessions')
+
+        max_memory = config.get('max_memory')
+        if max_memory:
+            alive = [usage for usage in usages if usage['session_id'] not in dropped]
+            total = sum(usage['memory_bytes'] for usage in alive) + cache_bytes
+            if total > max_memory and cache_bytes:
+                # まずは作り直せるキャッシュから破棄する
+                logger.warning("メモリの見積もりが上限を超えたためキャッシュを破棄します: %d bytes", total)
+                Cache.release_memory()
+                Component.clear_pools()
+                Metrics.inc('fletmvc_session_evictions_total', reason='memory', target='cache')
+                total -= cache_bytes
+            idle_grace = config.get('idle_grace', 60)
+            for usage in alive:
+                if total <= max_memory:
+                    break
+                if usage['idle_seconds'] < idle_grace:
+                    break
+                drop(usage, 'memory')
+                total -= usage['memory_bytes']
+            if total > max_memory:
+                logger.warning("メモリの見積もりが上限を超えています（操作中のセッションのみ）: %d bytes", total)
+
+        if dropped:
+            Sessions.collect()
+        return len(dropped)
+
+    @staticmethod
+    def drop(page, reason='idle'):
+        """
+        セッションを切り離し、保持しているリソースを解放する
+        画面は再読み込みを促す表示に置き換えられます
+
+        Args:
+            page: fletのPageオブジェクト
+            reason: 切り離した理由（メトリクスのラベル）
+        """
+        logger.info("セッションを切り離します: %s (%s)", getattr(page, 'session_id', None), reason)
+        Metrics.inc('fletmvc_session_evictions_total', reason=reason, target='session')
+        Sessions.close(page)
+        page.session_dropped = True
+        page.breadcrumbs = None
+        page.live_list = None
+        try:
+            page.overlay.clear()
+            page.views.clear()
+            page.views.append(
+                ft.View(
+                    route=page.route,
+                    controls=[
+                        ft.Text("セッションの有効期限が切れました", size=20),
+                        ft.ElevatedButton(text="再読み込み", on_click=lambda _: page.go(page.route)),
+                    ],
+                )
+            )
+            page.update()
+        except Exception as e:
+            # 既に切断されている場合は送信できない
+            logger.debug("切り離したセッションの画面を更新できませんでした: %s", e)
+
+    @staticmethod
+    def close(page):
+        """
+        セッションの記録と、各モジュールが保持しているセッションの状態を破棄する
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        with Sessions._lock:
+            Sessions._sessions.pop(getattr(page, 'session_id', None), None)
+        Prefetcher.forget(page)
+        Component.forget(page)
+        Jobs.forget(page)
+        Events.forget(page)
+        Updates.forget(page)
+
+    @staticmethod
+    def start():
+        """
+        上限を確認するスレッドを起動する（起動済みの場合は何もしない）
+        """
+        with Sessions._lock:
+            if Sessions._thread is not None:
+                return
+            Sessions._thread = threading.Thread(target=Sessions._loop, name='fletmvc-sessions', daemon=True)
+            Sessions._thread.start()
+
+    @staticmethod
+    def _loop():
+        while True:
+            Sessions._wake.wait(_config().get('check_interval', 30))
+            Sessions._wake.clear()
+            try:
+                Sessions.enforce()
+            except Exception as e:
+                logger.warning("セッションの上限の確認に失敗しました: %s", e)
@@ -0,0 +1,166 @@
+"""
+Startup Module
+
+このモジュールは起動時間のプロファイルを取る仕組みを定義します。
+python src/main.py --profile-startup で起動すると、モジュールごとのインポート時間
+（累積・自身）と初期化の各段階の経過時間を最初の描画後に出力します。
+"""
+
+import sys
+import threading
+import time
+
+_profiler = None
+
+
+class _TimedLoader:
+    """
+    exec_module の処理時間を記録するローダーのラッパー
+    """
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__, time.perf_counter() - start)
+
+
+class _TimingFinder:
+    """
+    他のファインダーが見つけたモジュールのローダーを _TimedLoader で包むメタパスファインダー
+    """
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """
+    インポート時間と初期化の段階を記録するプロファイラー
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._imports = {}  # モジュール名 -> (累積秒, 自身の秒)
+        self._marks = []    # (段階名, 開始からの秒)
+        self._finder = _TimingFinder(self)
+        self._reported = False
+
+    def start(self):
+        """
+        インポートの計測を開始する
+        """
+        sys.meta_path.insert(0, self._finder)
+        return self
+
+    def stop(self):
+        """
+        インポートの計測を終了する
+        """
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def _enter(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+
+    def _leave(self, name, elapsed):
+        stack = self._local.stack
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        with self._lock:
+            self._imports[name] = (elapsed, elapsed - children)
+
+    def mark(self, name):
+        """
+        初期化の段階を記録する
+
+        Args:
+            name: 段階名
+        """
+        self._marks.append((name, time.perf_counter() - self._started))
+
+    def report(self, stream=None, limit=30):
+        """
+        計測結果を出力する（2回目以降は何もしない）
+
+        Args:
+            stream: 出力先（省略時は標準エラー出力）
+            limit: 出力するモジュール数
+        """
+        if self._reported:
+            return
+        self._reported = True
+        self.stop()
+        stream = stream or sys.stderr
+
+        print("=== startup profile ===", file=stream)
+        for name, elapsed in self._marks:
+            print(f"{elapsed * 1000:10.1f}ms  {name}", file=stream)
+
+        print(f"\n{'cumulative':>12} {'self':>10}  module", file=stream)
+        ranked = sorted(self._imports.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (cumulative, own) in ranked[:limit]:
+            print(f"{cumulative * 1000:10.1f}ms {own * 1000:8.1f}ms  {name}", file=stream)
+        stream.flush()
+
+
+def start_profile():
+    """
+    起動時間のプロファイルを開始する
+
+    Returns:
+        StartupProfilerのインスタンス
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler().start()
+        _profiler.mark("profile started")
+    return _profiler
+
+
+def mark(name):
+    """
+    プロファイル中であれば初期化の段階を記録する
+
+    Args:
+        name: 段階名
+    """
+    if _profiler is not None:
+        _profiler.mark(name)
+
+
+def report():
+    """
+    プロファイル中であれば計測結果を出力する
+    """
+    if _profiler is not None:
+        _profiler.report()
@@ -0,0 +1,197 @@
+"""
+Updates Module
+
+このモジュールはセッションごとの画面更新（page.update）をまとめるスケジューラーを定義します。
+ナビゲーション中（Router.handle_route）やイベントハンドラーの中で要求された更新は
+バッチの終了時に1回の page.update() にまとめて送信されます。
+バッチの外（バックグラウンドのスレッドなど）から要求された更新は
+UPDATES['frame_interval'] 秒ごとにまとめて送信されます。
+
+使用例:
+    from app.core.Updates import Updates
+
+    # イベントハンドラー内の複数の変更を1回で送信する
+    with Updates.batch(page):
+        text.value = "保存しました"
+        Updates.request(page, text)
+        Updates.request(page, button)
+
+    # バックグラウンドのスレッドから（次のフレームでまとめて送信）
+    Updates.request(page, progress_bar)
+"""
+
+import threading
+from contextlib import contextmanager
+from app.core.Log import get_logger
+from app.core.Metrics import Metrics
+from config import app
+
+logger = get_logger(__name__)
+
+
+def _config():
+    return getattr(app, 'UPDATES', {})
+
+
+class _SessionUpdates:
+    """
+    1つのセッションの更新待ちの状態
+    """
+
+    __slots__ = ('page', 'depth', 'page_dirty', 'controls', 'callbacks', 'timer')
+
+    def __init__(self, page):
+        self.page = page
+        self.depth = 0          # 開いているバッチの数
+        self.page_dirty = False  # ページ全体の更新が要求されているか
+        self.controls = {}      # id(コントロール) -> コントロール（要求順）
+        self.callbacks = []     # 送信の直前に呼び出す関数
+        self.timer = None
+
+
+class Updates:
+    """
+    画面更新をまとめるクラス
+    """
+
+    _lock = threading.RLock()
+    _sessions = {}  # セッションID -> _SessionUpdates
+
+    @staticmethod
+    def _state(page):
+        session_id = getattr(page, 'session_id', None)
+        state = Updates._sessions.get(session_id)
+        if state is None:
+            state = Updates._sessions[session_id] = _SessionUpdates(page)
+        return state
+
+    @staticmethod
+    @contextmanager
+    def batch(page):
+        """
+        ブロック内で要求された更新を終了時に1回で送信する（入れ子にした場合は最も外側で送信する）
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        with Updates._lock:
+            Updates._state(page).depth += 1
+        try:
+            yield
+        finally:
+            with Updates._lock:
+                state = Updates._state(page)
+                state.depth -= 1
+                outermost = state.depth == 0
+            if outermost:
+                Updates.flush(page)
+
+    @staticmethod
+    def request(page, *controls):
+        """
+        更新を要求する
+
+        Args:
+            page: fletのPageオブジェクト
+            *controls: 更新するコントロール（省略時はページ全体）
+        """
+        with Updates._lock:
+            state = Updates._state(page)
+            if controls:
+                for control in controls:
+                    state.controls.setdefault(id(control), control)
+            else:
+                state.page_dirty = True
+            Metrics.inc('fletmvc_update_requests_total')
+
+            if state.depth > 0 or state.timer is not None:
+                return
+            # バッチの外からの要求は次のフレームでまとめて送信する
+            state.timer = threading.Timer(
+                _config().get('frame_interval', 0.033), Updates.flush, (page,)
+            )
+            state.timer.daemon = True
+            state.timer.start()
+
+    @staticmethod
+    def before_flush(page, callback):
+        """
+        次の送信の直前に呼び出す関数を登録する
+        関数の中で変更したコントロールは同じ送信に含まれます
+
+        Args:
+            page: fletのPageオブジェクト
+            callback: 引数なしの関数
+        """
+        with Updates._lock:
+            Updates._state(page).callbacks.append(callback)
+
+    @staticmethod
+    def flush(page):
+        """
+        要求された更新を送信する
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        with Updates._lock:
+            state = Updates._sessions.get(getattr(page, 'session_id', None))
+            if state is None or state.depth > 0:
+                return
+            callbacks = state.callbacks
+            state.callbacks = []
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.warning("送信前の処理に失敗しました: %s", e)
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+            page_dirty = state.page_dirty
+            # 画面から外れたコントロールは送信しない
+            controls = [control for control in state.controls.values() if control.page is not None]
+            state.page_dirty = False
+            state.controls = {}
+
+        try:
+            if page_dirty:
+                with Metrics.stage("update"):
+                    page.update()
+            elif controls:
+                with Metrics.stage("update"):
+                    page.update(*controls)
+            else:
+                return
+            Metrics.inc('fletmvc_page_updates_total')
+        except Exception as e:
+            logger.warning("画面の更新に失敗しました: %s", e)
+            return
+
+    @staticmethod
+    def usage(page):
+        """
+        セッションの更新待ちのコントロールの数を取得する
+
+        Args:
+            page: fletのPageオブジェクト
+
+        Returns:
+            コントロールの数
+        """
+        with Updates._lock:
+            state = Updates._sessions.get(getattr(page, 'session_id', None))
+            return len(state.controls) if state is not None else 0
+
+    @staticmethod
+    def forget(page):
+        """
+        セッションの更新待ちの状態を破棄する
+
+        Args:
+            page: fletのPageオブジェクト
+        """
+        with Updates._lock:
+            state = Updates._sessions.pop(getattr(page, 'session_id', None), None)
+            if state is not None and state.timer is not None:
+                state.timer.cancel()
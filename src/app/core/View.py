@@ -5,9 +5,36 @@ View Module
 ビューのレンダリングとテンプレートの管理を担当します。
 """
 
+import functools
 import importlib
+import inspect
 import os
 import flet as ft
+from app.core.Bundle import Bundle
+from app.core.Log import get_logger
+from app.core.Metrics import Metrics
+
+logger = get_logger(__name__)
+
+@functools.lru_cache(maxsize=None)
+def _accepts_page(func):
+    """
+    関数が page 引数を受け取れるか判定する
+    
+    Args:
+        func: エレメントのmain関数
+        
+    Returns:
+        page という名前の引数か **kwargs がある場合はTrue
+    """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        parameter.name == "page" or parameter.kind is inspect.Parameter.VAR_KEYWORD
+        for parameter in parameters
+    )
 
 class View:
     """
@@ -28,6 +55,7 @@ class View:
         self._action_name = action_name
         self._layout_name = layout_name
         self._elements = {}
+        self._page = None
     
     def render(self, page, view_vars):
         """
@@ -40,6 +68,7 @@ class View:
         Returns:
             fletコントロールのリスト
         """
+        self._page = page
         try:
             # テンプレートのパスを決定
             template_path = self._get_template_path()
@@ -59,7 +88,7 @@ class View:
                 return content_controls
                 
         except Exception as e:
-            print(f"ビューのレンダリングに失敗しました: {e}")
+            logger.exception("ビューのレンダリングに失敗しました: %s", e)
             return [ft.Text(f"ビューのレンダリングに失敗しました: {e}")]
     
     def _get_template_path(self):
@@ -91,12 +120,19 @@ class View:
         Returns:
             テンプレートモジュール
         """
+        # バンドルのテンプレート一覧にないものはインポートを試みない
+        templates = Bundle.get('templates')
+        if templates is not None and template_path not in templates:
+            logger.warning("テンプレート '%s' はバンドルに含まれていません", template_path)
+            return None
+        
         try:
             module_path = f"templates.components.{template_path}"
-            module = importlib.import_module(module_path)
+            with Metrics.timer("fletmvc_template_load_seconds", template=template_path):
+                module = importlib.import_module(module_path)
             return module
         except ImportError:
-            print(f"テンプレート '{template_path}' のロードに失敗しました")
+            logger.warning("テンプレート '%s' のロードに失敗しました", template_path)
             return None
     
     def _render_template(self, template, page, view_vars):
@@ -134,10 +170,16 @@ class View:
         Returns:
             レイアウトが適用されたコントロールのリスト
         """
+        layouts = Bundle.get('layouts')
+        if layouts is not None and self._layout_name not in layouts:
+            logger.warning("レイアウト '%s' はバンドルに含まれていません", self._layout_name)
+            return content_controls
+        
         try:
             # レイアウトモジュールをロード
             layout_path = f"templates.layouts.{self._layout_name}"
-            layout_module = importlib.import_module(layout_path)
+            with Metrics.timer("fletmvc_layout_load_seconds", layout=self._layout_name):
+                layout_module = importlib.import_module(layout_path)
             
             # レイアウトのmainメソッドを呼び出す
             if hasattr(layout_module, "main"):
@@ -145,12 +187,11 @@ class View:
                 view_vars["content"] = content_controls
                 return layout_module.main(page=page, **view_vars)
             else:
-                print(f"レイアウト '{self._layout_name}' に main 関数がありません")
+                logger.warning("レイアウト '%s' に main 関数がありません", self._layout_name)
                 return content_controls
                 
         except ImportError as e:
-            print(f"レイアウト '{self._layout_name}' のロードに失敗しました")
-            print(f"エラー: {e}")
+            logger.warning("レイアウト '%s' のロードに失敗しました: %s", self._layout_name, e)
             return content_controls
     
     def element(self, element_name, **params):
@@ -169,17 +210,23 @@ class View:
             if element_name in self._elements:
                 element = self._elements[element_name]
             else:
+                elements = Bundle.get('elements')
+                if elements is not None and element_name not in elements:
+                    logger.warning("エレメント '%s' はバンドルに含まれていません", element_name)
+                    return []
                 module_path = f"templates.elements.{element_name}"
                 element = importlib.import_module(module_path)
                 self._elements[element_name] = element
             
-            # エレメントのmainメソッドを呼び出す
+            # エレメントのmainメソッドを呼び出す（page を受け取るエレメントにはページを渡し、使用中の構造を追跡させる）
             if hasattr(element, "main"):
+                if _accepts_page(element.main):
+                    params.setdefault("page", self._page)
                 return element.main(**params)
             else:
-                print(f"エレメント '{element_name}' に main 関数がありません")
+                logger.warning("エレメント '%s' に main 関数がありません", element_name)
                 return []
                 
         except ImportError:
-            print(f"エレメント '{element_name}' のロードに失敗しました")
+            logger.warning("エレメント '%s' のロードに失敗しました", element_name)
             return []
@@ -5,17 +5,111 @@ AppModel Module
 全てのモデルはこのクラスを継承して使用します。
 """
 
-from peewee import Model, SqliteDatabase
+from peewee import Model, SqliteDatabase, _savepoint
 import importlib
-import os
+from functools import wraps
+import threading
+import time
+from app.core.Bundle import Bundle
+from app.core.Discovery import Discovery
+from app.core.Events import Events, CREATED, UPDATED, DELETED
+from app.core.Metrics import Metrics
 from config import app
 
-# データベース接続設定
-if app.DATABASE['engine'] == 'sqlite':
-    db = SqliteDatabase(app.DATABASE['file'])
-else:
+def _database_file():
+    """
+    データベース設定からSQLiteのファイルパスを取得する
+    
+    Returns:
+        データベースファイルのパス
+    """
+    if app.DATABASE['engine'] == 'sqlite':
+        return app.DATABASE['file']
     # 他のデータベースエンジンにも対応する場合はここに実装
-    db = SqliteDatabase('src/database/fletmvc.db')  # デフォルトはSQLite
+    return 'src/database/fletmvc.db'  # デフォルトはSQLite
+
+class _EventSavepoint(_savepoint):
+    """
+    ロールバックされたセーブポイント内のモデルの変更を破棄するセーブポイント
+    """
+    
+    def __call__(self, fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with self.db.savepoint():
+                return fn(*args, **kwargs)
+        return inner
+    
+    def _begin(self):
+        super()._begin()
+        self._pending_length = len(self.db._pending_events())
+    
+    def rollback(self):
+        super().rollback()
+        del self.db._pending_events()[self._pending_length:]
+
+class InstrumentedSqliteDatabase(SqliteDatabase):
+    """
+    クエリ数と処理時間をメトリクスに記録するSQLiteデータベース
+    ファイル名なしで作成した場合は、最初の接続時に DATABASE 設定から初期化します
+    トランザクション中のモデルの変更はコミットまで発行を保留し、ロールバック時は破棄します
+    （入れ子の atomic() でセーブポイントまでロールバックした場合はその中の変更だけを破棄します）
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._events = threading.local()
+    
+    def emit(self, model, action, pk):
+        """
+        モデルの変更を発行する（トランザクション中はコミットまで保留する）
+        
+        Args:
+            model: モデルクラス
+            action: created / updated / deleted
+            pk: 変更された行の主キー
+        """
+        if self.in_transaction():
+            self._pending_events().append((model, action, pk))
+        else:
+            Events.publish(model, action, pk)
+    
+    def _pending_events(self):
+        if not hasattr(self._events, 'pending'):
+            self._events.pending = []
+        return self._events.pending
+    
+    def savepoint(self):
+        return _EventSavepoint(self)
+    
+    def commit(self):
+        result = super().commit()
+        pending = getattr(self._events, 'pending', None)
+        self._events.pending = []
+        for model, action, pk in pending or ():
+            Events.publish(model, action, pk)
+        return result
+    
+    def rollback(self):
+        self._events.pending = []
+        return super().rollback()
+    
+    def connect(self, reuse_if_open=False):
+        if self.deferred:
+            with self._lock:
+                if self.deferred:
+                    self.init(_database_file())
+        return super().connect(reuse_if_open)
+    
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().execute_sql(sql, params, *args, **kwargs)
+        finally:
+            Metrics.record_query(time.perf_counter() - start)
+
+# データベース接続設定（接続は最初のクエリまで行わない）
+db = InstrumentedSqliteDatabase(None)
 
 class AppModel(Model):
     """
@@ -26,10 +120,12 @@ class AppModel(Model):
     class Meta:
         database = db
     
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """
         モデルの初期化
+        peeweeがクエリ結果や create() からインスタンスを作る際のフィールド値はそのまま渡す
         """
+        super().__init__(*args, **kwargs)
         self._table_name = None
         self._query = None
     
@@ -44,6 +140,40 @@ class AppModel(Model):
         """
         return self.__class__.select()
     
+    def save(self, force_insert=False, only=None):
+        """
+        レコードを保存し、変更を発行する
+        """
+        created = force_insert or self._pk is None
+        rows = super().save(force_insert=force_insert, only=only)
+        if rows:
+            self._meta.database.emit(self.__class__, CREATED if created else UPDATED, self._pk)
+        return rows
+    
+    def delete_instance(self, recursive=False, delete_nullable=False):
+        """
+        レコードを削除し、変更を発行する
+        """
+        rows = super().delete_instance(recursive=recursive, delete_nullable=delete_nullable)
+        if rows:
+            self._meta.database.emit(self.__class__, DELETED, self._pk)
+        return rows
+    
+    @classmethod
+    def prepare_form_values(cls, values, record=None):
+        """
+        フォームから保存する直前の値を加工する（app.core.Form が保存のトランザクション内で呼び出す）
+        フォームに含めないフィールドの値の補完やパスワードのハッシュ化などはサブクラスで実装します
+        
+        Args:
+            values: 変換・検証済みの値の辞書
+            record: 更新するレコード（新規作成の場合はNone）
+            
+        Returns:
+            保存する値の辞書
+        """
+        return values
+    
     def find(self, id):
         """
         IDでレコードを検索する
@@ -107,6 +237,41 @@ class AppModel(Model):
         except:
             return False
     
+    def save_records(self, rows):
+        """
+        複数のレコードを1つのトランザクションで保存する
+        変更はコミット時にまとめて発行されます
+        
+        Args:
+            rows: 保存するデータの辞書のリスト
+            
+        Returns:
+            保存されたレコードのリスト
+        """
+        with self._meta.database.atomic():
+            return [self.save_record(dict(data)) for data in rows]
+    
+    def delete_records(self, ids):
+        """
+        複数のレコードを1回のクエリで削除する
+        
+        Args:
+            ids: 削除するレコードのIDのリスト
+            
+        Returns:
+            削除した件数
+        """
+        model = self.__class__
+        primary_key = model._meta.primary_key
+        ids = list(ids)
+        with self._meta.database.atomic():
+            # 実際に存在した行だけを発行する
+            existing = [row[0] for row in model.select(primary_key).where(primary_key.in_(ids)).tuples()]
+            count = model.delete().where(primary_key.in_(existing)).execute() if existing else 0
+            for pk in existing:
+                self._meta.database.emit(model, DELETED, pk)
+        return count
+    
     @classmethod
     def get_all_models(cls):
         """
@@ -116,20 +281,19 @@ class AppModel(Model):
             モデルクラスの辞書 {名前: クラス}
         """
         models = {}
-        models_dir = os.path.join('src', 'app', 'models')
         
-        if not os.path.exists(models_dir):
-            return models
-            
-        for filename in os.listdir(models_dir):
-            if filename.endswith('.py') and filename != '__init__.py' and filename != 'AppModel.py':
-                model_name = filename[:-3]  # .pyを除去
-                try:
-                    module = importlib.import_module(f"app.models.{model_name}")
-                    model_class = getattr(module, model_name)
-                    if issubclass(model_class, cls):
-                        models[model_name] = model_class
-                except (ImportError, AttributeError):
-                    pass
-                    
+        # 事前構築バンドルがあればディレクトリを走査しない
+        model_names = Bundle.get('models')
+        if model_names is None:
+            model_names = Discovery.modules('app.models', exclude=('AppModel',))
+        
+        for model_name in model_names:
+            try:
+                module = importlib.import_module(f"app.models.{model_name}")
+                model_class = getattr(module, model_name)
+                if issubclass(model_class, cls):
+                    models[model_name] = model_class
+            except (ImportError, AttributeError):
+                pass
+                
         return models
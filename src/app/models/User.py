@@ -16,10 +16,22 @@ class User(AppModel):
     salt = CharField()
     is_active = BooleanField(default=True)
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self._table_name = "users"
     
+    @classmethod
+    def prepare_form_values(cls, values, record=None):
+        """
+        フォームから入力されたパスワードを認証レイヤーでハッシュ化し、ソルトを設定する
+        編集時にパスワードが変更されていない場合（ハッシュのまま送信された場合）はそのままにする
+        """
+        password = values.get('password')
+        if password is None or (record is not None and password == record.password):
+            return values
+        from auth.authentication import SaltedHashAuth
+        return SaltedHashAuth()._get_data_dict(values)
+    
     def validate_password(self, password, salt=None):
         """
         パスワードを検証する
@@ -14,7 +14,8 @@ The module uses the User model and utility functions from app.utils.
 
 import hashlib
 import os
-from app.utils import *
+from app.models.User import User
+from app.utils import exists
 
 
 # Base Authentication
@@ -28,11 +29,11 @@ class Auth:
     """
     
     def get_user(self, username: str):
-        return search_data("user", "username", username).get()
+        return User.get_or_none(User.username == username)
     
     def add_user(self, data_dict: dict):
         data_dict = self._get_data_dict(data_dict)
-        add_data("user", data_dict)
+        return User.create(**data_dict)
 
     def _get_data_dict(self, data_dict: dict):
         raise NotImplementedError("This method must be implemented in the subclass")
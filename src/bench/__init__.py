@@ -0,0 +1 @@
+# Bench Package
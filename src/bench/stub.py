@@ -0,0 +1,70 @@
+"""
+Stub Page Module
+
+ベンチマークや負荷試験でfletのPageオブジェクトの代わりに使うヘッドレスなページを定義します。
+ブラウザやFletサーバーを起動せずにルーティングからレンダリングまでを実行できます。
+"""
+
+import uuid
+
+
+class RouteChangeEvent:
+    """
+    on_route_change に渡すイベント
+    """
+
+    def __init__(self, route):
+        self.route = route
+
+
+class StubPage:
+    """
+    flet.Page の代わりに使うヘッドレスなページ
+    update() や go() の呼び出し回数を記録します
+    """
+
+    def __init__(self, session_id=None):
+        """
+        StubPageオブジェクトの初期化
+
+        Args:
+            session_id: セッションID（省略時は自動生成）
+        """
+        self.session_id = session_id or uuid.uuid4().hex
+        self.route = "/"
+        self.views = []
+        self.overlay = []
+        self.theme = None
+        self.theme_mode = None
+        self.on_route_change = None
+        self.update_count = 0
+        self.go_count = 0
+
+    def update(self, *controls):
+        """
+        画面の更新（回数のみ記録）
+        """
+        self.update_count += 1
+
+    def go(self, route, skip_route_change_event=False, **kwargs):
+        """
+        ルートを変更し、on_route_change を同期的に呼び出す
+
+        Args:
+            route: 遷移先のルート
+            skip_route_change_event: Trueの場合はイベントを発生させない
+        """
+        self.go_count += 1
+        self.route = route
+        if self.on_route_change is not None and not skip_route_change_event:
+            self.on_route_change(RouteChangeEvent(route))
+
+    def open(self, control):
+        self.overlay.append(control)
+
+    def close(self, control):
+        if control in self.overlay:
+            self.overlay.remove(control)
+
+    def run_thread(self, handler, *args, **kwargs):
+        handler(*args, **kwargs)
@@ -0,0 +1,151 @@
+"""
+Synthetic App Module
+
+ベンチマーク用の合成アプリケーション（コントローラーとテンプレート）を一時ディレクトリに生成します。
+生成したコントローラーは app.controllers、テンプレートは templates.components として
+インポートできるようにパスへ追加されます。
+"""
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import app.controllers
+from app.core.Bundle import Bundle
+from config import app as app_config
+
+CONTROLLER_TEMPLATE = '''"""
+Synthetic Controller {index}
+"""
+
+from app.core.AppController import AppController
+
+class {class_name}(AppController):
+{actions}
+'''
+
+ACTION_TEMPLATE = '''
+    def {action}(self):
+        self.set("title", "{controller} {action}")
+        self.set("rows", {rows})
+        self.set("item_id", self._request.get_param("id"))
+'''
+
+VIEW_TEMPLATE = '''"""
+Synthetic View
+"""
+
+import flet as ft
+
+def main(page, title="", rows=0, item_id=None, **kwargs):
+    return [
+        ft.Text(title, size=24, weight=ft.FontWeight.BOLD),
+        ft.Column(
+            controls=[
+                ft.Row(
+                    controls=[
+                        ft.Icon(ft.Icons.LABEL),
+                        ft.Text(f"Row {{i}}"),
+                        ft.Container(content=ft.Text(str(item_id)), padding=5),
+                        ft.IconButton(icon=ft.Icons.EDIT),
+                    ]
+                )
+                for i in range(rows)
+            ]
+        ),
+    ]
+'''
+
+
+class SyntheticApp:
+    """
+    N個のコントローラーとM個のアクション、大きなテンプレートを持つ合成アプリケーション
+    """
+
+    def __init__(self, controllers=10, actions=10, rows=100):
+        """
+        SyntheticAppオブジェクトの初期化
+
+        Args:
+            controllers: 生成するコントローラー数
+            actions: コントローラーごとのアクション数
+            rows: テンプレート1つあたりの行数
+        """
+        self.controllers = controllers
+        self.actions = actions
+        self.rows = rows
+        self.root = None
+
+    def controller_name(self, index):
+        return f"Synth{index}"
+
+    def action_name(self, index):
+        return f"action{index}"
+
+    def routes(self):
+        """
+        生成したルートの一覧を取得する
+
+        Returns:
+            (パターン, コントローラー名, アクション名) のリスト
+        """
+        result = []
+        for c in range(self.controllers):
+            controller = self.controller_name(c)
+            for a in range(self.actions):
+                action = self.action_name(a)
+                result.append((f"/{controller.lower()}/{action}", controller, action))
+                result.append((f"/{controller.lower()}/{action}/<id>", controller, action))
+        return result
+
+    def __enter__(self):
+        self.root = tempfile.mkdtemp(prefix="fletmvc-bench-")
+        controllers_dir = os.path.join(self.root, "controllers")
+        os.makedirs(controllers_dir)
+
+        for c in range(self.controllers):
+            controller = self.controller_name(c)
+            class_name = f"{controller}Controller"
+            actions = "".join(
+                ACTION_TEMPLATE.format(controller=controller, action=self.action_name(a), rows=self.rows)
+                for a in range(self.actions)
+            )
+            with open(os.path.join(controllers_dir, f"{class_name}.py"), "w", encoding="utf-8") as f:
+                f.write(CONTROLLER_TEMPLATE.format(index=c, class_name=class_name, actions=actions))
+
+            view_dir = os.path.join(self.root, "templates", "components", controller.lower())
+            os.makedirs(view_dir)
+            for a in range(self.actions):
+                with open(os.path.join(view_dir, f"{self.action_name(a)}.py"), "w", encoding="utf-8") as f:
+                    f.write(VIEW_TEMPLATE)
+
+        app.controllers.__path__.append(controllers_dir)
+        sys.path.append(self.root)
+        importlib.invalidate_caches()
+        
+        # 合成したコントローラーとテンプレートは事前構築バンドルに含まれないため使用しない
+        self._bundle_config = getattr(app_config, 'BUNDLE', {})
+        app_config.BUNDLE = {**self._bundle_config, 'enabled': False}
+        Bundle.reset()
+        return self
+
+    def __exit__(self, *exc):
+        controllers_dir = os.path.join(self.root, "controllers")
+        if controllers_dir in app.controllers.__path__:
+            app.controllers.__path__.remove(controllers_dir)
+        if self.root in sys.path:
+            sys.path.remove(self.root)
+        self.unload()
+        app_config.BUNDLE = self._bundle_config
+        Bundle.reset()
+        shutil.rmtree(self.root, ignore_errors=True)
+        importlib.invalidate_caches()
+
+    def unload(self):
+        """
+        生成したモジュールをsys.modulesから取り除く（コールドスタートの再現用）
+        """
+        for name in list(sys.modules):
+            if name.startswith("app.controllers.Synth") or name.startswith("templates.components.synth"):
+                del sys.modules[name]
@@ -0,0 +1,221 @@
+"""
+Benchmark Module
+
+ルーティング、コントローラーのディスパッチ、ビューのレンダリングのベンチマークを実行します。
+スタブのPageオブジェクトを使うため、ブラウザやFletサーバーは不要です。
+
+使用例:
+    python src/benchmark.py --output bench.json
+    python src/benchmark.py --baseline bench_baseline.json   # 回帰があれば終了コード1
+    python src/benchmark.py --save-baseline bench_baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.Controller import Controller
+from app.core.Log import configure, get_logger
+from app.core.Metrics import count_controls
+from app.core.Router import Router
+from app.core.Updates import Updates
+from app.core.View import View
+from bench.stub import StubPage
+from bench.synthetic import SyntheticApp
+
+
+def _summarize(samples_ns, **extra):
+    """
+    計測結果を集計する
+
+    Args:
+        samples_ns: 1回ごとの処理時間（ナノ秒）のリスト
+        **extra: 結果に追加する値
+
+    Returns:
+        集計結果の辞書（マイクロ秒単位）
+    """
+    samples = sorted(samples_ns)
+    count = len(samples)
+    result = {
+        'iterations': count,
+        'mean_us': statistics.fmean(samples) / 1000,
+        'min_us': samples[0] / 1000,
+        'p50_us': samples[count // 2] / 1000,
+        'p99_us': samples[min(count - 1, int(count * 0.99))] / 1000,
+    }
+    result.update(extra)
+    return result
+
+
+def _dispatch(page, controller, action):
+    """
+    ナビゲーションと同じく画面の更新をまとめてコントローラーを実行する
+    """
+    with Updates.batch(page):
+        Controller.execute(page, controller, action, {'id': '1'})
+
+
+def _measure(func, args_list, iterations):
+    samples = []
+    for i in range(iterations):
+        args = args_list[i % len(args_list)]
+        start = time.perf_counter_ns()
+        func(*args)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def run(controllers=10, actions=10, rows=100, iterations=1000):
+    """
+    ベンチマークを実行する
+
+    Args:
+        controllers: 合成コントローラー数
+        actions: コントローラーごとのアクション数
+        rows: テンプレートあたりの行数
+        iterations: 各計測の繰り返し回数
+
+    Returns:
+        計測結果の辞書
+    """
+    results = {}
+
+    with SyntheticApp(controllers, actions, rows) as synthetic:
+        router = Router()
+        for pattern, controller, action in synthetic.routes():
+            router.add_route(pattern, controller, action)
+        router.build_route_tree()
+
+        static_routes = [(pattern,) for pattern, _, _ in synthetic.routes() if '<' not in pattern]
+        param_routes = [(pattern.replace('<id>', str(i)),) for i, (pattern, _, _) in enumerate(synthetic.routes()) if '<' in pattern]
+
+        # ルートマッチング
+        results['route_match_static'] = _summarize(_measure(router.match, static_routes, iterations))
+        results['route_match_param'] = _summarize(_measure(router.match, param_routes, iterations))
+        results['route_match_miss'] = _summarize(
+            _measure(router.match, [("/no_such_controller/missing/1/2",)], iterations)
+        )
+
+        targets = [
+            (synthetic.controller_name(c), synthetic.action_name(a))
+            for c in range(controllers) for a in range(actions)
+        ]
+
+        # コールドディスパッチ（コントローラーとテンプレートのインポートを含む）
+        page = StubPage()
+        cold = []
+        for controller, action in targets[:: max(1, actions)]:
+            synthetic.unload()
+            start = time.perf_counter_ns()
+            _dispatch(page, controller, action)
+            cold.append(time.perf_counter_ns() - start)
+        results['dispatch_cold'] = _summarize(cold)
+
+        # ウォームディスパッチ
+        results['dispatch_warm'] = _summarize(_measure(
+            lambda controller, action: _dispatch(page, controller, action),
+            targets, iterations
+        ))
+
+        # ビューのレンダリングとコントロールツリーのサイズ
+        controller, action = targets[0]
+        view_vars = {'title': 'bench', 'rows': rows, 'item_id': 1}
+        controls = View(controller, action).render(page, dict(view_vars))
+        results['view_render'] = _summarize(
+            _measure(lambda: View(controller, action).render(page, dict(view_vars)), [()], max(1, iterations // 10)),
+            controls=count_controls(controls)
+        )
+
+        # ルートの変更からレンダリングまで
+        results['handle_route'] = _summarize(_measure(
+            lambda route: router.handle_route(page, route), param_routes, iterations
+        ))
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'controllers': controllers,
+            'actions': actions,
+            'rows': rows,
+            'iterations': iterations,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=0.2):
+    """
+    ベースラインと比較して回帰を検出する
+
+    Args:
+        current: 今回の計測結果
+        baseline: ベースラインの計測結果
+        threshold: 回帰とみなすp50の増加率
+
+    Returns:
+        (ベンチマーク名, ベースラインp50, 今回p50, 比率, 回帰かどうか) のリスト
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base or not base.get('p50_us'):
+            continue
+        ratio = result['p50_us'] / base['p50_us']
+        rows.append((name, base['p50_us'], result['p50_us'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FletMVC benchmark")
+    parser.add_argument('--controllers', type=int, default=10)
+    parser.add_argument('--actions', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--output', help="結果のJSONを書き出すパス")
+    parser.add_argument('--baseline', help="比較するベースラインのJSON")
+    parser.add_argument('--save-baseline', help="結果をベースラインとして保存するパス")
+    parser.add_argument('--threshold', type=float, default=0.2, help="回帰とみなすp50の増加率")
+    args = parser.parse_args(argv)
+
+    configure()
+
+    # ディスパッチごとのDEBUGログは計測のノイズになるため抑制する
+    get_logger().setLevel(logging.WARNING)
+
+    result = run(args.controllers, args.actions, args.rows, args.iterations)
+
+    for name, values in result['results'].items():
+        extra = f" controls={values['controls']}" if 'controls' in values else ""
+        print(f"{name:20s} p50={values['p50_us']:10.1f}us p99={values['p99_us']:10.1f}us{extra}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressed = False
+        print()
+        for name, base, current, ratio, is_regression in compare(result, baseline, args.threshold):
+            mark = "REGRESSION" if is_regression else "ok"
+            print(f"{name:20s} {base:10.1f}us -> {current:10.1f}us ({ratio:5.2f}x) {mark}")
+            regressed = regressed or is_regression
+        return 1 if regressed else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Build Entry Point
+
+本番起動用の事前構築バンドルを生成するエントリーポイント
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.Bundle import Bundle
+from app.core.Log import configure
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FletMVC bundle builder")
+    parser.add_argument('--output', help="出力先のパス（省略時は BUNDLE['file']）")
+    args = parser.parse_args()
+    
+    configure()
+    data = Bundle.write(args.output)
+    print(
+        f"routes: {len(data['routes'])}, controllers: {len(data['controllers'])}, "
+        f"templates: {len(data['templates'])}, layouts: {len(data['layouts'])}, "
+        f"elements: {len(data['elements'])}, models: {len(data['models'])}"
+    )
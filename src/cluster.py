@@ -0,0 +1,17 @@
+"""
+Cluster Entry Point
+
+複数のワーカープロセスでアプリケーションを起動するエントリーポイント
+"""
+
+import argparse
+from app.core import Cluster
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FletMVC multi-process server")
+    parser.add_argument('--workers', type=int, help="ワーカー数（省略時はCPU数）")
+    parser.add_argument('--host', help="ディスパッチャーの待ち受けアドレス")
+    parser.add_argument('--port', type=int, help="ディスパッチャーの待ち受けポート")
+    args = parser.parse_args()
+    
+    Cluster.run(args.workers, args.host, args.port)
@@ -18,6 +18,7 @@ APP = {
     'default_layout': 'default',
     'default_controller': 'Home',
     'default_action': 'index',
+    'request_pool_size': 64,  # 再利用のために保持するRequest/Responseの数（0で無効）
     'theme': {
         'color_scheme_seed': 'green',
         'theme_mode': 'light'
@@ -55,21 +56,123 @@ EMAIL = {
 LOGGING = {
     'level': 'debug',  # debug, info, warning, error, critical
     'file': 'logs/app.log',
-    'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    'json': True,  # ファイルにはJSON形式（1行1レコード）で書き出す
+    'max_bytes': 10 * 1024 * 1024,  # 10MBでローテーション
+    'backup_count': 5,
+    'debug_sample_rate': 1.0  # DEBUGレコードを出力する割合（0.0〜1.0）
 }
 
 # キャッシュ設定
+# engine: memory, file, sqlite
+# memory_tier: 前段に置くメモリ層の上限バイト数（省略時はメモリ層なし）
+# path / file: 相対パスはカレントディレクトリではなくプロジェクトのルート（src）から解決する
 CACHE = {
     'default': {
         'engine': 'file',
         'path': 'tmp/cache/',
-        'duration': 3600  # 1時間
+        'duration': 3600,  # 1時間
+        'memory_tier': 8 * 1024 * 1024,  # 8MB
+        'mmap_threshold': 64 * 1024  # 64KB以上のファイルはmmapで読み込む
+    },
+    'memory': {
+        'engine': 'memory',
+        'duration': 600,  # 10分
+        'max_bytes': 16 * 1024 * 1024  # 16MB
+    },
+    'sqlite': {
+        'engine': 'sqlite',
+        'file': 'tmp/cache/cache.db',
+        'duration': 86400  # 1日
+    },
+    # 先読みしたアクションのデータ（max_bytes が先読みのメモリ上限）
+    'prefetch': {
+        'engine': 'memory',
+        'duration': 60,
+        'max_bytes': 4 * 1024 * 1024  # 4MB
     }
 }
 
+# 先読み設定
+PREFETCH = {
+    'enabled': True,
+    'max_concurrent': 2,  # 同時に先読みするルート数
+    'max_pending': 32,  # 待ち行列の上限（超えた分は破棄）
+    'idle_delay': 0.3,  # 最後の遷移からこの秒数が経過してから先読みする
+    'ttl': 60,  # 同じルートを再度先読みするまでの秒数
+    'max_warmed': 1024  # 先読みした時刻を記録するルート数の上限
+}
+
+# メトリクス設定
+METRICS = {
+    'enabled': True,
+    'file': 'tmp/metrics.prom',  # 終了時にPrometheus形式で書き出す（Noneで無効）
+    'port': None,  # 指定するとhttp://127.0.0.1:<port>/metrics で公開する
+    'host': '127.0.0.1'
+}
+
+# 画面更新の設定
+UPDATES = {
+    'frame_interval': 0.033  # ナビゲーション以外（バックグラウンドなど）からの更新をまとめる間隔（秒）
+}
+
+# モデル変更通知の設定
+EVENTS = {
+    'interval': 0.05  # 発行された変更をまとめて購読者へ配信する間隔（秒）
+}
+
+# セッションのリソース設定
+SESSIONS = {
+    'check_interval': 30,  # 上限を確認する間隔（秒）
+    'idle_timeout': 3600,  # この秒数操作されていないセッションを切り離す（Noneで無効）
+    'max_sessions': None,  # 同時に保持するセッション数の上限（Noneで無制限）
+    'max_memory': 512 * 1024 * 1024,  # セッションとメモリ上のキャッシュの見積もりの上限（バイト）
+    'idle_grace': 60,  # メモリ不足で切り離すのはこの秒数以上操作されていないセッションのみ
+    'control_bytes': 1024,  # コントロール1つあたりのメモリの見積もり（バイト）
+    'component_bytes': 2048,  # 使用中・プール中のコンポーネント1つあたりの見積もり（バイト）
+    'subscription_bytes': 512,  # モデルの変更の購読1つあたりの見積もり（バイト）
+    'watcher_bytes': 256  # ジョブの進捗のコールバック1つあたりの見積もり（バイト）
+}
+
+# ジョブキュー設定
+JOBS = {
+    'enabled': True,
+    'file': 'tmp/jobs.db',  # 待ち行列と結果を保存するSQLiteファイル
+    'executor': 'thread',  # thread または process
+    'workers': 2,
+    'poll_interval': 1.0,  # 待ち行列を確認する間隔（秒）
+    'progress_interval': 0.25,  # 進捗を書き込み・通知する最短間隔（秒）
+    'keep_finished': 86400  # 終了したジョブを保持する秒数
+}
+
+# フォーム設定
+FORM = {
+    'debounce': 0.4  # 一意性の確認を入力が止まってから行うまでの秒数
+}
+
+# マルチプロセス設定（python src/cluster.py で使用）
+CLUSTER = {
+    'workers': None,  # Noneの場合はCPU数
+    'host': '0.0.0.0',
+    'port': 5000,  # ディスパッチャーの待ち受けポート
+    'worker_base_port': 8550,  # ワーカーNは worker_base_port + N で待ち受ける
+    'ipc_base_port': 8650  # キャッシュの無効化とモデルの変更を通知するUDPポート
+}
+
+# 事前構築バンドル設定（python src/build.py で生成）
+# ファイルがあればコントローラー・テンプレート・モデルの走査を省略します
+# 構築後にコントローラーやテンプレートのディレクトリが変更されていればバンドルは使用されません
+BUNDLE = {
+    'enabled': True,
+    'file': 'build/fletmvc.bundle.json',  # プロジェクトのルート（src）からの相対パス
+    'verify': True  # 読み込み時にソースの更新時刻を確認する（ソースを変更しない本番環境では False で省略できる）
+}
+
 # 利用可能なアプリは動的に検出されるため、APPS定数は不要になりました
 
 # ルーティング設定（上書き用）
+# パラメータは <name> のほか <int:id>, <uuid:key>, <slug:name>, <path:rest> で型を指定できます
 ROUTES = {
     # '/custom/route': {'controller': 'CustomController', 'action': 'customAction'},
+    # パラメータ付きのルートはアクションの @action(params=("<int:id>",)) でも宣言できます
 }
@@ -0,0 +1,267 @@
+"""
+Load Test Module
+
+1つのプロセスで多数のFletセッションを同時に動かしたときの挙動を計測します。
+スタブのPageオブジェクトを実際の main() に渡し、ルート遷移とクリックからなる
+ナビゲーションスクリプトを並行して再生します。ブラウザは不要です。
+
+スクリプトはJSONのリストで、各ステップは次のいずれかです:
+    {"go": "/testlist"}                  ルートを変更する
+    {"click": "ホームに戻る"}             テキストが一致するコントロールの on_click を呼び出す
+    {"sleep": 0.1}                       指定秒数待機する（ユーザーの操作間隔）
+
+使用例:
+    python src/loadtest.py --sessions 200 --concurrency 32 --repeat 5
+    python src/loadtest.py --script scripts/nav.json --output load.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main as app_main
+from app.core.Log import configure, get_logger
+from app.core.Metrics import Metrics
+from app.core.Sessions import Sessions
+from bench.stub import StubPage
+
+# デフォルトのナビゲーションスクリプト
+DEFAULT_SCRIPT = [
+    {"go": "/testlist"},
+    {"go": "/home"},
+    {"go": "Home:index/TestList:index"},
+    {"click": "ホームに戻る"},
+]
+
+
+class ControlEvent:
+    """
+    on_click に渡すイベント
+    """
+
+    def __init__(self, control, page):
+        self.control = control
+        self.page = page
+        self.data = None
+
+
+def _iter_controls(controls):
+    stack = list(reversed(controls))
+    while stack:
+        control = stack.pop()
+        if control is None:
+            continue
+        yield control
+        content = getattr(control, 'content', None)
+        if content is not None and not isinstance(content, str):
+            stack.append(content)
+        children = getattr(control, 'controls', None)
+        if isinstance(children, list):
+            stack.extend(reversed(children))
+
+
+def _control_text(control):
+    for attr in ('text', 'value', 'tooltip'):
+        value = getattr(control, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    content = getattr(control, 'content', None)
+    if content is not None and not isinstance(content, str):
+        return _control_text(content)
+    return None
+
+
+def click(page, text):
+    """
+    現在のビューからテキストが一致するコントロールを探して on_click を呼び出す
+
+    Args:
+        page: StubPageオブジェクト
+        text: 探すテキスト
+    """
+    for view in reversed(page.views):
+        for control in _iter_controls(view.controls):
+            handler = getattr(control, 'on_click', None)
+            if handler is not None and _control_text(control) == text:
+                handler(ControlEvent(control, page))
+                return
+    raise LookupError(f"クリック対象 '{text}' が見つかりません")
+
+
+def _step_name(step):
+    if 'go' in step:
+        return f"go {step['go']}"
+    if 'click' in step:
+        return f"click {step['click']}"
+    return f"sleep {step.get('sleep')}"
+
+
+def _db_totals():
+    counters, histograms = Metrics.snapshot()
+    queries = sum(v for (name, _), v in counters.items() if name == 'fletmvc_db_queries_total')
+    seconds = sum(h[1] for (name, _), h in histograms.items() if name == 'fletmvc_db_query_seconds')
+    return queries, seconds
+
+
+def _percentile(samples, ratio):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * ratio))]
+
+
+def run(sessions=100, concurrency=16, repeat=1, script=None):
+    """
+    負荷試験を実行する
+
+    Args:
+        sessions: 同時に開くセッション数
+        concurrency: スクリプトを並行して再生するスレッド数
+        repeat: セッションごとにスクリプトを繰り返す回数
+        script: ナビゲーションスクリプト
+
+    Returns:
+        計測結果の辞書
+    """
+    script = script or DEFAULT_SCRIPT
+
+    # セッションの作成とメモリ使用量の計測
+    tracemalloc.start()
+    baseline_memory, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    pages = []
+    for i in range(sessions):
+        page = StubPage(f"load-{i}")
+        app_main.main(page)
+        pages.append(page)
+    setup_seconds = time.perf_counter() - start
+    session_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = defaultdict(list)
+    errors = Counter()
+    lock = threading.Lock()
+    db_queries_before, db_seconds_before = _db_totals()
+
+    def play(page):
+        local = []
+        for _ in range(repeat):
+            for step in script:
+                name = _step_name(step)
+                begin = time.perf_counter()
+                try:
+                    if 'go' in step:
+                        page.go(step['go'])
+                    elif 'click' in step:
+                        click(page, step['click'])
+                    elif 'sleep' in step:
+                        time.sleep(step['sleep'])
+                        continue
+                except Exception as e:
+                    with lock:
+                        errors[f"{name}: {type(e).__name__}"] += 1
+                    continue
+                local.append((name, time.perf_counter() - begin))
+        with lock:
+            for name, elapsed in local:
+                latencies[name].append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(play, pages))
+    elapsed = time.perf_counter() - start
+
+    db_queries_after, db_seconds_after = _db_totals()
+    all_samples = [s for samples in latencies.values() for s in samples]
+    navigations = len(all_samples)
+    db_queries = db_queries_after - db_queries_before
+    db_seconds = db_seconds_after - db_seconds_before
+    usages, cache_bytes = Sessions.collect()
+
+    def summary(samples):
+        return {
+            'count': len(samples),
+            'mean_ms': statistics.fmean(samples) * 1000,
+            'p50_ms': _percentile(samples, 0.5) * 1000,
+            'p99_ms': _percentile(samples, 0.99) * 1000,
+        }
+
+    return {
+        'sessions': sessions,
+        'concurrency': concurrency,
+        'repeat': repeat,
+        'setup_seconds': setup_seconds,
+        'memory_per_session_kb': (session_memory - baseline_memory) / sessions / 1024,
+        'elapsed_seconds': elapsed,
+        'throughput_per_second': navigations / elapsed if elapsed else 0.0,
+        'latency': summary(all_samples) if all_samples else {},
+        'steps': {name: summary(samples) for name, samples in latencies.items()},
+        'db': {
+            'queries': db_queries,
+            'seconds': db_seconds,
+            'mean_ms': db_seconds / db_queries * 1000 if db_queries else 0.0,
+            'lock_errors': sum(v for k, v in errors.items() if 'OperationalError' in k),
+        },
+        'accounting': {
+            'controls': sum(usage['controls'] for usage in usages),
+            'memory_bytes': sum(usage['memory_bytes'] for usage in usages),
+            'cpu_seconds': sum(usage['cpu_seconds'] for usage in usages),
+            'cache_bytes': cache_bytes,
+        },
+        'errors': dict(errors),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FletMVC load test")
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--script', help="ナビゲーションスクリプトのJSON")
+    parser.add_argument('--output', help="結果のJSONを書き出すパス")
+    args = parser.parse_args(argv)
+
+    configure()
+
+    # ナビゲーションごとのDEBUGログは計測のノイズになるため抑制する
+    get_logger().setLevel(logging.WARNING)
+
+    script = None
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            script = json.load(f)
+
+    result = run(args.sessions, args.concurrency, args.repeat, script)
+
+    print(f"sessions={result['sessions']} concurrency={result['concurrency']}")
+    print(f"throughput      {result['throughput_per_second']:.1f} navigations/s")
+    if result['latency']:
+        print(f"latency         p50={result['latency']['p50_ms']:.2f}ms p99={result['latency']['p99_ms']:.2f}ms")
+    print(f"memory/session  {result['memory_per_session_kb']:.1f}KB")
+    print(f"accounting      controls={result['accounting']['controls']} "
+          f"memory={result['accounting']['memory_bytes'] / 1024:.0f}KB "
+          f"cpu={result['accounting']['cpu_seconds']:.2f}s cache={result['accounting']['cache_bytes'] / 1024:.0f}KB")
+    print(f"db              {result['db']['queries']} queries, mean={result['db']['mean_ms']:.2f}ms, "
+          f"lock errors={result['db']['lock_errors']}")
+    for name, values in result['steps'].items():
+        print(f"  {name:30s} p50={values['p50_ms']:.2f}ms p99={values['p99_ms']:.2f}ms")
+    for name, count in result['errors'].items():
+        print(f"  error {name}: {count}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    return 1 if result['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
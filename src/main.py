@@ -5,12 +5,25 @@ Main Application Module
 """
 
 import os
+import sys
+
+from app.core import Startup
+
+# --profile-startup 指定時は以降のインポートから計測する
+if "--profile-startup" in sys.argv:
+    Startup.start_profile()
+
 import flet as ft
 from app.core.Router import Router
-from app.core.Controller import Controller
+from app.core.Jobs import Jobs
+from app.core.Log import configure
+from app.core.Metrics import Metrics
+from app.core.Sessions import Sessions
 # from auth.authentication import SaltedHashAuth
 from config import app
 
+Startup.mark("main imported")
+
 def main(page: ft.Page):
     """
     メイン関数
@@ -18,14 +31,26 @@ def main(page: ft.Page):
     Args:
         page: fletのPageオブジェクト
     """
-    # ルーターを初期化
-    router = Router()
+    Startup.mark("main() called")
+    
+    # セッションの使用量の計測を開始
+    Sessions.open(page)
     
     # ルート変更ハンドラを設定
-    page.on_route_change = lambda e: router.handle_route(page, e.route)
+    # （ルーターは全セッションで共有し、ルートテーブルはプロセスで一度だけ構築される）
+    page.on_route_change = lambda e: Router.shared().handle_route(page, e.route)
+    
+    # セッション終了時にセッションごとの状態を破棄
+    page.on_disconnect = lambda e: Sessions.close(page)
+    
+    # 再接続したセッションは計測を再開し、破棄した購読や進捗の通知を登録し直すため画面を描画し直す
+    def on_connect(e):
+        Sessions.open(page)
+        page.reload()
+    page.on_connect = on_connect
     
     # ページリロード関数を定義
-    page.reload = lambda: router.handle_route(page, page.route)
+    page.reload = lambda: Router.shared().handle_route(page, page.route)
     
     # テーマを設定
     theme_config = app.APP['theme']
@@ -39,10 +64,23 @@ def main(page: ft.Page):
     
     # 初期ルートへ遷移（新しいルーティング形式を使用）
     page.go("Home:index/TestList:index")
+    
+    # 最初の描画が終わった時点で起動プロファイルを出力する
+    Startup.mark("first paint")
+    Startup.report()
 
 if __name__ == "__main__":
     # 環境変数からポートを取得（Herokuなどのデプロイ環境用）
     port = int(os.getenv("PORT", 5000))
     
+    # ロギングを構成
+    configure()
+    
+    # メトリクスのエクスポーターを起動
+    Metrics.start_exporters()
+    
+    # 前回の起動で終わらなかったジョブを再開
+    Jobs.start()
+    
     # アプリケーションを起動
     ft.app(target=main, port=port)
\ No newline at end of file
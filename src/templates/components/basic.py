@@ -8,18 +8,24 @@ Key Components:
 - header(page: ft.Page, title: str):
   Creates a header component with a title.
 
-- breadcrumbs(page: ft.Page, separator: str=" / ", active_color: str=ft.Colors.BLUE, inactive_color: str=ft.Colors.GREY, home_content: ft.Control=ft.Icon(ft.Icons.HOME)):
-  Creates a breadcrumbs component with customizable colors and home icon.
+- breadcrumbs(page: ft.Page, separator: str=" / ", active_color: str=ft.Colors.BLUE, inactive_color: str=ft.Colors.GREY, home_content: ft.Control=None):
+  Returns the page's breadcrumbs component, updating only the crumbs that changed since the last route.
 
 - data_lv(page: ft.Page, model_name: str):
-  Creates a list view for a given model.
+  Creates a list view for a given model that patches only the rows changed by any session (see app.core.Events).
 
-- form_lv(page: ft.Page, model_name: str, redirect_to: str, edit_id: str=None):
-  Creates a form view for adding or editing data of a given model.
+- form_lv(page: ft.Page, model_name: str, redirect_to: str, edit_id: str=None, exclude: tuple=("salt",)):
+  Creates a form view for adding or editing data of a given model from its field definitions.
+
+- job_progress(page: ft.Page, job, message: str="Processing..."):
+  Creates a progress view that follows a background job (see app.core.Jobs).
 """
 
 
 import flet as ft
+from app.core.Events import Events, DELETED
+from app.core.Prefetcher import Prefetcher, prefetch_on_hover
+from app.core.Updates import Updates
 from app.utils import *
 
 
@@ -37,195 +43,321 @@ def header(page: ft.Page, title: str):
     )
 
 
+class Breadcrumbs:
+    """
+    ページごとに1つだけ作られるパンくずリスト
+    前回のルートと共通する先頭部分のパンくずはそのまま残し、変わった末尾だけを書き換えます
+    """
+
+    def __init__(self, page, separator, active_color, inactive_color, home_content):
+        self.page = page
+        self.separator = separator
+        self.active_color = active_color
+        self.inactive_color = inactive_color
+        self.parts = []
+        self.crumbs = []  # (区切り文字, リンクのコンテナ, テキスト)。短いルートに戻っても再利用のため残す
+
+        self.home = ft.Container(
+            content=home_content,
+            on_click=lambda _: page.go("/"),
+            padding=5,
+            border_radius=5,
+        )
+        self.row = ft.Row(
+            controls=[self.home, ft.Text(separator, color=inactive_color)],
+            alignment=ft.MainAxisAlignment.START,
+            vertical_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+        self.root = ft.Container(
+            content=self.row,
+            padding=10,
+            border=ft.border.all(1, ft.Colors.GREY_300),
+            border_radius=5,
+            margin=ft.margin.only(bottom=10),
+        )
+
+    def _crumb(self, i):
+        if i == len(self.crumbs):
+            text = ft.Text()
+            self.crumbs.append((
+                ft.Text(self.separator, color=self.inactive_color),
+                ft.Container(content=text, padding=5, border_radius=5),
+                text,
+            ))
+        return self.crumbs[i]
+
+    def _go(self, e):
+        self.page.go(e.control.data)
+
+    def _hover(self, e):
+        if e.data == "true":
+            Prefetcher.hint(self.page, e.control.data)
+
+    def _style(self, i, last):
+        _, container, text = self.crumbs[i]
+        text.color = self.active_color if last else self.inactive_color
+        text.weight = "bold" if last else "normal"
+        # 現在地のパンくずはリンクにしない
+        container.on_click = None if last else self._go
+        container.on_hover = None if last else self._hover
+
+    def update(self, route):
+        """
+        ルートに合わせてパンくずを更新する
+
+        Args:
+            route: 現在のルート
+        """
+        parts = route.strip("/").split("/")
+        if parts == [""]:
+            parts = []
+
+        # 前回のルートと共通する先頭部分の長さ
+        common = 0
+        for old, new in zip(self.parts, parts):
+            if old != new:
+                break
+            common += 1
+
+        # 共通部分の末尾は現在地からリンクに戻ることがある
+        if common and common == len(self.parts) and common < len(parts):
+            self._style(common - 1, last=False)
+
+        href = "/".join([""] + parts[:common])
+        for i in range(common, len(parts)):
+            # パンくずのリンク先は前のリンク先に追記して作る
+            href = f"{href}/{parts[i]}"
+            _, container, text = self._crumb(i)
+            text.value = parts[i]
+            container.data = href
+            self._style(i, last=i == len(parts) - 1)
+        if parts and common == len(parts) and common < len(self.parts):
+            self._style(common - 1, last=True)
+
+        if len(parts) != len(self.parts):
+            controls = self.row.controls
+            del controls[2:]
+            for i in range(len(parts)):
+                separator, container, _ = self.crumbs[i]
+                if i > 0:
+                    controls.append(separator)
+                controls.append(container)
+
+        self.home.content.color = self.active_color if not parts else self.inactive_color
+        self.parts = parts
+
+
 def breadcrumbs(
         page: ft.Page,
         separator: str=" / ",
         active_color: str=ft.Colors.BLUE,
         inactive_color: str=ft.Colors.GREY,
-        home_content: ft.Control=ft.Icon(ft.Icons.HOME),
+        home_content: ft.Control=None,
     ):
-    parts = page.route.strip("/").split("/")
-
-    home_content.color = inactive_color
-    if parts[0] == "":
-        home_content.color = active_color
-
-    crumbs = ft.Row(
-        controls=[
-            ft.Container(
-                content=home_content,
-                on_click=lambda _: page.go("/"),
-                padding=5,
-                border_radius=5,
-            ),
-            ft.Text(separator, color=inactive_color)
-        ],
-        alignment=ft.MainAxisAlignment.START,
-        vertical_alignment=ft.CrossAxisAlignment.CENTER,
-    )
-
-    for i, part in enumerate(parts):
-        if i > 0:
-            crumbs.controls.append(ft.Text(separator, color=inactive_color))
-        
-        crumb_text = ft.Text(
-            # part.capitalize(),
-            part,
-            color=active_color if i == len(parts) - 1 else inactive_color,
-            weight="bold" if i == len(parts) - 1 else "normal",
+    # ページごとに1つのパンくずを使い回し、ルートの差分だけを反映する
+    component = getattr(page, "breadcrumbs", None)
+    if component is None:
+        component = Breadcrumbs(
+            page,
+            separator,
+            active_color,
+            inactive_color,
+            home_content if home_content is not None else ft.Icon(ft.Icons.HOME),
         )
-        
-        if i < len(parts) - 1:
-            crumb = ft.Container(
-                content=crumb_text,
-                on_click=lambda _, p=i: page.go("/" + "/".join(parts[:p+1])),
-                padding=5,
-                border_radius=5,
-            )
-        else:
-            crumb = crumb_text
-        
-        crumbs.controls.append(crumb)
-
-    return ft.Container(
-        content=crumbs,
-        padding=10,
-        border=ft.border.all(1, ft.Colors.GREY_300),
-        border_radius=5,
-        margin=ft.margin.only(bottom=10),
-    )
-
-
-""" def customized_markdown(page: ft.Page, filename: str, patterns: dict={}):
-    return ft.Markdown(
-        value=read_markdown_file(filename, patterns),
-        selectable=True,
-        on_tap_link=lambda e: handle_markdown_tap_link(page, e),
-    )
-
-
-def data_lv(page: ft.Page, model_name: str):
-    data_list = get_data_list(model_name)
-    if not exists(data_list):
-        return ft.Text(f"Model \"{model_name}\" not found")
-
-    # list view
-    lv = ft.ListView(
-        expand=True,
-        spacing=10,
-        padding=20,
-        auto_scroll=True,
-    )
-
-    def _delete(id):
-        delete_data(model_name, id)
-        page.reload()
-
-    for data in data_list:
+        page.breadcrumbs = component
+    component.update(page.route)
+    return component.root
+
+
+class _LiveListView(ft.ListView):
+    """
+    画面から外れたときに on_unmount を呼び出すリスト
+    """
+
+    def __init__(self, on_unmount, **kwargs):
+        super().__init__(**kwargs)
+        self.on_unmount = on_unmount
+
+    def will_unmount(self):
+        super().will_unmount()
+        self.on_unmount()
+
+
+class LiveList:
+    """
+    モデルの一覧
+    購読したテーブルの変更を受け取り、変更された行のカードだけを差し替えます
+    購読は一覧が画面から外れたとき、または同じページで次の一覧を描画したときに解除します
+    """
+
+    def __init__(self, page, model):
+        # 前の画面の一覧が外れる前に次の一覧を描画するため、ここで前の一覧の購読を解除する
+        previous = getattr(page, "live_list", None)
+        if previous is not None:
+            previous.close()
+        page.live_list = self
+
+        self.page = page
+        self.model = model
+        self.primary_key = model._meta.primary_key
+        self.cards = {}  # 主キー -> (カード, フィールドごとのテキスト)
+        self.closed = False
+
+        self.add_button = ft.ElevatedButton(
+            text="ADD",
+            on_click=lambda _: page.go(f"{page.route}/add")
+        )
+        for record in model.select().order_by(self.primary_key):
+            self.cards[self._pk(record)] = self._card(record)
+        self.root = _LiveListView(
+            self.close,
+            controls=[card for card, _ in self.cards.values()] + [self.add_button],
+            expand=True,
+            spacing=10,
+            padding=20,
+            auto_scroll=True,
+        )
+        self.unsubscribe = Events.subscribe(model, self._on_change, page)
+
+    def close(self):
+        """
+        購読を解除する（何度呼び出してもよい）
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.unsubscribe()
+        if getattr(self.page, "live_list", None) is self:
+            self.page.live_list = None
+
+    def _pk(self, record):
+        return getattr(record, self.primary_key.name)
+
+    def _card(self, record):
+        pk = self._pk(record)
+        texts = [
+            ft.Text(value=f"{field_name}: {field_value}", size=12, weight=ft.FontWeight.BOLD)
+            for field_name, field_value in get_items(record)
+        ]
         card = ft.Card(
             content=ft.Container(
                 content=ft.Column(
-                    controls=[]
+                    controls=texts + [
+                        ft.Row([
+                            prefetch_on_hover(self.page, ft.IconButton(
+                                icon=ft.Icons.EDIT,
+                                on_click=lambda _, id=pk: self.page.go(f"{self.page.route}/edit/{id}")
+                            ), f"{self.page.route}/edit/{pk}"),
+                            ft.IconButton(
+                                icon=ft.Icons.DELETE,
+                                on_click=lambda _, id=pk: self.model().delete_record(id)
+                            )
+                        ])
+                    ]
                 ),
                 margin=10
             )
         )
-        for field_name, field_value in get_items(data):
-            card.content.content.controls.append(
-                ft.Text(
-                    value=f"{field_name}: {field_value}",
-                    size=12,
-                    weight=ft.FontWeight.BOLD,
-                )
-            )
-        card.content.content.controls.append(
-            ft.Row([
-                ft.IconButton(
-                    icon=ft.Icons.EDIT,
-                    on_click=lambda _, id=data.id: page.go(f"{page.route}/edit/{id}")
-                ),
-                ft.IconButton(
-                    icon=ft.Icons.DELETE,
-                    on_click=lambda _, id=data.id: _delete(id)
-                )
-            ])
-        )
-        lv.controls.append(card)
+        return card, texts
+
+    def _on_change(self, changes):
+        if self.closed:
+            return
+
+        # 削除以外の行は1回の問い合わせでまとめて読み直す
+        pks = [pk for action, pk in changes if action != DELETED]
+        records = {}
+        if pks:
+            records = {self._pk(record): record for record in self.model.select().where(self.primary_key.in_(pks))}
+
+        controls = self.root.controls
+        for _, pk in changes:
+            record = records.get(pk)
+            entry = self.cards.get(pk)
+            if record is None:
+                # 削除された（またはロールバックで存在しない）行
+                if entry is not None:
+                    controls.remove(entry[0])
+                    del self.cards[pk]
+            elif entry is None:
+                self.cards[pk] = entry = self._card(record)
+                controls.insert(len(controls) - 1, entry[0])
+            else:
+                for text, (field_name, field_value) in zip(entry[1], get_items(record)):
+                    text.value = f"{field_name}: {field_value}"
+        Updates.request(self.page, self.root)
 
-    # add button
-    add_button = ft.ElevatedButton(
-        text="ADD",
-        on_click=lambda _: page.go(f"{page.route}/add")
-    )
-    lv.controls.append(add_button)
-    return lv
 
+def data_lv(page: ft.Page, model_name: str):
+    # 他のセッションの追加・更新・削除も、変更された行だけが画面に反映される
+    # （モデルとpeeweeは一覧を描画するときに初めて読み込む）
+    from app.models.AppModel import AppModel
 
-def form_lv(page: ft.Page, model_name: str, redirect_to: str, edit_id: str=None):
-    if exists(edit_id):
-        model_or_data = get_data_by_id(model_name, edit_id)
-    else:
-        model_or_data = get_model_by_name(model_name)
-    
-    if not exists(model_or_data):
+    models = {name.lower(): model for name, model in AppModel.get_all_models().items()}
+    model = models.get(model_name.lower())
+    if model is None:
+        return ft.Text(f"Model \"{model_name}\" not found")
+    return LiveList(page, model).root
+
+
+def form_lv(page: ft.Page, model_name: str, redirect_to: str, edit_id: str=None, exclude: tuple=("salt",)):
+    # モデルのフィールド定義から生成したフォーム（検証と保存は Form がまとめて行う）
+    from app.core.Form import Form
+    from app.models.AppModel import AppModel
+
+    models = {name.lower(): model for name, model in AppModel.get_all_models().items()}
+    model = models.get(model_name.lower())
+    if model is None:
         return ft.Text(f"Model \"{model_name}\" not found")
 
-    # list view : form
-    lv = ft.ListView(
+    record = None
+    if exists(edit_id):
+        record = model.get_or_none(model._meta.primary_key == edit_id)
+        if record is None:
+            return ft.Text(f"Data \"{model_name}:{edit_id}\" not found")
+
+    form = Form(page, model, record=record, exclude=exclude, on_saved=lambda _: page.go(redirect_to))
+    return ft.ListView(
+        controls=[form.build()],
         expand=True,
-        spacing=10,
         padding=20,
     )
-    
-    for field_name, field_value in get_items(model_or_data):
-        if field_name not in ["id", "salt"]:
-            lv.controls.append(
-                ft.TextField(
-                    label=field_name,
-                    value="" if field_value is None else field_value,
-                )
-            )
 
-    # add button
-    def submit_data(e):
-        data_dict = {}
-        fields = lv.controls[:-1]
-        blank=False
-        for field in fields:
-            if not field.value:
-                blank = True
-                break
-            data_dict[field.label] = field.value
 
-        if not blank:
-            if exists(edit_id):
-                update_data(model_name, edit_id, data_dict)
-            else:
-                if model_name == "user":
-                    page.custom_auth.add_user(data_dict)
-                else:
-                    add_data(model_name, data_dict)
-            page.go(redirect_to)
-        else:
-            dialog = ft.AlertDialog(
-                title=ft.Text("Error"),
-                content=ft.Text("All fields are required"),
-                actions=[
-                    ft.ElevatedButton(
-                        content=ft.Text("OK"),
-                        on_click=lambda e: page.close(dialog)
-                    )
-                ],
-            )
-            page.open(dialog)
+def job_progress(page: ft.Page, job, message: str="Processing..."):
+    # ジョブの進捗は Jobs がまとめて通知し、送信は Updates が次のフレームでまとめる
+    progress_bar = ft.ProgressBar(width=200, value=0)
+    progress_text = ft.Text("0%", size=16)
+    message_text = ft.Text(message, size=16)
+    container = ft.Column(
+        controls=[progress_text, progress_bar, message_text],
+        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        spacing=10,
+    )
+
+    def on_progress(info):
+        progress_bar.value = info["progress"]
+        progress_text.value = f"{int(info['progress'] * 100)}%"
+        if info["status"] == "failed":
+            message_text.value = "Failed"
+        elif info["status"] == "cancelled":
+            message_text.value = "Cancelled"
+        elif info["status"] == "gone":
+            message_text.value = "Not found"
+        elif info["message"]:
+            message_text.value = info["message"]
+        Updates.request(page, container)
+
+    job.watch(on_progress, page)
+    return container
 
-    submit_button = ft.ElevatedButton(
-        text="SUBMIT",
-        on_click=submit_data
+
+""" def customized_markdown(page: ft.Page, filename: str, patterns: dict={}):
+    return ft.Markdown(
+        value=read_markdown_file(filename, patterns),
+        selectable=True,
+        on_tap_link=lambda e: handle_markdown_tap_link(page, e),
     )
-    
-    lv.controls.append(submit_button)
-    return lv
 
 
 def home_apps_lv(page: ft.Page):
@@ -237,47 +369,4 @@ def home_apps_lv(page: ft.Page):
                 on_click=lambda e: page.go(f"/home/{app_name}"),
             )
         )
-    return home_apps_lv
-
-
-
-class ProcessingDialog():
-    def __init__(self, total_count, message: str="Fetching data"):
-        self.total_count = total_count
-        self.processed_count = 0
-        self.progress_bar = ft.ProgressBar(width=200, value=0)
-        self.progress_text = ft.Text("0%", size=16)
-        self.message = message
-        self.content = self._build()
-
-    def _build(self):
-        return ft.AlertDialog(
-            modal=True,
-            content=ft.Container(
-                content=ft.Column(
-                    controls=[
-                        ft.Text("Processing...", size=20, weight="bold"),
-                        ft.ProgressRing(width=50, height=50),
-                        self.progress_text,
-                        self.progress_bar,
-                        ft.Text(self.message, size=16),
-                    ],
-                    alignment=ft.MainAxisAlignment.CENTER,
-                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    spacing=20,
-                ),
-                width=300,
-                height=250,
-                padding=20,
-                bgcolor=ft.Colors.SURFACE_VARIANT,
-                border_radius=10,
-            ),
-            shape=ft.RoundedRectangleBorder(radius=10),
-        )
-
-    def update_progress(self):
-        self.processed_count += 1
-        progress = self.processed_count / self.total_count
-        self.progress_bar.value = progress
-        self.progress_text.value = f"{int(progress * 100)}%"
-        self.content.update() """
\ No newline at end of file
+    return home_apps_lv """
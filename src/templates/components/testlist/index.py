@@ -5,8 +5,10 @@ Error View
 """
 
 import flet as ft
+from app.core.Prefetcher import prefetch_on_hover
+from app.core.Router import url_for
 
-def main(page, title="TESTLIST", message="TESTLIST", route="", **kwargs):
+def main(page, title="TESTLIST", message="TESTLIST", route="", tests=(), **kwargs):
     """
     TESTLISTページを表示する
     
@@ -15,6 +17,7 @@ def main(page, title="TESTLIST", message="TESTLIST", route="", **kwargs):
         title: エラータイトル
         message: エラーメッセージ
         route: エラーが発生したルート
+        tests: テスト名のリスト（詳細へのリンクはマウスが乗った時点で先読みする）
         **kwargs: その他のパラメータ
         
     Returns:
@@ -36,12 +39,25 @@ def main(page, title="TESTLIST", message="TESTLIST", route="", **kwargs):
             size=14,
             color=ft.Colors.GREY
         ),
+        ft.Row(
+            controls=[
+                prefetch_on_hover(page, ft.TextButton(
+                    name,
+                    on_click=lambda _, url=url: page.go(url)
+                ), url)
+                for url, name in (
+                    (url_for("TestList", "detail", id=index), name)
+                    for index, name in enumerate(tests, start=1)
+                )
+            ],
+            wrap=True
+        ),
         ft.Container(
-            content=ft.ElevatedButton(
+            content=prefetch_on_hover(page, ft.ElevatedButton(
                 "ホームに戻る",
                 icon=ft.Icons.HOME,
                 on_click=lambda _: page.go("/")
-            ),
+            ), "/"),
             margin=ft.margin.only(top=20)
         )
     ]
@@ -5,62 +5,78 @@ Alert Element
 """
 
 import flet as ft
+from app.core.Component import Component
+from app.core.Updates import Updates
 
-def main(message, type="info", dismissable=True, **kwargs):
+# タイプごとの背景色とアイコン
+TYPES = {
+    "info": ("blue", ft.Icons.INFO),
+    "success": ("green", ft.Icons.CHECK_CIRCLE),
+    "warning": ("orange", ft.Icons.WARNING),
+    "error": ("red", ft.Icons.ERROR),
+}
+
+class Alert(Component):
+    """
+    アラートメッセージのコンポーネント
+    コンテナ・アイコン・テキスト・閉じるボタンの構造は一度だけ組み立てられます
+    """
+
+    props = {
+        "message": "",
+        "type": "info",
+        "dismissable": True
+    }
+
+    def build(self):
+        self.icon = ft.Icon(color="white")
+        self.text = ft.Text(
+            color="white",
+            size=14,
+            weight=ft.FontWeight.W_500,
+            expand=True
+        )
+        self.close_button = ft.IconButton(
+            icon=ft.Icons.CLOSE,
+            icon_color="white",
+            icon_size=16,
+            on_click=self._dismiss
+        )
+        return ft.Container(
+            content=ft.Row(
+                [self.icon, self.text, self.close_button],
+                alignment=ft.MainAxisAlignment.START,
+                vertical_alignment=ft.CrossAxisAlignment.CENTER
+            ),
+            border_radius=5,
+            padding=10,
+            margin=ft.margin.only(bottom=10)
+        )
+
+    def update(self, message, type, dismissable):
+        bg_color, icon = TYPES.get(type, TYPES["info"])
+        self.root.bgcolor = bg_color
+        self.root.visible = True
+        self.icon.name = icon
+        self.text.value = message
+        self.close_button.visible = dismissable
+
+    def _dismiss(self, e):
+        self.root.visible = False
+        Updates.request(e.page, self.root)
+
+def main(message, type="info", dismissable=True, page=None, **kwargs):
     """
     アラートメッセージを表示するエレメント
-    
+
     Args:
         message: 表示するメッセージ
         type: アラートタイプ (info, success, warning, error)
         dismissable: 閉じるボタンを表示するかどうか
+        page: fletのPageオブジェクト（指定すると画面の切り替え後に構造を再利用します）
         **kwargs: その他のパラメータ
-        
+
     Returns:
         アラートコントロール
     """
-    # タイプに応じた色を設定
-    colors = {
-        "info": "blue",
-        "success": "green",
-        "warning": "orange",
-        "error": "red"
-    }
-    bg_color = colors.get(type, "blue")
-    
-    # アラートを作成
-    alert = ft.Container(
-        content=ft.Row(
-            [
-                ft.Icon(
-                    name=ft.Icons.INFO if type == "info" else 
-                          ft.Icons.CHECK_CIRCLE if type == "success" else
-                          ft.Icons.WARNING if type == "warning" else
-                          ft.Icons.ERROR,
-                    color="white"
-                ),
-                ft.Text(
-                    message,
-                    color="white",
-                    size=14,
-                    weight=ft.FontWeight.W500,
-                    expand=True
-                ),
-                ft.IconButton(
-                    icon=ft.Icons.CLOSE,
-                    icon_color="white",
-                    icon_size=16,
-                    visible=dismissable,
-                    on_click=lambda e: e.control.parent.parent.visible = False
-                ) if dismissable else ft.Container(width=0)
-            ],
-            alignment=ft.MainAxisAlignment.START,
-            vertical_alignment=ft.CrossAxisAlignment.CENTER
-        ),
-        bgcolor=bg_color,
-        border_radius=5,
-        padding=10,
-        margin=ft.margin.only(bottom=10)
-    )
-    
-    return alert
+    return Alert.render(page, message=message, type=type, dismissable=dismissable)
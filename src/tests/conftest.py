@@ -0,0 +1,30 @@
+"""
+テストの共通設定
+
+src をインポートパスに追加し、一時ファイルのデータベースを用意するフィクスチャを定義します。
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from config import app
+
+
+@pytest.fixture
+def database(tmp_path):
+    from app.models.AppModel import db
+    from app.models.User import User
+
+    original = app.DATABASE['file']
+    app.DATABASE['file'] = str(tmp_path / "test.db")
+    if not db.is_closed():
+        db.close()
+    db.init(None)
+    db.create_tables([User])
+    yield db
+    db.close()
+    db.init(None)
+    app.DATABASE['file'] = original
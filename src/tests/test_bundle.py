@@ -0,0 +1,60 @@
+"""
+Bundle のテスト
+
+バンドルの保存先がプロジェクトのルートから解決されること、
+構築後にソースが変更されたバンドルが使用されないことを確認します。
+"""
+
+import json
+import os
+import pytest
+from app.core.Bundle import Bundle
+from app.core.Discovery import Discovery
+from config import app
+
+
+@pytest.fixture
+def bundle(monkeypatch):
+    monkeypatch.setattr(app, 'BUNDLE', {'enabled': True, 'file': 'tmp/test-bundle/fletmvc.bundle.json'})
+    path = os.path.join(Discovery.root(), 'tmp/test-bundle/fletmvc.bundle.json')
+    Bundle.reset()
+    yield path
+    Bundle.reset()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_bundle_path_resolves_against_the_project_root(bundle, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+    Bundle.write()
+
+    assert os.path.exists(bundle)
+    assert not (tmp_path / "tmp").exists()
+    assert Bundle.loaded()
+    assert "TestList" in Bundle.get('controllers')
+
+
+def test_stale_bundle_is_not_used(bundle):
+    Bundle.write()
+    with open(bundle, encoding='utf-8') as f:
+        data = json.load(f)
+    # 構築後にコントローラーのディレクトリが変更された状態にする
+    controllers = os.path.relpath(Discovery.package_dirs('app.controllers')[0], Discovery.root())
+    data['sources'][controllers] -= 1
+    with open(bundle, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    assert Bundle.load() == {}
+
+
+def test_stale_check_can_be_disabled(bundle):
+    Bundle.write()
+    with open(bundle, encoding='utf-8') as f:
+        data = json.load(f)
+    data['sources'] = {path: 0 for path in data['sources']}
+    with open(bundle, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    app.BUNDLE['verify'] = False
+    assert Bundle.load()['controllers']
@@ -0,0 +1,184 @@
+"""
+Cache のテスト
+
+各エンジンの読み書き、メモリエンジンのバイト数の上限、有効期限、階層エンジンの昇格、
+remember が同じキーへの同時アクセスでコールバックを1回だけ実行すること、
+相対パスの保存先がプロジェクトのルートから解決されることを確認します。
+"""
+
+import os
+import shutil
+import threading
+import time
+import pytest
+from app.core.Cache import Cache, FileEngine, MemoryEngine, SqliteEngine, TieredEngine
+from app.core.Discovery import Discovery
+from config import app
+
+
+@pytest.fixture
+def caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'CACHE', {
+        'memory': {'engine': 'memory', 'duration': 60, 'max_bytes': 1024 * 1024},
+        'file': {'engine': 'file', 'path': str(tmp_path / "file"), 'duration': 60},
+        'sqlite': {'engine': 'sqlite', 'file': str(tmp_path / "cache.db"), 'duration': 60},
+        'tiered': {'engine': 'file', 'path': str(tmp_path / "tiered"), 'duration': 3600, 'memory_tier': 1024 * 1024},
+    })
+    monkeypatch.setattr(Cache, '_engines', {})
+    monkeypatch.setattr(Cache, '_key_locks', {})
+    return Cache
+
+
+
+@pytest.mark.parametrize("config", ["memory", "file", "sqlite", "tiered"])
+def test_engine_round_trip(caches, config):
+    value = {"rows": [1, 2, 3], "name": "テスト"}
+
+    Cache.set("key", value, config=config)
+    assert Cache.get("key", config=config) == value
+    assert Cache.get("missing", "default", config=config) == "default"
+
+    Cache.set_many({"a": 1, "b": 2}, config=config)
+    assert Cache.get_many(["a", "b", "missing"], config=config) == {"a": 1, "b": 2}
+
+    Cache.delete("key", config=config)
+    assert Cache.get("key", config=config) is None
+
+    Cache.clear(config=config)
+    assert Cache.get_many(["a", "b"], config=config) == {}
+
+
+def test_file_engine_reads_large_values_through_mmap(tmp_path):
+    engine = FileEngine({'path': str(tmp_path), 'mmap_threshold': 16})
+    value = "x" * 1024
+
+    engine.set("large", value)
+    assert engine.get("large") == value
+
+
+def test_memory_engine_evicts_least_recently_used_beyond_max_bytes():
+    engine = MemoryEngine({'max_bytes': 250})
+    engine.set("a", "a" * 80)
+    engine.set("b", "b" * 80)
+    engine.get("a")  # a を最近使ったものにする
+    engine.set("c", "c" * 80)
+
+    assert engine.get("a") is not None
+    assert engine.get("b") is None
+    assert engine.get("c") is not None
+    assert engine.size() <= 250
+
+    # 上限を超える値は保存しない
+    engine.set("huge", "h" * 1000)
+    assert engine.get("huge") is None
+    assert engine.size() <= 250
+
+
+@pytest.mark.parametrize("config", ["memory", "file", "sqlite", "tiered"])
+def test_entries_expire_after_their_duration(caches, config):
+    Cache.set("short", 1, duration=0.2, config=config)
+    Cache.set("long", 2, config=config)
+    assert Cache.get("short", config=config) == 1
+
+    time.sleep(0.3)
+
+    assert Cache.get("short", config=config) is None
+    assert Cache.get_many(["short", "long"], config=config) == {"long": 2}
+
+
+def test_tiered_promotion_keeps_the_remaining_lifetime(tmp_path):
+    front = MemoryEngine({'duration': 3600})
+    back = SqliteEngine({'file': str(tmp_path / "back.db")})
+    engine = TieredEngine({'duration': 3600}, front, back)
+    back.set("key", "value", 0.2)
+    back.set_many({"a": 1}, 0.2)
+
+    assert engine.get("key") == "value"
+    assert engine.get_many(["a"]) == {"a": 1}
+    assert front.get("key") == "value"
+
+    time.sleep(0.3)
+
+    # メモリ層に昇格した値も下位エンジンと同じ時刻に期限切れになる
+    assert engine.get("key") is None
+    assert engine.get_many(["a"]) == {}
+
+
+def test_remember_caches_the_generated_value(caches):
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return "value"
+
+    assert Cache.remember("key", generate, config="tiered") == "value"
+    assert Cache.remember("key", generate, config="tiered") == "value"
+    assert len(calls) == 1
+
+def test_remember_runs_callback_once_for_concurrent_callers(caches):
+    calls = []
+    start = threading.Barrier(8)
+    results = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    def worker():
+        start.wait()
+        results.append(Cache.remember("key", slow, config="memory"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 8
+    assert Cache._key_locks == {}
+
+
+def test_remember_keeps_the_lock_while_threads_wait(caches):
+    entered = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def blocking():
+        calls.append(1)
+        entered.set()
+        release.wait(2)
+        return "value"
+
+    first = threading.Thread(target=lambda: Cache.remember("key", blocking, config="memory"))
+    first.start()
+    entered.wait(2)
+    waiter = threading.Thread(target=lambda: Cache.remember("key", blocking, config="memory"))
+    waiter.start()
+    time.sleep(0.05)
+
+    # 待っているスレッドがいる間はロックを破棄しない
+    assert Cache._key_locks[("memory", "key")][1] == 2
+    release.set()
+    first.join()
+    waiter.join()
+
+    assert len(calls) == 1
+    assert Cache._key_locks == {}
+
+
+def test_relative_cache_paths_resolve_against_the_project_root(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    root = Discovery.root()
+    assert os.path.isdir(os.path.join(root, "app"))
+
+    file_engine = FileEngine({'path': 'tmp/cache-test/'})
+    sqlite_engine = SqliteEngine({'file': 'tmp/cache-test/cache.db'})
+    try:
+        assert file_engine._path == os.path.join(root, 'tmp/cache-test/')
+        assert sqlite_engine._file == os.path.join(root, 'tmp/cache-test/cache.db')
+        assert not (tmp_path / "tmp").exists()
+    finally:
+        sqlite_engine._connection().close()
+        shutil.rmtree(os.path.join(root, 'tmp/cache-test'), ignore_errors=True)
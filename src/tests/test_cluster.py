@@ -0,0 +1,96 @@
+"""
+Cluster のテスト
+
+ワーカー番号がログレコードに付与されること、
+モデルの変更がワーカー間のチャネルで他のワーカーの購読者に届くことを確認します。
+"""
+
+import logging
+import socket
+import threading
+import pytest
+from app.core.Cluster import InvalidationChannel
+from app.core.Events import Events, CREATED, DELETED, UPDATED
+from app.core.Log import ContextFilter, log_context
+
+
+@pytest.fixture
+def events(monkeypatch):
+    monkeypatch.setattr(Events, '_subscribers', {})
+    monkeypatch.setattr(Events, '_pending', {})
+    monkeypatch.setattr(Events, '_outgoing', {})
+    monkeypatch.setattr(Events, '_forwarders', [])
+    monkeypatch.setattr(Events, '_timer', None)
+    yield Events
+    Events.deliver()
+
+
+def _free_ports(count):
+    sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(count)]
+    for sock in sockets:
+        sock.bind(("127.0.0.1", 0))
+    ports = [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return ports
+
+
+def _record():
+    return logging.LogRecord("fletmvc.test", logging.INFO, __file__, 1, "message", None, None)
+
+
+def test_worker_is_added_to_log_context():
+    record = _record()
+    with log_context(route="/home"):
+        ContextFilter({'worker': 2}).filter(record)
+    assert record.context == {'worker': 2, 'route': "/home"}
+
+    record = _record()
+    ContextFilter().filter(record)
+    assert record.context == {}
+
+
+def test_published_changes_are_forwarded_once_per_interval(events):
+    forwarded = []
+    events.on_publish(forwarded.append)
+
+    # 購読者がいないテーブルの変更も他のプロセスへは転送する
+    events.publish("users", CREATED, 1)
+    events.publish("users", UPDATED, 1)
+    events.publish("users", CREATED, 2)
+    events.publish("users", DELETED, 2)
+    events.publish("posts", UPDATED, 7)
+    events.deliver()
+
+    assert forwarded == [{"users": [(1, CREATED)], "posts": [(7, UPDATED)]}]
+
+
+def test_received_changes_are_delivered_but_not_forwarded(events):
+    forwarded = []
+    received = []
+    events.on_publish(forwarded.append)
+    events.subscribe("users", received.append)
+
+    events.receive({"users": [[1, UPDATED], [2, DELETED]], "posts": [[7, UPDATED]]})
+    events.deliver()
+
+    assert received == [[(UPDATED, 1), (DELETED, 2)]]
+    assert forwarded == []
+
+
+def test_channel_delivers_changes_to_other_workers(events):
+    ports = _free_ports(2)
+    sender = InvalidationChannel(0, ports)
+    receiver = InvalidationChannel(1, ports)
+    threading.Thread(target=receiver._listen, daemon=True).start()
+
+    delivered = threading.Event()
+    received = []
+    events.subscribe("users", lambda changes: (received.append(changes), delivered.set()))
+    try:
+        sender.publish_events({"users": [(1, CREATED), (2, UPDATED)]})
+        assert delivered.wait(2)
+        assert received == [[(CREATED, 1), (UPDATED, 2)]]
+    finally:
+        sender._socket.close()
+        receiver._socket.close()
@@ -0,0 +1,64 @@
+"""
+Component のテスト
+
+プールしたインスタンスの再利用と、画面に残っているインスタンスの扱いを確認します。
+"""
+
+import flet as ft
+import pytest
+from app.core.Component import Component
+from bench.stub import StubPage
+
+
+class Badge(Component):
+    props = {'label': ""}
+
+    def build(self):
+        self.text = ft.Text()
+        return ft.Container(content=self.text)
+
+    def update(self, label):
+        self.text.value = label
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    monkeypatch.setattr(Component, '_pools', {})
+    monkeypatch.setattr(Component, '_in_use', {})
+    return Component
+
+
+def _render_screen(page, *labels):
+    previous = Component.begin_render(page)
+    roots = [Badge.render(page, label=label) for label in labels]
+    Component.end_render(previous)
+    return roots
+
+
+def test_instances_are_reused_after_the_next_screen(pools):
+    page = StubPage()
+    first = _render_screen(page, "a", "b")
+    second = _render_screen(page, "c")
+    assert pools.pooled() == 2
+
+    # 直前の画面のインスタンスは次の画面の描画後にプールへ戻り、再利用される
+    third = _render_screen(page, "d")
+    assert third[0] in first
+    assert third[0].content.value == "d"
+    assert pools.pooled() == 2
+    assert second[0] not in third
+
+
+def test_instances_still_on_screen_stay_in_the_pool(pools):
+    page = StubPage()
+    hidden, shown = _render_screen(page, "a", "b")
+    _render_screen(page)
+    assert pools.pooled() == 2
+
+    # 別のセッションでまだ表示されているインスタンスは再利用せず、プールから捨てない
+    shown._Control__page = object()
+    root = Badge.render(StubPage(), label="c")
+    assert root is hidden
+    assert pools.pooled() == 1
+    assert Badge.render(StubPage(), label="d") not in (shown, hidden)
+    assert pools.pooled() == 1
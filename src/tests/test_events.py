@@ -0,0 +1,62 @@
+"""
+Events のテスト
+
+トランザクション中のモデルの変更がコミット時にだけ発行され、
+ロールバックされたセーブポイント内の変更が破棄されることを確認します。
+また、一覧のコンポーネントが画面の切り替えで購読を解除することを確認します。
+"""
+
+import pytest
+from app.core.Events import Events, CREATED
+
+
+@pytest.fixture
+def published(monkeypatch):
+    calls = []
+    monkeypatch.setattr(Events, 'publish', lambda model, action, pk: calls.append((model, action, pk)))
+    return calls
+
+
+def test_savepoint_rollback_discards_its_changes(database, published):
+    from app.models.User import User
+
+    with database.atomic():
+        kept = User.create(username="kept", password="x", salt="s")
+        with pytest.raises(RuntimeError):
+            with database.atomic():
+                User.create(username="discarded", password="x", salt="s")
+                raise RuntimeError
+        assert published == []
+
+    assert published == [(User, CREATED, kept.id)]
+    assert User.select().count() == 1
+
+
+def test_transaction_rollback_discards_all_changes(database, published):
+    from app.models.User import User
+
+    with pytest.raises(RuntimeError):
+        with database.atomic():
+            User.create(username="discarded", password="x", salt="s")
+            raise RuntimeError
+
+    User.create(username="kept", password="x", salt="s")
+    assert [action for _, action, _ in published] == [CREATED]
+
+
+def test_live_list_unsubscribes_when_replaced_or_unmounted(database):
+    from app.models.User import User
+    from bench.stub import StubPage
+    from templates.components.basic import LiveList
+
+    page = StubPage()
+    first = LiveList(page, User)
+    assert Events.usage(page) == 1
+
+    second = LiveList(page, User)
+    assert first.closed
+    assert Events.usage(page) == 1
+
+    second.root.will_unmount()
+    assert second.closed
+    assert Events.usage(page) == 0
@@ -0,0 +1,27 @@
+"""
+Form のテスト
+
+既定のユーザーフォーム（salt を除外）から Form.submit でユーザーを作成できることを確認します。
+"""
+
+def test_submit_creates_user_with_hashed_password(database):
+    from app.core.Form import Form
+    from app.models.User import User
+    from auth.authentication import SaltedHashAuth
+    from bench.stub import StubPage
+
+    saved = []
+    form = Form(StubPage(), User, exclude=("salt",), on_saved=saved.append)
+    form.build()
+    form.controls['username'].value = "alice"
+    form.controls['password'].value = "secret"
+
+    record = form.submit()
+
+    assert record is not None
+    assert saved == [record]
+    user = User.get(User.username == "alice")
+    assert user.salt
+    assert user.password != "secret"
+    assert SaltedHashAuth().verify_password("alice", "secret")["user"] == user
+    assert SaltedHashAuth().verify_password("alice", "wrong")["user"] is None
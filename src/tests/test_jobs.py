@@ -0,0 +1,106 @@
+"""
+Jobs のテスト
+
+待ち行列からの取り出し、終了したプロセスが残したジョブの再実行、
+存在しないジョブの監視の解除、終了を保存できない場合の扱いを確認します。
+"""
+
+import sqlite3
+import pytest
+from app.core.Jobs import Jobs, JobStore, QUEUED, RUNNING, DONE, FAILED, GONE
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    # バックグラウンドのスレッドは起動せず、取り出しと通知はテストから直接呼び出す
+    monkeypatch.setattr(Jobs, 'start', staticmethod(lambda: None))
+    monkeypatch.setattr(Jobs, '_store', JobStore(str(tmp_path / "jobs.db")))
+    monkeypatch.setattr(Jobs, '_watchers', {})
+    monkeypatch.setattr(Jobs, '_last_seen', {})
+    return Jobs
+
+
+def _status(job_id):
+    return Jobs.store().fetch([job_id])[job_id]['status']
+
+
+def test_claim_takes_jobs_in_order(jobs):
+    store = Jobs.store()
+    first = store.insert("builtins:len", ([1],), {})
+    second = store.insert("builtins:len", ([1, 2],), {})
+
+    assert store.claim("worker:1") == (first, "builtins:len", ([1],), {})
+    assert store.claim("worker:1")[0] == second
+    assert store.claim("worker:1") is None
+    assert _status(first) == RUNNING
+
+
+def test_recover_requeues_jobs_of_dead_owners(jobs):
+    import socket
+
+    store = Jobs.store()
+    dead = store.insert("builtins:len", ([],), {})
+    alive = store.insert("builtins:len", ([],), {})
+    store.claim(f"{socket.gethostname()}:999999999")
+    store.claim("other-host:1")
+
+    assert store.recover("me:1") == 1
+    assert _status(dead) == QUEUED
+    assert _status(alive) == RUNNING
+
+
+def test_watcher_of_missing_job_is_notified_once_and_removed(jobs):
+    calls = []
+    Jobs.watch("missing", calls.append)
+
+    Jobs._notify()
+    Jobs._notify()
+
+    assert [info['status'] for info in calls] == [GONE]
+    assert Jobs._watchers == {}
+
+
+def test_watcher_is_removed_after_the_job_finishes(jobs):
+    store = Jobs.store()
+    job_id = store.insert("builtins:len", ([],), {})
+    calls = []
+    Jobs.watch(job_id, calls.append)
+
+    Jobs._notify()
+    store.finish(job_id, DONE, result=0)
+    Jobs._notify()
+
+    assert [info['status'] for info in calls] == [QUEUED, DONE]
+    assert Jobs._watchers == {}
+
+
+def test_unsaved_result_is_recorded_as_failed(jobs):
+    store = Jobs.store()
+    job_id = store.insert("builtins:len", ([],), {})
+    store.claim("worker:1")
+
+    # pickle化できない結果は保存できないため、失敗として保存する
+    assert Jobs._finish(job_id, DONE, result=lambda: None) == FAILED
+    info = store.fetch([job_id])[job_id]
+    assert info['status'] == FAILED
+    assert "保存できませんでした" in info['error']
+
+
+def test_finish_is_retried_when_the_store_is_unavailable(jobs, monkeypatch):
+    store = Jobs.store()
+    job_id = store.insert("builtins:len", ([],), {})
+    store.claim("worker:1")
+    monkeypatch.setattr(Jobs, '_unfinished', {})
+    original = JobStore.finish
+
+    def broken(self, *args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(JobStore, 'finish', broken)
+    assert Jobs._finish(job_id, DONE, result=1) == FAILED
+    assert _status(job_id) == RUNNING
+
+    monkeypatch.setattr(JobStore, 'finish', original)
+    Jobs._retry_unfinished()
+    assert _status(job_id) == FAILED
+    assert Jobs._unfinished == {}
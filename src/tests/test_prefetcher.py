@@ -0,0 +1,108 @@
+"""
+Prefetcher のテスト
+
+操作中のセッションの先読みがワーカーを占有しないこと、
+先読みしたルートの記録が ttl と上限で破棄されること、
+一覧のリンクから cacheable なアクションのデータが先読みされることを確認します。
+"""
+
+import threading
+import time
+import pytest
+from app.core.Prefetcher import Prefetcher
+from bench.stub import StubPage
+from config import app
+
+
+@pytest.fixture
+def prefetcher(monkeypatch):
+    monkeypatch.setattr(Prefetcher, '_executor', None)
+    monkeypatch.setattr(Prefetcher, '_pending', set())
+    monkeypatch.setattr(Prefetcher, '_warmed', {})
+    monkeypatch.setattr(Prefetcher, '_activity', {})
+    monkeypatch.setitem(app.PREFETCH, 'enabled', True)
+    yield Prefetcher
+    if Prefetcher._executor is not None:
+        Prefetcher._executor.shutdown(wait=True)
+
+
+def test_busy_session_does_not_hold_a_worker(prefetcher, monkeypatch):
+    monkeypatch.setitem(app.PREFETCH, 'max_concurrent', 1)
+    monkeypatch.setitem(app.PREFETCH, 'idle_delay', 0.2)
+    warmed = {}
+    done = threading.Event()
+
+    def warm(route):
+        warmed[route] = time.monotonic()
+        if route == "/idle":
+            done.set()
+        return True
+
+    monkeypatch.setattr(Prefetcher, 'warm', staticmethod(warm))
+    busy, idle = StubPage(), StubPage()
+
+    Prefetcher.touch(busy)
+    started = time.monotonic()
+    assert Prefetcher.hint(busy, "/busy")
+    assert Prefetcher.hint(idle, "/idle")
+    # 操作中のセッションの先読みを待たずに、アイドルのセッションの先読みが実行される
+    assert done.wait(1)
+    assert "/busy" not in warmed
+    assert warmed["/idle"] - started < 0.2
+
+    deadline = time.monotonic() + 2
+    while "/busy" not in warmed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert warmed["/busy"] - started >= 0.2
+
+
+def test_warmed_routes_are_bounded(prefetcher, monkeypatch):
+    monkeypatch.setitem(app.PREFETCH, 'max_warmed', 3)
+    monkeypatch.setitem(app.PREFETCH, 'ttl', 60)
+
+    for i in range(5):
+        Prefetcher._remember(f"/r{i}", 100.0 + i)
+    assert list(Prefetcher._warmed) == ["/r2", "/r3", "/r4"]
+
+    Prefetcher._remember("/late", 200.0)
+    assert list(Prefetcher._warmed) == ["/late"]
+
+
+def test_prefetch_hook_runs_inside_a_dispatch(prefetcher):
+    from app.core.Cache import Cache
+
+    Cache.engine("prefetch").clear()
+
+    assert Prefetcher.warm("/testlist/detail/7")
+    assert Cache.get("testlist:7", config="prefetch")["name"] == "テスト7"
+
+    # cacheable でないアクションのデータは読み込まない
+    assert Prefetcher.warm("/testlist/add")
+    assert Cache.get("testlist:None", config="prefetch") is None
+
+
+def test_list_links_prefetch_on_hover(prefetcher, monkeypatch):
+    import main
+    from app.core.Cache import Cache
+
+    monkeypatch.setitem(app.PREFETCH, 'idle_delay', 0)
+    Cache.engine("prefetch").clear()
+    page = StubPage()
+    main.main(page)
+    page.go("/testlist")
+
+    def walk(controls):
+        for control in controls:
+            yield control
+            yield from walk(getattr(control, "controls", None) or ())
+            content = getattr(control, "content", None)
+            if content is not None:
+                yield from walk([content])
+
+    link = next(control for control in walk(page.views[-1].controls) if getattr(control, "text", None) == "TEST2")
+    link.on_hover(type("HoverEvent", (), {"data": "true"})())
+
+    deadline = time.monotonic() + 2
+    while Cache.get("testlist:2", config="prefetch") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert Cache.get("testlist:2", config="prefetch") is not None
@@ -0,0 +1,93 @@
+"""
+Request のテスト
+
+クエリ文字列の解析と、Request / Response の再利用を確認します。
+"""
+
+import pytest
+from app.core.Request import Request
+from app.core.Response import Response
+from bench.stub import StubPage
+from config import app
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(Request, '_free', [])
+    monkeypatch.setattr(Response, '_free', [])
+    monkeypatch.setitem(app.APP, 'request_pool_size', 1)
+
+
+def test_query_values_are_decoded_and_grouped():
+    request = Request(None, "/search?q=caf%C3%A9+latte&tag=a&tag=b&empty=")
+
+    assert request.get_query("q") == "café latte"
+    assert request.get_query("tag") == "a"
+    assert request.get_list("tag") == ["a", "b"]
+    assert request.get_query("empty") == ""
+    assert request.get_query("missing", "x") == "x"
+    assert request.get_list("missing") == []
+    assert request.get_queries() == {"q": ["café latte"], "tag": ["a", "b"], "empty": [""]}
+
+
+def test_typed_query_values():
+    request = Request(None, "/items?page=3&size=500&bad=x&debug&off=no&odd=maybe")
+
+    assert request.get_int("page") == 3
+    assert request.get_int("size", 20, max_value=100) == 20
+    assert request.get_int("page", 1, min_value=5) == 1
+    assert request.get_int("bad", 1) == 1
+    assert request.get_bool("debug") is True
+    assert request.get_bool("off", True) is False
+    assert request.get_bool("odd", True) is True
+    assert request.get_bool("missing") is False
+
+
+def test_query_falls_back_to_the_page_route():
+    # コントローラー:ビュー形式のルートにはクエリがないため、ページのルートから取得する
+    page = StubPage()
+    page.route = "TestList:index?page=2"
+
+    assert Request(page, "TestList:index").get_int("page") == 2
+    assert Request(page, "/items?page=5").get_int("page") == 5
+    assert Request(None, "/items").get_queries() == {}
+
+
+def test_released_request_is_reused_without_previous_state(pool):
+    page = StubPage()
+    request = Request.acquire(page, "/items?page=2", {"id": 1})
+    request.set_post_data({"name": "a"})
+    assert request.get_int("page") == 2
+    Request.release(request)
+
+    # 戻したオブジェクトはページやパラメータへの参照を残さない
+    assert request.get_page() is None
+
+    reused = Request.acquire(None, "/items")
+    assert reused is request
+    assert reused.get_route() == "/items"
+    assert reused.get_param("id") is None
+    assert reused.get_data("name") is None
+    assert reused.get_int("page") is None
+
+
+def test_released_response_is_reused_without_previous_state(pool):
+    response = Response.acquire(StubPage())
+    response.redirect("/items").set_controls(["control"])
+    Response.release(response)
+
+    reused = Response.acquire(None)
+    assert reused is response
+    assert not reused.is_redirect()
+    assert reused.get_redirect() is None
+
+
+def test_pool_is_bounded_by_request_pool_size(pool):
+    first, second = Request.acquire(None, "/a"), Request.acquire(None, "/b")
+    Request.release(first)
+    Request.release(second)
+    assert Request._free == [first]
+
+    app.APP['request_pool_size'] = 0
+    Response.release(Response.acquire(None))
+    assert Response._free == []
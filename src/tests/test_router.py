@@ -0,0 +1,126 @@
+"""
+Router のテスト
+
+型付きのルートパラメータの変換、url_for によるURLの生成、
+アクションで宣言したルートパラメータが省略可能であること、
+リダイレクトがビューを描画せずに続けて実行されることを確認します。
+"""
+
+import uuid
+import pytest
+from app.core import ErrorHandler
+from app.core.Response import Response
+from app.core.Router import MAX_REDIRECTS, Router
+from app.core.View import View
+from bench.stub import StubPage
+
+
+@pytest.fixture
+def router():
+    router = Router()
+    router._custom_routes = {
+        "/items/<int:id>": {"controller": "Items", "action": "view"},
+        "/items/<slug:slug>/edit": {"controller": "Items", "action": "edit"},
+        "/tokens/<uuid:token>": {"controller": "Tokens", "action": "view"},
+        "/files/<path:path>": {"controller": "Files", "action": "view"},
+        "/users/<name>": {"controller": "Users", "action": "view"},
+    }
+    router.ensure_built()
+    return router
+
+
+def test_typed_converters(router):
+    token = uuid.uuid4()
+
+    assert router.match("/items/42")["params"] == {"id": 42}
+    assert router.match("/items/my-item_1/edit")["params"] == {"slug": "my-item_1"}
+    assert router.match(f"/tokens/{token}")["params"] == {"token": token}
+    assert router.match("/files/a/b/c.txt")["params"] == {"path": "a/b/c.txt"}
+    assert router.match("/users/alice?tab=1")["params"] == {"name": "alice"}
+
+
+def test_converters_reject_values_of_the_wrong_type(router):
+    assert router.match("/items/abc") is None
+    assert router.match("/items/a b/edit") is None
+    assert router.match("/tokens/not-a-uuid") is None
+
+
+def test_url_for_builds_typed_routes(router):
+    assert router.url_for("Items", "view", id=42) == "/items/42"
+    assert router.url_for("ItemsController", "edit", slug="my-item") == "/items/my-item/edit"
+    assert router.url_for("Files", "view", path="a/b c.txt") == "/files/a/b%20c.txt"
+    assert router.url_for("Users", "view", name="a/b") == "/users/a%2Fb"
+    # パターンにないパラメータはクエリ文字列になる
+    assert router.url_for("Items", "view", id=1, tab="x", page=[1, 2]) == "/items/1?tab=x&page=1&page=2"
+
+
+def test_url_for_treats_none_as_absent(router):
+    assert router.url_for("Items", "view", id=1, tab=None) == "/items/1"
+    with pytest.raises(KeyError):
+        router.url_for("Items", "view", id=None)
+    with pytest.raises(KeyError):
+        router.url_for("Missing", "view")
+
+
+def test_declared_params_are_optional():
+    router = Router.shared()
+    router.ensure_built()
+
+    with_id = router.match("/testlist/detail/3")
+    without_id = router.match("/testlist/detail")
+
+    assert (with_id["action"], with_id["params"]) == ("detail", {"id": 3})
+    assert (without_id["action"], without_id["params"]) == ("detail", {})
+    assert router.url_for("TestList", "detail", id=3) == "/testlist/detail/3"
+    assert router.url_for("TestList", "detail") == "/testlist/detail"
+    assert router.url_for("TestList", "detail", id=None) == "/testlist/detail"
+
+
+def test_redirect_skips_the_view_and_follows_the_location(monkeypatch):
+    rendered = []
+    render = View.render
+
+    def spy(self, page, view_vars):
+        rendered.append((self._controller_name, self._action_name))
+        return render(self, page, view_vars)
+
+    monkeypatch.setattr(View, 'render', spy)
+
+    page = StubPage()
+    Router.shared().handle_route(page, "TestList:create")
+
+    # create はビューを描画せず、リダイレクト先の一覧だけが描画される
+    assert rendered == [("testlist", "index")]
+    assert page.route == "/testlist"
+    assert page.go_count == 0
+
+
+def test_redirect_loop_stops_after_max_redirects(monkeypatch):
+    router = Router()
+    dispatched = []
+    errors = []
+
+    def dispatch(page, route):
+        dispatched.append(route)
+        return Response.acquire(page).redirect("/loop")
+
+    monkeypatch.setattr(router, '_dispatch', dispatch)
+    monkeypatch.setattr(ErrorHandler, 'handle_error', lambda page, route, message: errors.append(route))
+
+    router.handle_route(StubPage(), "/start")
+
+    assert len(dispatched) == MAX_REDIRECTS + 1
+    assert errors == ["/loop"]
+
+
+def test_external_redirect_opens_the_url(monkeypatch):
+    router = Router()
+    launched = []
+    monkeypatch.setattr(router, '_dispatch', lambda page, route: Response.acquire(page).redirect("https://example.com/"))
+
+    page = StubPage()
+    page.launch_url = launched.append
+    router.handle_route(page, "/start")
+
+    assert launched == ["https://example.com/"]
+    assert page.route == "/"
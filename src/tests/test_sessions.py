@@ -0,0 +1,102 @@
+"""
+Sessions のテスト
+
+切断したセッションが再接続時に登録し直されること、
+上限を超えたセッションやキャッシュが設定どおりの順に破棄されることを確認します。
+"""
+
+import time
+import pytest
+import main
+from app.core.Cache import Cache
+from app.core.Component import Component
+from app.core.Sessions import Sessions
+from bench.stub import StubPage
+from config import app
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    monkeypatch.setattr(Sessions, '_sessions', {})
+    monkeypatch.setattr(Sessions, 'start', staticmethod(lambda: None))
+    monkeypatch.setattr(Component, '_pools', {})
+    monkeypatch.setattr(Cache, 'memory_size', staticmethod(lambda: 0))
+    return Sessions
+
+
+def _open(sessions, idle_seconds, controls=0):
+    page = StubPage()
+    sessions.open(page)
+    stats = sessions._sessions[page.session_id]
+    stats.last_active = time.monotonic() - idle_seconds
+    stats.controls = controls
+    return page
+
+
+def _limits(monkeypatch, **config):
+    monkeypatch.setattr(app, 'SESSIONS', {
+        'idle_timeout': None, 'max_sessions': None, 'max_memory': None, 'control_bytes': 1, **config,
+    })
+
+
+def test_reconnected_session_is_reopened(sessions, monkeypatch):
+    page = StubPage()
+    main.main(page)
+    assert page.session_id in sessions._sessions
+
+    page.on_disconnect(None)
+    assert page.session_id not in sessions._sessions
+
+    rendered = []
+    monkeypatch.setattr(page, 'reload', lambda: rendered.append(page.route))
+    page.on_connect(None)
+    assert page.session_id in sessions._sessions
+    assert rendered == [page.route]
+
+
+def test_idle_sessions_are_dropped(sessions, monkeypatch):
+    _limits(monkeypatch, idle_timeout=60)
+    idle = _open(sessions, 120)
+    active = _open(sessions, 1)
+
+    assert sessions.enforce() == 1
+    assert list(sessions._sessions) == [active.session_id]
+    assert idle.session_dropped
+
+    # 切り離したセッションは操作されると再び登録される
+    sessions.record(idle, {'stages': {}, 'controls': 0}, 0.0)
+    assert idle.session_id in sessions._sessions
+
+
+def test_sessions_over_max_sessions_are_dropped_oldest_first(sessions, monkeypatch):
+    _limits(monkeypatch, max_sessions=2)
+    oldest = _open(sessions, 30)
+    _open(sessions, 20)
+    _open(sessions, 10)
+
+    assert sessions.enforce() == 1
+    assert oldest.session_id not in sessions._sessions
+    assert len(sessions._sessions) == 2
+
+
+def test_memory_limit_releases_caches_before_idle_sessions(sessions, monkeypatch):
+    released = []
+    monkeypatch.setattr(Cache, 'memory_size', staticmethod(lambda: 0 if released else 500))
+    monkeypatch.setattr(Cache, 'release_memory', staticmethod(lambda: released.append(True)))
+
+    # キャッシュを破棄すれば上限に収まる場合はセッションを切り離さない
+    _limits(monkeypatch, max_memory=1000, idle_grace=60)
+    idle = _open(sessions, 120, controls=400)
+    active = _open(sessions, 1, controls=400)
+    assert sessions.enforce() == 0
+    assert released == [True]
+
+    # 収まらない場合は idle_grace を過ぎたセッションだけを古い順に切り離す
+    _limits(monkeypatch, max_memory=500, idle_grace=60)
+    assert sessions.enforce() == 1
+    assert list(sessions._sessions) == [active.session_id]
+    assert idle.session_dropped
+
+    _limits(monkeypatch, max_memory=100, idle_grace=60)
+    assert sessions.enforce() == 0
+    assert list(sessions._sessions) == [active.session_id]
@@ -0,0 +1,30 @@
+"""
+起動のテスト
+
+最初の描画までにモデル（peewee）が読み込まれないことを確認します。
+"""
+
+import os
+import subprocess
+import sys
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys
+import main
+from bench.stub import StubPage
+
+main.main(StubPage())
+print('peewee' in sys.modules)
+"""
+
+
+def test_first_paint_does_not_import_models(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=SRC, capture_output=True, text=True, timeout=60,
+        env={**os.environ, "PYTHONPATH": SRC},
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,92 @@
+"""
+Updates のテスト
+
+バッチ内の更新が1回の送信にまとめられること、バッチの外の更新が次のフレームで送信されること、
+デバッグ表示を含むナビゲーションが1回の送信で終わることを確認します。
+"""
+
+import time
+from app.core.Updates import Updates
+from bench.stub import StubPage
+from config import app
+
+
+class MountedControl:
+    """
+    画面に表示されているコントロールの代わり
+    """
+
+    def __init__(self, page):
+        self.page = page
+
+
+def test_batch_coalesces_updates():
+    page = StubPage()
+    first, second = MountedControl(page), MountedControl(page)
+
+    with Updates.batch(page):
+        Updates.request(page, first)
+        Updates.request(page, second)
+        Updates.request(page, first)
+        with Updates.batch(page):
+            Updates.request(page)
+        assert page.update_count == 0
+
+    assert page.update_count == 1
+    assert Updates.usage(page) == 0
+
+
+def test_unmounted_controls_are_not_sent():
+    page = StubPage()
+
+    with Updates.batch(page):
+        Updates.request(page, MountedControl(None))
+
+    assert page.update_count == 0
+
+
+def test_request_outside_batch_is_sent_on_next_frame(monkeypatch):
+    monkeypatch.setitem(app.UPDATES, 'frame_interval', 0.01)
+    page = StubPage()
+
+    Updates.request(page, MountedControl(page))
+    Updates.request(page, MountedControl(page))
+    assert page.update_count == 0
+
+    deadline = time.monotonic() + 2
+    while page.update_count == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert page.update_count == 1
+
+
+def test_before_flush_changes_go_out_in_the_same_update():
+    page = StubPage()
+    control = MountedControl(page)
+    calls = []
+
+    def before():
+        calls.append(page.update_count)
+        Updates.request(page, control)
+
+    with Updates.batch(page):
+        Updates.request(page)
+        Updates.before_flush(page, before)
+
+    assert calls == [0]
+    assert page.update_count == 1
+
+
+def test_navigation_with_debug_overlay_sends_one_update(monkeypatch):
+    import main
+
+    monkeypatch.setitem(app.APP, 'debug', True)
+    page = StubPage()
+    main.main(page)
+
+    before = page.update_count
+    page.go("/home")
+
+    assert page.update_count == before + 1
+    overlay = page.views[-1].controls[-1]
+    assert "render=" in overlay.value